@@ -0,0 +1,375 @@
+# benchmarks/bench_pipelines.py
+#
+# Offline benchmark of the conversation.py pipelines. initialize_llm() is
+# swapped for a deterministic fake that replays the recorded responses in
+# fixtures/llm_responses.json with a configurable latency and token rate, and
+# Exa is replaced by a stub returning synthetic documents, so the numbers
+# measure orchestration and parsing rather than Azure. Run from the repository
+# root:
+#
+#     python benchmarks/bench_pipelines.py [--iterations 10] [--latency 0.2] [--tokens-per-second 200]
+#
+# Every pipeline reports p50/p95 wall time, the time spent in parse_* calls, the
+# prompt size sent per run and the peak traced memory of one extra run under
+# tracemalloc, after a warm-up run. With --tokens-per-minute the calls also go
+# through the rate scheduler and its queue waits per lane are reported.
+#
+# Token counts use tiktoken's cl100k_base, which tiktoken downloads on first use
+# (or reads from TIKTOKEN_CACHE_DIR). When it cannot be loaded, or with
+# --offline-encoding, a byte-level encoding stands in for it: counts run about
+# four times high but every pipeline is measured with the same one.
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import conversation  # noqa: E402
+from context_packer import DEFAULT_ENCODING, get_encoding  # noqa: E402
+from doc_store import DocumentStore  # noqa: E402
+from exa_cache import ExaSearchCache  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk  # noqa: E402
+from market_watch import MarketWatch  # noqa: E402
+from parallel import run_dag  # noqa: E402
+from prompt_registry import MIN_CACHEABLE_TOKENS, prompt_text  # noqa: E402
+from prompt_runner import scheduler_stats, set_response_cache, set_router, set_scheduler, set_telemetry  # noqa: E402
+from rate_scheduler import LANES, RateScheduler  # noqa: E402
+from source_summaries import SourceSummaryCache  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "llm_responses.json")
+
+PROBLEM = "Patients keep missing appointments at our clinic and we can't fill the empty slots in time."
+OPPORTUNITY = "Predictive appointment management for small clinics"
+IDEA = "No-show prediction and automatic waiting-list backfill for primary-care clinics"
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+# Function to make DEFAULT_ENCODING resolve to a byte-level encoding when the real
+# one cannot be loaded (or when forced). Returns True when the stand-in is used.
+def use_offline_encoding(force=False):
+    import tiktoken
+    from tiktoken.registry import ENCODINGS
+
+    if not force:
+        try:
+            tiktoken.get_encoding(DEFAULT_ENCODING)
+            return False
+        except Exception as error:
+            print(f"{DEFAULT_ENCODING} unavailable ({type(error).__name__}); counting tokens as bytes",
+                  file=sys.stderr)
+    ENCODINGS[DEFAULT_ENCODING] = tiktoken.Encoding(
+        f"{DEFAULT_ENCODING}-bytes", pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([byte]): byte for byte in range(256)}, special_tokens={},
+    )
+    get_encoding.cache_clear()
+    return True
+
+
+# Replays the response of the first route whose marker appears in the prompt.
+# Time to first token is `latency` plus the prompt's whitespace-delimited tokens
+# at prefill_tokens_per_second; each response token then takes one interval at
+# tokens_per_second. A rate of 0 or None costs nothing. Like the provider, a
+# system message of at least MIN_CACHEABLE_TOKENS that was sent before is served
+# from the prefix cache: it skips prefill and is reported as cached_tokens.
+class FakeLLM:
+    def __init__(self, routes, latency=0.0, tokens_per_second=None, prefill_tokens_per_second=None,
+                 deployment_name="fake", temperature=0.5):
+        self.routes = routes
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.deployment_name = deployment_name
+        self.temperature = temperature
+        self.calls = 0
+        self.prompt_chars = 0
+        self._prefixes = set()
+
+    def _respond(self, prompt):
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        for route in self.routes:
+            if route["match"] in prompt:
+                return route["response"]
+        raise KeyError(f"no recorded response matches prompt starting {prompt.strip()[:80]!r}")
+
+    def _interval(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    # Prompt tokens, and how many of them the prefix cache serves
+    def _usage(self, prompt):
+        cached = 0
+        if not isinstance(prompt, str) and prompt and prompt[0].type == "system":
+            prefix = prompt[0].content
+            if len(prefix.split()) >= MIN_CACHEABLE_TOKENS:
+                if prefix in self._prefixes:
+                    cached = len(prefix.split())
+                self._prefixes.add(prefix)
+        return len(prompt_text(prompt).split()), cached
+
+    def _first_token(self, input_tokens, cached):
+        if not self.prefill_tokens_per_second:
+            return self.latency
+        return self.latency + (input_tokens - cached) / self.prefill_tokens_per_second
+
+    # Usage is shaped like langchain-openai 0.1.8 reports it: usage_metadata has the
+    # counts only, the cached tokens are in the raw token_usage of response_metadata
+    def invoke(self, prompt, **kwargs):
+        content = self._respond(prompt_text(prompt))
+        input_tokens, cached = self._usage(prompt)
+        time.sleep(self._first_token(input_tokens, cached) + self._interval() * len(_TOKEN.findall(content)))
+        output_tokens = len(_TOKEN.findall(content))
+        total_tokens = input_tokens + output_tokens
+        return AIMessage(
+            content=content,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": total_tokens},
+            response_metadata={"token_usage": {"prompt_tokens": input_tokens, "completion_tokens": output_tokens,
+                                               "total_tokens": total_tokens,
+                                               "prompt_tokens_details": {"cached_tokens": cached}}},
+        )
+
+    def stream(self, prompt, **kwargs):
+        content = self._respond(prompt_text(prompt))
+        time.sleep(self._first_token(*self._usage(prompt)))
+        for token in _TOKEN.findall(content):
+            time.sleep(self._interval())
+            yield AIMessageChunk(content=token)
+
+
+# Stands in for exa_py.Exa: deterministic documents per query after a fixed delay
+class FakeExa:
+    def __init__(self, latency=0.0, words_per_document=1500, syndicated_rate=0.0):
+        self.latency = latency
+        self.words_per_document = words_per_document
+        self.syndicated_rate = syndicated_rate
+        self.calls = 0
+
+    def search_and_contents(self, query, use_autoprompt=False, include_domains=None,
+                            start_published_date=None, num_results=3):
+        self.calls += 1
+        time.sleep(self.latency)
+        rng = random.Random(query)
+        vocabulary = ("market clinic patients demand growth scheduling software revenue competitors "
+                      "segment adoption region pricing survey reminders capacity forecast").split()
+        results = []
+        for index in range(num_results or 3):
+            # The top result is the same page for every query, as with real facet searches
+            url = "https://example.com/overview" if index == 0 else f"https://example.com/{rng.getrandbits(32):08x}"
+            # Real documents mention what they were found for, so local lookups can match them
+            text = query + " " + " ".join(rng.choice(vocabulary) for _ in range(self.words_per_document))
+            if index and rng.random() < self.syndicated_rate:
+                # A syndicated press release: the same text on every site, lightly edited
+                release = random.Random("press release")
+                words = [release.choice(vocabulary) for _ in range(self.words_per_document)]
+                for _ in range(len(words) // 100):
+                    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+                text = "Press release " + " ".join(words)
+            results.append(SimpleNamespace(
+                url=url, id=str(index), title=f"Market report {index}",
+                score=1.0 - index / 10, published_date="2024-01-01", author="Analyst", text=text,
+            ))
+        return SimpleNamespace(results=results, autoprompt_string=query)
+
+
+# Accumulates the time spent inside parse_* calls of a pipeline run
+class ParseTimer:
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def __call__(self, parse, output):
+        start = time.perf_counter()
+        try:
+            return parse(output)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+
+def problem_pipeline(parse):
+    llm = conversation.initialize_llm()
+    extracted_information = conversation.problem_extraction(llm, PROBLEM)
+    parse(conversation.parse_problem_extraction, extracted_information)
+    title_output = conversation.generate_title(llm, extracted_information)
+    title = parse(conversation.parse_title_generation, title_output)["TITLE"]
+    abstract = conversation.generate_abstract(llm, title, extracted_information)
+    parse(conversation.parse_abstract_generation, abstract)
+
+
+def opportunity_pipeline(parse):
+    llm = conversation.initialize_llm()
+
+    def on_complete(name, result):
+        if name == "pre_landscape":
+            parse(conversation.parse_opportunity_pre_landscape, result)
+        elif name == "landscape":
+            parse(conversation.parse_opportunity_landscape_output, result)
+
+    run_dag(conversation.opportunity_pipeline(llm, OPPORTUNITY), on_complete=on_complete)
+
+
+def market_pipeline(parse, fanout=True):
+    llm = conversation.initialize_llm()
+    market_data, _ = conversation.gather_market_data(IDEA, fanout=fanout)
+    conversation.market_analysis(llm, IDEA, market_data)
+
+
+PIPELINES = {
+    "extraction->title->abstract": problem_pipeline,
+    "opportunity breadth/depth->landscape": opportunity_pipeline,
+    "market analysis": market_pipeline,
+    "market analysis, single search": lambda parse: market_pipeline(parse, fanout=False),
+    "market analysis, map-reduce": lambda parse: conversation.map_reduce_market_analysis(
+        conversation.initialize_llm(), IDEA),
+    # After the warm-up run the idea is tracked, so this times the delta path
+    "market analysis, refresh": lambda parse: conversation.refresh_market_analysis(
+        conversation.initialize_llm(), IDEA),
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(pipeline, iterations):
+    # One untimed run so lazy imports (pandas on the parse path) are not counted
+    pipeline(ParseTimer())
+    wall, parsing = [], []
+    for _ in range(iterations):
+        timer = ParseTimer()
+        start = time.perf_counter()
+        pipeline(timer)
+        wall.append(time.perf_counter() - start)
+        parsing.append(timer.elapsed)
+
+    tracemalloc.start()
+    pipeline(ParseTimer())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": percentile(wall, 0.50) * 1000,
+        "p95_ms": percentile(wall, 0.95) * 1000,
+        "parse_p50_ms": percentile(parsing, 0.50) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+# Points conversation.py at the fakes and disables every cache so each
+# iteration exercises the full path
+def install_fakes(args, cache_dir):
+    with open(FIXTURES, encoding="utf-8") as handle:
+        routes = json.load(handle)["routes"]
+    llm = FakeLLM(routes, latency=args.latency, tokens_per_second=args.tokens_per_second,
+                  prefill_tokens_per_second=args.prefill_tokens_per_second)
+    exa = FakeExa(latency=args.exa_latency, words_per_document=args.words_per_document,
+                  syndicated_rate=args.syndicated_rate)
+    exa_cache = ExaSearchCache(os.path.join(cache_dir, "exa_search.sqlite3"), ttl=-1)
+
+    conversation.initialize_llm = lambda: llm
+    conversation.get_exa = lambda: exa
+    conversation.get_exa_cache = lambda: exa_cache
+    # With --local-first, documents fetched by earlier iterations answer later searches
+    doc_store = DocumentStore(os.path.join(cache_dir, "documents.sqlite3"))
+    conversation.get_doc_store = lambda: doc_store
+    market_watch = MarketWatch(os.path.join(cache_dir, "market_watch.sqlite3"))
+    conversation.get_market_watch = lambda: market_watch
+    # Fact sheets are shared across iterations like across ideas in a deployment,
+    # unless --cold-summaries starts every call with an empty in-memory cache
+    summary_cache = SourceSummaryCache(os.path.join(cache_dir, "source_summaries.sqlite3"))
+    conversation.get_summary_cache = (lambda: SourceSummaryCache(":memory:")) if args.cold_summaries else (lambda: summary_cache)
+    conversation.local_first_enabled = lambda: args.local_first
+    conversation.get_fanout_workers = lambda: args.fanout_workers
+    conversation.get_market_settings = lambda: dict(
+        conversation.MARKET_DEFAULTS,
+        CONTEXT_TOKENS=args.context_tokens,
+        PASSAGE_TOKENS=args.passage_tokens,
+        PASSAGE_WORDS=args.passage_words,
+        MAP_SOURCE_TOKENS=args.map_source_tokens,
+        NEAR_DUPLICATE_THRESHOLD=args.near_duplicate_threshold,
+    )
+    set_response_cache(None)
+    # Every call goes to the one fake LLM; bench_routing.py compares the tiers
+    set_router(None)
+    set_telemetry(None)
+    # With --tokens-per-minute every fake LLM call is admitted by a rate scheduler as in production
+    set_scheduler(RateScheduler(args.tokens_per_minute, args.requests_per_minute or args.tokens_per_minute // 1000 * 6)
+                  if args.tokens_per_minute else None)
+
+    # The opportunity parsers write to the page; outside `streamlit run` that only logs warnings
+    logging.disable(logging.WARNING)
+    return llm, exa
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline conversation.py pipeline benchmark")
+    parser.add_argument("pipelines", nargs="*", default=list(PIPELINES), help="pipelines to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM time to first token in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="fake LLM token rate (0 for instant)")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=0,
+                        help="fake LLM prompt processing rate (0 for free)")
+    parser.add_argument("--exa-latency", type=float, default=0.3, help="fake Exa search time in seconds")
+    parser.add_argument("--local-first", action="store_true", help="answer searches from the local document store first")
+    parser.add_argument("--fanout-workers", type=int, default=conversation.EXA_FANOUT_MAX_WORKERS)
+    parser.add_argument("--words-per-document", type=int, default=1500)
+    defaults = conversation.MARKET_DEFAULTS
+    parser.add_argument("--context-tokens", type=int, default=defaults["CONTEXT_TOKENS"],
+                        help="token budget of the market_data context")
+    parser.add_argument("--passage-tokens", type=int, default=defaults["PASSAGE_TOKENS"],
+                        help="token budget of the ranked passages in the market_data context")
+    parser.add_argument("--passage-words", type=int, default=defaults["PASSAGE_WORDS"])
+    parser.add_argument("--map-source-tokens", type=int, default=defaults["MAP_SOURCE_TOKENS"],
+                        help="per-source token budget of the map-reduce market analysis")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=defaults["NEAR_DUPLICATE_THRESHOLD"],
+                        help="similarity at which market sources count as copies (0 to keep them all)")
+    parser.add_argument("--syndicated-rate", type=float, default=0.0,
+                        help="share of fake Exa results that are copies of one press release")
+    parser.add_argument("--tokens-per-minute", type=int, default=0,
+                        help="schedule fake LLM calls against this token quota (0 for no scheduler)")
+    parser.add_argument("--requests-per-minute", type=int, default=0,
+                        help="request quota of the scheduler (default 6 per 1000 tokens per minute)")
+    parser.add_argument("--cold-summaries", action="store_true",
+                        help="do not reuse source fact sheets between runs")
+    parser.add_argument("--offline-encoding", action="store_true",
+                        help=f"count tokens with a byte-level stand-in for {DEFAULT_ENCODING}")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    use_offline_encoding(args.offline_encoding)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        llm, exa = install_fakes(args, cache_dir)
+        report = {}
+        for name in args.pipelines:
+            llm.calls = exa.calls = llm.prompt_chars = 0
+            report[name] = measure(PIPELINES[name], args.iterations)
+            report[name]["llm_calls"] = llm.calls // (args.iterations + 2)
+            report[name]["exa_calls"] = exa.calls // (args.iterations + 2)
+            report[name]["prompt_kib"] = llm.prompt_chars / (args.iterations + 2) / 1024
+
+    scheduler = scheduler_stats().get("all")
+    if args.json:
+        print(json.dumps(dict(report, scheduler=scheduler) if scheduler else report, indent=2))
+        return
+
+    print(f"{'pipeline':<40}{'p50 ms':>10}{'p95 ms':>10}{'parse ms':>10}{'peak KiB':>10}{'prompt KiB':>12}{'llm':>6}{'exa':>6}")
+    for name, row in report.items():
+        print(f"{name:<40}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['parse_p50_ms']:>10.2f}"
+              f"{row['peak_kib']:>10.0f}{row['prompt_kib']:>12.1f}{row['llm_calls']:>6}{row['exa_calls']:>6}")
+    if scheduler:
+        for lane in LANES:
+            print(f"scheduler {lane}: {scheduler[lane]['admitted']} calls, queue wait p50 "
+                  f"{scheduler[lane]['queue_wait_p50']} s, p95 {scheduler[lane]['queue_wait_p95']} s")
+
+
+if __name__ == "__main__":
+    main()
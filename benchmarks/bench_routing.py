@@ -0,0 +1,169 @@
+# benchmarks/bench_routing.py
+#
+# Compares every prompt function on the single model the pages use today with
+# the same function routed to its model_routing tier. Deployments are simulated
+# with bench_pipelines.FakeLLM using the latency and price profiles in
+# fixtures/model_profiles.json: recorded responses come from
+# fixtures/llm_responses.json, any other prompt gets --output-words words, and a
+# tier's MAX_TOKENS cuts the completion (one word counts as one token). Simulated
+# time runs --time-scale times real time and is reported back at full scale. Run
+# from the repository root:
+#
+#     python benchmarks/bench_routing.py [--functions check_title market_analysis] [--output-words 400] [--json]
+#
+# The *_structured variants are left out: their replies must be JSON for the
+# schema, and they route like the plain functions they wrap.
+#
+# Like bench_pipelines it falls back to a byte-level token count when cl100k_base
+# cannot be loaded; --offline-encoding forces it.
+
+import argparse
+import inspect
+import json
+import logging
+import os
+import time
+
+from bench_pipelines import FIXTURES, PROBLEM, FakeLLM, use_offline_encoding
+
+import build_blocks
+import conversation
+import spark_blocks
+from model_routing import DEFAULT_ROUTES, DEFAULT_TIERS, Router
+from prompt_runner import set_response_cache, set_router, set_scheduler, set_telemetry
+
+PROFILES = os.path.join(os.path.dirname(FIXTURES), "model_profiles.json")
+
+
+# FakeLLM with a deployment's latency profile that also counts tokens for pricing
+class ProfiledLLM(FakeLLM):
+    def __init__(self, routes, profile, deployment_name, max_tokens=None, output_words=400, temperature=0.5,
+                 time_scale=1.0):
+        super().__init__(routes, latency=profile["latency"] * time_scale,
+                         tokens_per_second=profile["tokens_per_second"] / time_scale,
+                         prefill_tokens_per_second=profile["prefill_tokens_per_second"] / time_scale,
+                         deployment_name=deployment_name, temperature=temperature)
+        self.profile = profile
+        self.max_tokens = max_tokens
+        self.output_words = output_words
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def _respond(self, prompt):
+        try:
+            content = super()._respond(prompt)
+        except KeyError:
+            content = " ".join(["finding"] * self.output_words)
+        words = content.split(" ")
+        if self.max_tokens and len(words) > self.max_tokens:
+            content = " ".join(words[:self.max_tokens])
+        self.input_tokens += len(prompt.split())
+        self.output_tokens += len(content.split())
+        return content
+
+    def cost(self):
+        return (self.input_tokens * self.profile["input_cost_per_1k"]
+                + self.output_tokens * self.profile["output_cost_per_1k"]) / 1000
+
+
+def prompt_functions():
+    found = {}
+    for module in (conversation, spark_blocks, build_blocks):
+        for name, function in vars(module).items():
+            if not (callable(function) and hasattr(function, "__wrapped__") and function.__module__ == module.__name__):
+                continue
+            parameters = list(inspect.signature(function.__wrapped__).parameters)
+            if parameters[:1] == ["llm"] and not name.endswith("_structured"):
+                found[name] = function
+    return found
+
+
+# Every parameter after llm gets the sample problem statement
+def sample_arguments(function):
+    parameters = list(inspect.signature(function.__wrapped__).parameters.values())[1:]
+    return [PROBLEM for parameter in parameters if parameter.default is inspect.Parameter.empty]
+
+
+# Function to run one prompt function and return (seconds, cost of the calls it made)
+def run(function, llm, fakes):
+    for fake in fakes:
+        fake.input_tokens = fake.output_tokens = 0
+    start = time.perf_counter()
+    result = function(llm, *sample_arguments(function))
+    if inspect.isgenerator(result):
+        for _ in result:
+            pass
+    return time.perf_counter() - start, sum(fake.cost() for fake in fakes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single model versus routed tiers, per prompt function")
+    parser.add_argument("--functions", nargs="*", help="prompt functions to compare (default: all)")
+    parser.add_argument("--output-words", type=int, default=400,
+                        help="reply length of prompts without a recorded response")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="simulated seconds per modelled second")
+    parser.add_argument("--offline-encoding", action="store_true",
+                        help="count tokens with a byte-level stand-in for cl100k_base")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    use_offline_encoding(args.offline_encoding)
+
+    with open(FIXTURES, encoding="utf-8") as handle:
+        routes = json.load(handle)["routes"]
+    with open(PROFILES, encoding="utf-8") as handle:
+        models = json.load(handle)
+    profiles = models["profiles"]
+
+    set_response_cache(None)
+    set_scheduler(None)
+    set_telemetry(None)
+    logging.disable(logging.WARNING)
+
+    baseline = ProfiledLLM(routes, profiles[models["baseline"]], models["baseline"], output_words=args.output_words,
+                           time_scale=args.time_scale)
+    pool = {}
+
+    def build(deployment_name, temperature, max_tokens, timeout):
+        key = (deployment_name, temperature, max_tokens)
+        if key not in pool:
+            pool[key] = ProfiledLLM(routes, profiles[deployment_name], deployment_name, max_tokens=max_tokens,
+                                    output_words=args.output_words, temperature=temperature,
+                                    time_scale=args.time_scale)
+        return pool[key]
+
+    tiers = {name: dict(tier, DEPLOYMENT=models["tiers"][name]) for name, tier in DEFAULT_TIERS.items()}
+    router = Router(build, tiers, DEFAULT_ROUTES)
+
+    functions = prompt_functions()
+    report = {}
+    for name in args.functions or sorted(functions):
+        function = functions[name]
+        set_router(None)
+        single_seconds, single_cost = run(function, baseline, [baseline])
+        set_router(router)
+        # Build the tier's client first so its calls are priced
+        router.llm_for(baseline, name)
+        routed_seconds, routed_cost = run(function, baseline, list(pool.values()))
+        report[name] = {
+            "tier": router.tier_for(name),
+            "single_ms": single_seconds * 1000 / args.time_scale,
+            "routed_ms": routed_seconds * 1000 / args.time_scale,
+            "single_cost": single_cost,
+            "routed_cost": routed_cost,
+        }
+    set_router(None)
+
+    totals = {key: sum(row[key] for row in report.values())
+              for key in ("single_ms", "routed_ms", "single_cost", "routed_cost")}
+    if args.json:
+        print(json.dumps({"functions": report, "total": totals}, indent=2))
+        return
+
+    print(f"{'prompt function':<44}{'tier':>9}{'single ms':>11}{'routed ms':>11}{'single $':>11}{'routed $':>11}")
+    for name, row in dict(report, total=dict(totals, tier="")).items():
+        print(f"{name:<44}{row['tier']:>9}{row['single_ms']:>11.0f}{row['routed_ms']:>11.0f}"
+              f"{row['single_cost']:>11.5f}{row['routed_cost']:>11.5f}")
+
+
+if __name__ == "__main__":
+    main()
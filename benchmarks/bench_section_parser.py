@@ -0,0 +1,96 @@
+# benchmarks/bench_section_parser.py
+#
+# Micro-benchmark of section_parser.SectionParser against the per-line key
+# scanning the parse_* functions used before. Run from the repository root:
+#
+#     python benchmarks/bench_section_parser.py [--repeat 20]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from section_parser import Field, Section, SectionParser  # noqa: E402
+
+KEYS = [
+    "CORE ISSUE", "AFFECTED STAKEHOLDERS", "CONTEXT OR SCOPE", "CURRENT IMPACT",
+    "DESIRED OUTCOME", "ROOT CAUSES", "TIMEFRAME", "QUANTIFIABLE ASPECTS",
+    "INDUSTRY OR FIELD", "KEY TERMS", "CONSTRAINTS", "UNIQUE ASPECTS",
+]
+
+FLAT_PARSER = SectionParser([Field(key) for key in KEYS], strip_quotes=False)
+
+SECTIONS = ["MAN", "MACHINE", "MATERIAL", "METHOD", "MEASUREMENT"]
+SUBKEYS = ["FACTOR_A", "FACTOR_B", "FACTOR_C"]
+NESTED_PARSER = SectionParser(
+    [Section(name, [Field(f"{name}_{sub}", sub.lower()) for sub in SUBKEYS], main="overall") for name in SECTIONS]
+    + [Field("ROOT_CAUSE"), Field("RECOMMENDATIONS")]
+)
+
+
+# The per-line scan previously used by parse_problem_extraction
+def legacy_flat_parse(output):
+    parsed_data = {key: "" for key in KEYS}
+    current_key = None
+    for line in output.split("\n"):
+        line = line.strip()
+        if line:
+            for key in parsed_data.keys():
+                if line.startswith(key + ":"):
+                    current_key = key
+                    parsed_data[key] = line.split(":", 1)[1].strip()
+                    break
+            else:
+                if current_key:
+                    parsed_data[current_key] += " " + line
+    return parsed_data
+
+
+def flat_output(continuation_lines):
+    body = "\n".join("Supporting detail line with some words in it." for _ in range(continuation_lines))
+    return "\n\n".join(f'{key}: "Value for {key.lower()}"\n{body}' for key in KEYS)
+
+
+def nested_output(continuation_lines):
+    body = "\n".join("Supporting detail line with some words in it." for _ in range(continuation_lines))
+    blocks = []
+    for name in SECTIONS:
+        lines = [f'{name}: "Overall {name.lower()}"\n{body}']
+        lines.extend(f'{name}_{sub}: "Detail"\n{body}' for sub in SUBKEYS)
+        blocks.append("\n".join(lines))
+    blocks.append(f'ROOT_CAUSE: "Cause"\n{body}\nRECOMMENDATIONS: "Do things"\n{body}')
+    return "\n\n".join(blocks)
+
+
+def measure(fn, text, repeat):
+    fn(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed, len(text.encode("utf-8")) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SectionParser micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<34}{'size':>10}{'ms/parse':>12}{'MB/s':>10}")
+    for lines in (1, 50, 1000):
+        text = flat_output(lines)
+        for label, fn in (("legacy line scan", legacy_flat_parse), ("SectionParser", FLAT_PARSER.parse)):
+            elapsed, throughput = measure(fn, text, args.repeat)
+            print(f"{'flat/' + label + f' x{lines}':<34}{len(text):>10}{elapsed * 1000:>12.3f}{throughput:>10.1f}")
+        assert legacy_flat_parse(text) == FLAT_PARSER.parse(text)
+
+    for lines in (1, 50, 1000):
+        text = nested_output(lines)
+        elapsed, throughput = measure(NESTED_PARSER.parse, text, args.repeat)
+        print(f"{'nested/SectionParser' + f' x{lines}':<34}{len(text):>10}{elapsed * 1000:>12.3f}{throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/fake_exa_server.py
+#
+# Local stand-in for the Exa /search endpoint, for exercising exa_client
+# (timeouts, retries, circuit breaker) without network access. Run from the
+# repository root and point [exa] BASE_URL at it:
+#
+#     python benchmarks/fake_exa_server.py [--port 8765] [--latency 0.3] [--error-rate 0.2] [--hang-rate 0.05]
+#
+# --error-rate answers that share of requests with 503, --hang-rate sleeps
+# for --hang-seconds before answering, to trip client timeouts.
+
+import argparse
+import json
+import random
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(args):
+    rng = random.Random(args.seed)
+    vocabulary = ("market clinic patients demand growth scheduling software revenue competitors "
+                  "segment adoption region pricing survey reminders capacity forecast").split()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *values):
+            if args.verbose:
+                super().log_message(format, *values)
+
+        def _reply(self, status, body, headers=()):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path != "/search":
+                return self._reply(404, {"error": "not found"})
+            if not self.headers.get("x-api-key"):
+                return self._reply(401, {"error": "missing x-api-key"})
+
+            roll = rng.random()
+            if roll < args.hang_rate:
+                time.sleep(args.hang_seconds)
+            elif roll < args.hang_rate + args.error_rate:
+                return self._reply(503, {"error": "unavailable"}, [("Retry-After", "0")])
+            time.sleep(args.latency)
+
+            query = request.get("query", "")
+            results = []
+            for index in range(request.get("numResults", 3)):
+                words = random.Random(f"{query}/{index}")
+                results.append({
+                    "url": f"https://example.com/{zlib.crc32(f'{query}/{index}'.encode()):08x}",
+                    "id": str(index),
+                    "title": f"Market report {index}",
+                    "score": 1.0 - index / 10,
+                    "publishedDate": "2024-01-01",
+                    "author": "Analyst",
+                    "text": " ".join(words.choice(vocabulary) for _ in range(args.words)),
+                })
+            self._reply(200, {"results": results, "autopromptString": query})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Exa search server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--words", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args))
+    print(f"fake Exa listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/import_report.py
+#
+# Per-module import cost of the app, measured with `python -X importtime` in a
+# fresh interpreter for every module so that nothing is shared between runs.
+# Run from the repository root:
+#
+#     python benchmarks/import_report.py [--top 15] [--budget-ms main_app=1500]
+#
+# Exits with status 1 when a module exceeds its --budget-ms, so it can gate CI.
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["main_app", "conversation", "spark_blocks", "build_blocks"]
+
+# import time: self [us] | cumulative | imported package
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+# Function to import a module in a clean interpreter and return its
+# importtime rows as (name, self_us, cumulative_us, depth)
+def import_profile(module):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr.strip()}")
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def parse_budgets(values):
+    budgets = {}
+    for value in values:
+        module, _, limit = value.partition("=")
+        budgets[module] = float(limit)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module import cost report")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--top", type=int, default=10, help="heaviest dependencies listed per module")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="MODULE=MS",
+                        help="fail when MODULE takes longer than MS to import")
+    args = parser.parse_args()
+    budgets = parse_budgets(args.budget_ms)
+
+    failures = []
+    for module in args.modules:
+        rows = import_profile(module)
+        index = max(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+        total_ms = rows[index][2] / 1000
+        print(f"{module}: {total_ms:.1f} ms")
+
+        # Children are printed before their parent; only direct imports are
+        # listed so packages are not counted twice with their submodules
+        children = []
+        for row in reversed(rows[:index]):
+            if row[3] == 0:
+                break
+            if row[3] == 1:
+                children.append(row)
+        heaviest = sorted(children, key=lambda row: -row[2])
+        for name, _, cumulative, _ in heaviest[:args.top]:
+            print(f"    {name:<40}{cumulative / 1000:>10.1f} ms")
+
+        limit = budgets.get(module)
+        if limit is not None and total_ms > limit:
+            failures.append(f"{module} took {total_ms:.1f} ms, budget {limit:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
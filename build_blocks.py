@@ -1,26 +1,17 @@
 # build_blocks.py
 
 import streamlit as st
-from langchain_openai import AzureChatOpenAI
+from llm_pool import get_llm
+from prompt_registry import register_prompt
+from prompt_runner import prompt_function
 
 # Function to initialize AzureChatOpenAI
 def initialize_llm():
-    api_key = st.secrets["azure"]["AZURE_OPENAI_API_KEY"]
-    api_version = st.secrets["azure"]["AZURE_OPENAI_API_VERSION"]
-    deployment_name = st.secrets["azure"]["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"]
-    endpoint = st.secrets["azure"]["AZURE_OPENAI_ENDPOINT"]
-
-    llm = AzureChatOpenAI(
-        openai_api_key=api_key,
-        openai_api_version=api_version,
-        azure_deployment=deployment_name,
-        azure_endpoint=endpoint
-    )
-    return llm
+    return get_llm()
 
-# Function to classify problem statement for "Build Blocks"
-def classify_build_blocks(llm, problem):
-    prompt = f"""
+# The definitions are the static system prefix, identical on every call so the
+# provider serves them from its prompt cache; only the problem statement varies
+CLASSIFY_BUILD_BLOCKS_PROMPT = register_prompt("build_blocks.classify_build_blocks", """
         To determine with certainty whether a statement represents a Need, Opportunity, or Concept, we need to look for specific characteristics and linguistic patterns. Here's a guide for each:
 
         ## Definitions and Boundaries of Each Type ##
@@ -96,10 +87,14 @@ def classify_build_blocks(llm, problem):
 
         Now classify this Problem Statement into one of the types. Think step by step. Explain your reasoning stepwise as to why it is classified in that category and why it is not classified in the other categories. Strictly use the above guidelines and definitions of the classification given above.
 
-        Problem: {problem}
+""", """        Problem: {problem}
         Answer:
-        """
-    response = llm.invoke(prompt)
+        """)
+
+# Function to classify problem statement for "Build Blocks"
+@prompt_function
+def classify_build_blocks(llm, problem):
+    response = llm.invoke(CLASSIFY_BUILD_BLOCKS_PROMPT.messages(problem=problem))
     return response.content
 
 def build_blocks_app():
@@ -0,0 +1,94 @@
+# context_packer.py
+
+import functools
+from collections import namedtuple
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# A piece of context: the header (title, URL, ...) is always kept whole so the
+# source stays citable; only the body is trimmed to fit the budget
+Source = namedtuple("Source", ["label", "header", "body"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name=DEFAULT_ENCODING):
+    import tiktoken
+    return tiktoken.get_encoding(name)
+
+
+# Function to split a token budget across sources of the given lengths. Short
+# sources take only what they need and the remainder is shared evenly by the
+# longer ones (water-filling), so the result never exceeds the budget.
+def allocate(lengths, budget):
+    shares = [0] * len(lengths)
+    remaining = max(budget, 0)
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    for position, index in enumerate(order):
+        share = min(lengths[index], remaining // (len(order) - position))
+        shares[index] = share
+        remaining -= share
+    return shares
+
+
+# Packs sources into one context string of at most max_tokens tokens. Each
+# source is encoded once and the parts are joined at the end, so packing is
+# linear in the size of the input. per_source_tokens optionally caps any one body.
+class ContextPacker:
+    def __init__(self, max_tokens, per_source_tokens=None, encoding=None, separator="\n"):
+        self.max_tokens = max_tokens
+        self.per_source_tokens = per_source_tokens
+        self.encoding = encoding or get_encoding()
+        self.separator = separator
+
+    def count(self, text):
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    # Returns (text, usage) where usage has one row per source with the tokens
+    # it contributed, its original size and whether it had to be trimmed or dropped
+    def pack(self, sources):
+        sources = list(sources)
+        encode = functools.partial(self.encoding.encode, disallowed_special=())
+        separator_tokens = self.count(self.separator) if sources else 0
+        headers = [encode(source.header) for source in sources]
+        bodies = [encode(source.body) for source in sources]
+
+        # Headers are kept in order while they fit; a source whose header
+        # does not fit is dropped together with everything after it
+        budget = self.max_tokens
+        kept = 0
+        for header in headers:
+            cost = len(header) + separator_tokens
+            if cost > budget:
+                break
+            budget -= cost
+            kept += 1
+
+        wanted = [len(body) for body in bodies[:kept]]
+        if self.per_source_tokens is not None:
+            wanted = [min(length, self.per_source_tokens) for length in wanted]
+        shares = allocate(wanted, budget)
+
+        parts, usage = [], []
+        for index, source in enumerate(sources):
+            if index < kept:
+                body = bodies[index][:shares[index]]
+                text, body_tokens = source.body, len(body)
+                if len(body) < len(bodies[index]):
+                    # The cut may split a character spread over several tokens; drop the
+                    # partial character instead of decoding it to a longer U+FFFD
+                    text = self.encoding.decode(body, errors="ignore")
+                    body_tokens = self.count(text)
+                parts.append(source.header)
+                parts.append(text)
+                parts.append(self.separator)
+                used = len(headers[index]) + body_tokens + separator_tokens
+            else:
+                used = 0
+            usage.append({
+                "source": source.label,
+                "tokens": used,
+                "original_tokens": len(headers[index]) + len(bodies[index]) + separator_tokens,
+                "trimmed": index < kept and shares[index] < len(bodies[index]),
+                "included": index < kept,
+            })
+        return "".join(parts), usage
@@ -1,74 +1,162 @@
 # build_blocks.py
 
 import streamlit as st
-from langchain_openai import AzureChatOpenAI
-import pandas as pd
-from exa_py import Exa
 import json
+import re
+import functools
+from llm_pool import get_llm
+from prompt_registry import register_prompt
+from prompt_runner import parse_function, prompt_function
+from parallel import critical_path, run_concurrently, run_dag
+from exa_cache import DEFAULT_TTL as EXA_CACHE_TTL, ExaSearchCache
+from context_packer import DEFAULT_ENCODING, ContextPacker, Source, get_encoding
+from dedup import DEFAULT_NEAR_DUPLICATE_THRESHOLD, collapse_near_duplicates, merge_results
+from doc_store import DEFAULT_MIN_COVERAGE, DEFAULT_MIN_SCORE, DocumentStore
+from market_watch import MarketWatch
+from source_summaries import SourceSummaryCache
+from passage_ranker import DEFAULT_PASSAGE_WORDS, Passage, chunk_text, rank_passages, select_passages
+from section_parser import Field, Section, SectionParser
+from structured_output import Assumptions, ProblemAssessment, TitleCheck, TitleGeneration, invoke_structured
 
 #from langchain_groq import ChatGroq
 
 # Function to initialize AzureChatOpenAI
 def initialize_llm():
-    api_key = st.secrets["azure"]["AZURE_OPENAI_API_KEY"]
-    api_version = st.secrets["azure"]["AZURE_OPENAI_API_VERSION"]
-    deployment_name = st.secrets["azure"]["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"]
-    endpoint = st.secrets["azure"]["AZURE_OPENAI_ENDPOINT"]
-
-    #llm = ChatGroq(temperature=0.5, groq_api_key="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", model_name="llama3-70b-8192")
-
-    llm = AzureChatOpenAI(
-        openai_api_key=api_key,
-        openai_api_version=api_version,
-        azure_deployment=deployment_name,
-        azure_endpoint=endpoint,
-        temperature=0.5
+    return get_llm(temperature=0.5)
+
+# exa_client and pandas are imported where they are first needed so that loading
+# this page module stays cheap
+
+# Resources the st.cache_resource factories below have built, by name. The sidebar
+# diagnostics render on every rerun and only report these, so showing them never
+# starts the Exa client or opens a SQLite file.
+_resources = {}
+
+def _resource_stats(name):
+    resource = _resources.get(name)
+    return resource.stats() if resource is not None else {}
+
+# Exa client, built on the first search rather than at import time. Timeouts,
+# retries, concurrency and the circuit breaker are tunable in the [exa] secrets
+# section; BASE_URL can point it at a local fake server.
+@st.cache_resource
+def get_exa():
+    from exa_client import (DEFAULT_BASE_URL, DEFAULT_BREAKER_FAILURES, DEFAULT_BREAKER_RESET, DEFAULT_DEADLINE,
+                            DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES, DEFAULT_TIMEOUT, CircuitBreaker, ExaClient)
+    settings = st.secrets["exa"]
+    _resources["exa_client"] = ExaClient(
+        settings["EXA_API_KEY"],
+        base_url=settings.get("BASE_URL", DEFAULT_BASE_URL),
+        timeout=float(settings.get("TIMEOUT_SECONDS", DEFAULT_TIMEOUT)),
+        deadline=float(settings.get("DEADLINE_SECONDS", DEFAULT_DEADLINE)),
+        max_retries=int(settings.get("MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        max_concurrency=int(settings.get("MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        breaker=CircuitBreaker(int(settings.get("BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES)),
+                               float(settings.get("BREAKER_RESET_SECONDS", DEFAULT_BREAKER_RESET))),
     )
-    return llm
-
-exa = Exa(st.secrets["exa"]["EXA_API_KEY"])
-
-class Result:
-    def __init__(self, url, id, title, score, published_date, author):
-        self.url = url
-        self.id = id
-        self.title = title
-        self.score = score
-        self.published_date = published_date
-        self.author = author
-
-    def to_dict(self):
-        return {
-            "url": self.url,
-            "id": self.id,
-            "title": self.title,
-            "score": self.score,
-            "published_date": self.published_date,
-            "author": self.author
-        }
-
-class SearchResponse:
-    def __init__(self, results, autoprompt_string=None):
-        self.results = results
-        self.autoprompt_string = autoprompt_string
-
-def extract_search_results(search_response):
-    extracted_results = [result.to_dict() for result in search_response.results]
-    return extracted_results
-
-# Function to perform the search and extract results
-def search_and_extract(query, include_domains=None, start_published_date=None):
-    # Perform the search
-    search_response = exa.search_and_contents(query,use_autoprompt=True,num_results=3)
-    
-    return search_response.results
-
-
+    return _resources["exa_client"]
+
+# Persistent cache of Exa searches, shared by every session in the process
+@st.cache_resource
+def get_exa_cache():
+    settings = st.secrets["exa"]
+    _resources["exa_cache"] = ExaSearchCache(settings.get("CACHE_PATH", ".cache/exa_search.sqlite3"),
+                                             ttl=settings.get("CACHE_TTL_SECONDS", EXA_CACHE_TTL))
+    return _resources["exa_cache"]
+
+# Local full-text store of every fetched document, consulted before Exa
+@st.cache_resource
+def get_doc_store():
+    settings = st.secrets["exa"]
+    _resources["doc_store"] = DocumentStore(
+        settings.get("DOCSTORE_PATH", ".cache/documents.sqlite3"),
+        min_coverage=float(settings.get("DOCSTORE_MIN_COVERAGE", DEFAULT_MIN_COVERAGE)),
+        min_score=float(settings.get("DOCSTORE_MIN_SCORE", DEFAULT_MIN_SCORE)))
+    return _resources["doc_store"]
+
+def local_first_enabled():
+    return bool(st.secrets["exa"].get("LOCAL_FIRST", True))
+
+def doc_store_stats():
+    return _resource_stats("doc_store")
+
+def exa_cache_stats():
+    return _resource_stats("exa_cache")
+
+def exa_client_stats():
+    return _resource_stats("exa_client")
+
+# Function to perform the search and extract results. Documents already in the local
+# store answer the query first and Exa only tops them up; pass store=False to skip it.
+# topic is what a stored document must be about, for queries that wrap it in generic
+# wording (see DocumentStore.search). fresh=True always asks Exa, ignoring the cache
+# and the store (its results are still added to both). Worker threads have no Streamlit context, so they pass in the cache,
+# client and store resolved by the caller.
+def search_and_extract(query, include_domains=None, start_published_date=None, num_results=3, cache=None, client=None, store=None, fresh=False,
+                       topic=None):
+    cache = cache or get_exa_cache()
+    if store is None:
+        store = get_doc_store() if local_first_enabled() else False
+    params = {
+        "include_domains": include_domains,
+        "start_published_date": start_published_date,
+        "num_results": num_results
+    }
+    results = None if fresh else cache.get(query, **params)
+    if results is not None:
+        return results
+
+    local = []
+    if store and not fresh:
+        local = store.search(query, limit=num_results, include_domains=include_domains,
+                             start_published_date=start_published_date, topic=topic)
+        store.record_lookup(len(local), num_results)
+        if len(local) >= num_results:
+            return local
+
+    # Perform the search. Exa is asked for the full count because its results may
+    # include the local documents; those are dropped and the rest fill the shortfall.
+    search_response = (client or get_exa()).search_and_contents(
+        query, use_autoprompt=True, include_domains=include_domains,
+        start_published_date=start_published_date, num_results=num_results)
+    if store:
+        store.add(search_response.results)
+    return cache.put(query, merge_results([local, search_response.results])[:num_results], **params)
+
+# Default concurrency of fan-out searches, overridable as FANOUT_MAX_WORKERS in [exa]
+EXA_FANOUT_MAX_WORKERS = 8
+
+def get_fanout_workers():
+    return int(st.secrets["exa"].get("FANOUT_MAX_WORKERS", EXA_FANOUT_MAX_WORKERS))
+
+# Function to run several searches concurrently and merge the results, dropping
+# repeated URLs and near-identical texts. Results keep the order of the queries.
+# A failed query is skipped unless every query fails.
+def search_fanout(queries, max_workers=None, **params):
+    if max_workers is None:
+        max_workers = get_fanout_workers()
+    cache, client = get_exa_cache(), get_exa()
+    store = get_doc_store() if local_first_enabled() else False
+    calls = {query: functools.partial(search_and_extract, query, cache=cache, client=client, store=store, **params)
+             for query in queries}
+    found, errors = {}, []
+    for query, results, error in run_concurrently(calls, max_workers):
+        if error is None:
+            found[query] = results
+        else:
+            errors.append(error)
+    if errors and not found:
+        raise errors[0]
+    return merge_results(found[query] for query in queries if query in found)
+
+
+@prompt_function
 def problem_extraction(llm, problem):
-    prompt = f'''
-    {problem}
+    response = llm.invoke(PROBLEM_EXTRACTION_PROMPT.messages(problem=problem))
+    return response.content
 
-    Based on the innovator's response to "What is a problem for you?", extract the following key elements and present them in the specified format:
+PROBLEM_EXTRACTION_PROMPT = register_prompt("problem_extraction", '''
+    Based on the innovator's response to "What is a problem for you?", given at the end, extract the following key elements and present them in the specified format:
 
     CORE ISSUE: "....[Identify the central problem or challenge]..."
 
@@ -95,54 +183,34 @@ def problem_extraction(llm, problem):
     UNIQUE ASPECTS: "....[Highlight distinctive features of the problem]..."
 
     Please provide your response in the exact format shown above, with each category in capital letters followed by a colon and the answers should be within double quotation"... ...". If information for a category is not available or not mentioned, write "Not specified" for that category.
-    '''
-    response = llm.invoke(prompt)
-    return response.content
-
+    ''', '''
+    Innovator's response:
+    {problem}
+    ''')
+
+PROBLEM_EXTRACTION_PARSER = SectionParser([
+    Field("CORE ISSUE"),
+    Field("AFFECTED STAKEHOLDERS"),
+    Field("CONTEXT OR SCOPE"),
+    Field("CURRENT IMPACT"),
+    Field("DESIRED OUTCOME"),
+    Field("ROOT CAUSES"),
+    Field("TIMEFRAME"),
+    Field("QUANTIFIABLE ASPECTS"),
+    Field("INDUSTRY OR FIELD"),
+    Field("KEY TERMS"),
+    Field("CONSTRAINTS"),
+    Field("UNIQUE ASPECTS")
+], strip_quotes=False)
+
+@parse_function("problem_extraction")
 def parse_problem_extraction(output):
-    # Initialize a dictionary to store the parsed values
-    parsed_data = {
-        "CORE ISSUE": "",
-        "AFFECTED STAKEHOLDERS": "",
-        "CONTEXT OR SCOPE": "",
-        "CURRENT IMPACT": "",
-        "DESIRED OUTCOME": "",
-        "ROOT CAUSES": "",
-        "TIMEFRAME": "",
-        "QUANTIFIABLE ASPECTS": "",
-        "INDUSTRY OR FIELD": "",
-        "KEY TERMS": "",
-        "CONSTRAINTS": "",
-        "UNIQUE ASPECTS": ""
-    }
-
-    # Split the output by lines
-    lines = output.split('\n')
+    return PROBLEM_EXTRACTION_PARSER.parse(output)
 
-    current_key = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            # Check if the line starts with any of our keys
-            for key in parsed_data.keys():
-                if line.startswith(key + ":"):
-                    current_key = key
-                    parsed_data[key] = line.split(":", 1)[1].strip()
-                    break
-            else:
-                # If no key is found, it's a continuation of the previous value
-                if current_key:
-                    parsed_data[current_key] += " " + line
-
-    return parsed_data
-
-def generate_title(llm, extracted_problem):
-    prompt = f'''
+# The guidelines and output format are the static prefix; the extracted problem comes last
+TITLE_PROMPT = register_prompt("generate_title", '''
     You are tasked with generating a Title for a problem statement of an innovator from some information provided to you by the innovator.
-    Here is some information related to a problem:
-    {extracted_problem}
-    Using these extracted elements, create a problem statement title that follows the guidelines provided below.
+    Using the extracted elements related to a problem given at the end, create a problem statement title that follows the guidelines provided below.
 
     Guidelines for creating the title:
     1. Scope indication: Include a hint about the scale or scope of the problem.
@@ -189,85 +257,64 @@ def generate_title(llm, extracted_problem):
 
     
     Note: Please follow the exact output format while answering. The Title response should be within double quotation marks. Each YES/NO evaluation should be within double quotation marks.
-    '''
-    response = llm.invoke(prompt)
-    return response.content
-def parse_title_generation(output):
-    # Initialize a dictionary to store the parsed values
-    parsed_data = {
-        "TITLE": "",
-        "EVALUATION": {
-            "SCOPE INDICATION": "",
-            "STAKEHOLDER FOCUS": "",
-            "TIMEFRAME": "",
-            "OUTCOME-ORIENTED": "",
-            "KEYWORD OPTIMIZATION": "",
-            "AVOID UNNECESSARY WORDS": "",
-            "USE ACTIVE VOICE": "",
-            "QUANTIFY IF POSSIBLE": "",
-            "AVOID QUESTIONS": "",
-            "BALANCE CREATIVITY AND CLARITY": "",
-            "CONSISTENCY": "",
-            "AVOID ABBREVIATIONS": "",
-            "CLARITY AND SIMPLICITY": "",
-            "ENGAGEMENT": "",
-            "PRECISION": "",
-            "LENGTH": "",
-            "PERSPECTIVE": ""
-        }
-    }
-
-    # Split the output by lines
-    lines = output.split('\n')
-
-    # Flag to indicate when we've reached the evaluation section
-    evaluation_section = False
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith("TITLE:"):
-            # Extract the title, removing quotation marks
-            parsed_data["TITLE"] = line.split(":", 1)[1].strip().strip('"')
-        elif line == "EVALUATION:":
-            evaluation_section = True
-        elif evaluation_section and ":" in line:
-            # Split the line into key and value
-            key, value = line.split(":", 1)
-            key = key.strip()
-            value = value.strip().strip('"')  # Remove quotation marks
-            if key in parsed_data["EVALUATION"]:
-                parsed_data["EVALUATION"][key] = value
-
-    return parsed_data
+    ''', '''
+    Here is some information related to a problem:
+    {extracted_problem}
+    ''')
 
-def check_title(llm, title):
-    guidelines = [
-        "1. Scope indication: Includes a hint about the scale or scope of the problem.",
-        "2. Stakeholder focus: Mentions key stakeholders affected by or involved in the problem.",
-        "3. Timeframe: Indicates whether it's an urgent, ongoing, or future issue.",
-        "4. Outcome-oriented: Suggests the desired result or improvement.",
-        "5. Keyword optimization: Uses relevant keywords for searchability and categorization.",
-        "6. Avoid unnecessary words: Eliminates articles and filler words when possible.",
-        "7. Use active voice: Employs active rather than passive language for directness.",
-        "8. Quantify if possible: Includes numbers or metrics if they add significant value.",
-        "9. Avoid questions: Frames the title as a statement rather than a question.",
-        "10. Balance creativity and clarity: Uses engaging language but prioritizes clarity over cleverness.",
-        "11. Consistency: Ensures the title aligns with the content of the problem statement.",
-        "12. Avoid abbreviations: Spells out terms unless universally recognized in the field.",
-        "13. Clarity and Simplicity: Ensure the title is easy to understand and free of complex jargon unless necessary.",
-        "14. Engagement: Make the title engaging to capture the reader's interest.",
-        "15. Precision: Use precise and specific language to avoid vagueness.",
-        "16. Length: Maintain a balance between brevity and informativeness, aiming for 5 to 12 words.",
-        "17. Perspective: Reflect the perspective or approach being taken, such as policy, technology, or societal impact."
-    ]
+def generate_title_prompt(extracted_problem):
+    return TITLE_PROMPT.text(extracted_problem=extracted_problem)
 
-    prompt = f'''
-    Evaluate the following title based on the given guidelines:
+@prompt_function
+def generate_title(llm, extracted_problem):
+    response = llm.invoke(TITLE_PROMPT.messages(extracted_problem=extracted_problem))
+    return response.content
 
-    TITLE: "{title}"
+# Structured variant that returns a validated TitleGeneration model
+@prompt_function
+def generate_title_structured(llm, extracted_problem):
+    return invoke_structured(llm, generate_title_prompt(extracted_problem), TitleGeneration)
+
+TITLE_GENERATION_PARSER = SectionParser([
+    Field("TITLE"),
+    Section("EVALUATION", [Field(header) for header in (
+        "SCOPE INDICATION", "STAKEHOLDER FOCUS", "TIMEFRAME", "OUTCOME-ORIENTED",
+        "KEYWORD OPTIMIZATION", "AVOID UNNECESSARY WORDS", "USE ACTIVE VOICE",
+        "QUANTIFY IF POSSIBLE", "AVOID QUESTIONS", "BALANCE CREATIVITY AND CLARITY",
+        "CONSISTENCY", "AVOID ABBREVIATIONS", "CLARITY AND SIMPLICITY", "ENGAGEMENT",
+        "PRECISION", "LENGTH", "PERSPECTIVE"
+    )])
+])
+
+@parse_function("generate_title")
+def parse_title_generation(output):
+    return TITLE_GENERATION_PARSER.parse(output)
+
+CHECK_TITLE_GUIDELINES = [
+    "1. Scope indication: Includes a hint about the scale or scope of the problem.",
+    "2. Stakeholder focus: Mentions key stakeholders affected by or involved in the problem.",
+    "3. Timeframe: Indicates whether it's an urgent, ongoing, or future issue.",
+    "4. Outcome-oriented: Suggests the desired result or improvement.",
+    "5. Keyword optimization: Uses relevant keywords for searchability and categorization.",
+    "6. Avoid unnecessary words: Eliminates articles and filler words when possible.",
+    "7. Use active voice: Employs active rather than passive language for directness.",
+    "8. Quantify if possible: Includes numbers or metrics if they add significant value.",
+    "9. Avoid questions: Frames the title as a statement rather than a question.",
+    "10. Balance creativity and clarity: Uses engaging language but prioritizes clarity over cleverness.",
+    "11. Consistency: Ensures the title aligns with the content of the problem statement.",
+    "12. Avoid abbreviations: Spells out terms unless universally recognized in the field.",
+    "13. Clarity and Simplicity: Ensure the title is easy to understand and free of complex jargon unless necessary.",
+    "14. Engagement: Make the title engaging to capture the reader's interest.",
+    "15. Precision: Use precise and specific language to avoid vagueness.",
+    "16. Length: Maintain a balance between brevity and informativeness, aiming for 5 to 12 words.",
+    "17. Perspective: Reflect the perspective or approach being taken, such as policy, technology, or societal impact."
+]
+
+CHECK_TITLE_PROMPT = register_prompt("check_title", '''
+    Evaluate the title given at the end based on the guidelines below.
 
     Guidelines:
-    {' '.join(guidelines)}
+    ''' + ' '.join(CHECK_TITLE_GUIDELINES) + '''
 
     Provide your evaluation in the following format:
 
@@ -295,42 +342,41 @@ def check_title(llm, title):
     IMPROVEMENT_SUGGESTIONS: "Provide brief suggestions for improvement if the overall evaluation is NO. If YES, write 'No improvements needed.'"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    '''
+    ''', '''
+    TITLE: "{title}"
+    ''')
 
-    response = llm.invoke(prompt)
-    return response.content
+def check_title_prompt(title):
+    return CHECK_TITLE_PROMPT.text(title=title)
 
-def parse_title_check(output):
-    parsed_data = {
-        "OVERALL_EVALUATION": "",
-        "GUIDELINE_EVALUATIONS": {},
-        "IMPROVEMENT_SUGGESTIONS": ""
-    }
+@prompt_function
+def check_title(llm, title):
+    response = llm.invoke(CHECK_TITLE_PROMPT.messages(title=title))
+    return response.content
 
-    lines = output.split('\n')
-    current_section = None
+# Structured variant that returns a validated TitleCheck model
+@prompt_function
+def check_title_structured(llm, title):
+    return invoke_structured(llm, check_title_prompt(title), TitleCheck)
 
-    for line in lines:
-        line = line.strip()
-        if line.startswith("OVERALL_EVALUATION:"):
-            parsed_data["OVERALL_EVALUATION"] = line.split(":", 1)[1].strip().strip('"')
-        elif line == "GUIDELINE_EVALUATIONS:":
-            current_section = "GUIDELINE_EVALUATIONS"
-        elif line.startswith("IMPROVEMENT_SUGGESTIONS:"):
-            parsed_data["IMPROVEMENT_SUGGESTIONS"] = line.split(":", 1)[1].strip().strip('"')
-        elif current_section == "GUIDELINE_EVALUATIONS" and ":" in line:
-            key, value = line.split(":", 1)
-            parsed_data["GUIDELINE_EVALUATIONS"][key.strip()] = value.strip().strip('"')
+TITLE_CHECK_PARSER = SectionParser([
+    Field("OVERALL_EVALUATION"),
+    Section("GUIDELINE_EVALUATIONS", open=True),
+    Field("IMPROVEMENT_SUGGESTIONS")
+])
 
-    return parsed_data
+@parse_function("check_title")
+def parse_title_check(output):
+    return TITLE_CHECK_PARSER.parse(output)
 
+@prompt_function
 def update_title(llm, title, feedback):
-    prompt = f'''
+    response = llm.invoke(UPDATE_TITLE_PROMPT.messages(title=title, feedback=feedback))
+    return response.content
+
+UPDATE_TITLE_PROMPT = register_prompt("update_title", '''
     You are tasked with understanding the sentiment of feedback and updating a title if required based on the feedback provided by the user.
-    
-    Original Title: "{title}"
-    
-    Feedback: "{feedback}"
+    The original title and the feedback are given at the end.
     
     Please respond in the following format:
 
@@ -343,39 +389,27 @@ def update_title(llm, title, feedback):
     EXPLANATION: "Brief explanation of why the title was kept or updated"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    '''
+    ''', '''
+    Original Title: "{title}"
     
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_title_update(output):
-    parsed_data = {
-        "SENTIMENT": "",
-        "ACTION": "",
-        "TITLE": "",
-        "EXPLANATION": ""
-    }
-
-    lines = output.split('\n')
+    Feedback: "{feedback}"
+    ''')
 
-    for line in lines:
-        line = line.strip()
-        if line:
-            key, value = line.split(":", 1)
-            key = key.strip()
-            value = value.strip().strip('"')
-            if key in parsed_data:
-                parsed_data[key] = value
+TITLE_UPDATE_PARSER = SectionParser([Field("SENTIMENT"), Field("ACTION"), Field("TITLE"), Field("EXPLANATION")],
+                                    skip_unknown=True)
 
-    return parsed_data
+@parse_function("update_title")
+def parse_title_update(output):
+    return TITLE_UPDATE_PARSER.parse(output)
 
+@prompt_function
 def generate_abstract(llm, title, extracted_problem):
-    prompt = f'''
+    response = llm.invoke(ABSTRACT_PROMPT.messages(title=title, extracted_problem=extracted_problem))
+    return response.content
+
+ABSTRACT_PROMPT = register_prompt("generate_abstract", '''
     You are tasked with generating an abstract for a problem statement from information provided by the innovator.
-    
-    Title: "{title}"
-    
-    Problem Information: "{extracted_problem}"
+    The title and the problem information are given at the end.
     
     Using these elements, create an abstract following the given guidelines. 
     
@@ -440,35 +474,26 @@ def generate_abstract(llm, title, extracted_problem):
     Note: Ensure all responses are within double quotes as shown in the format above. 
     ABSTRACT response should be within double quotes. ABSTRACT: "......."
     REASONING response should be within double quotes. REASONING: "......."
-    '''
+    ''', '''
+    Title: "{title}"
     
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_abstract_generation(output):
-    parsed_data = {
-        "ABSTRACT": "",
-        "REASONING": ""
-    }
-
-    lines = output.split('\n')
+    Problem Information: "{extracted_problem}"
+    ''')
 
-    for line in lines:
-        line = line.strip()
-        if line.startswith("ABSTRACT:"):
-            parsed_data["ABSTRACT"] = line.split(":", 1)[1].strip().strip('"')
-        elif line.startswith("REASONING:"):
-            parsed_data["REASONING"] = line.split(":", 1)[1].strip().strip('"')
+ABSTRACT_GENERATION_PARSER = SectionParser([Field("ABSTRACT"), Field("REASONING")])
 
-    return parsed_data
+@parse_function("generate_abstract")
+def parse_abstract_generation(output):
+    return ABSTRACT_GENERATION_PARSER.parse(output)
 
+@prompt_function
 def update_abstract(llm, abstract, feedback):
-    prompt = f'''
+    response = llm.invoke(UPDATE_ABSTRACT_PROMPT.messages(abstract=abstract, feedback=feedback))
+    return response.content
+
+UPDATE_ABSTRACT_PROMPT = register_prompt("update_abstract", '''
     You are tasked with understanding the sentiment of feedback and updating an abstract if required based on the feedback provided by the user.
-    
-    Original Abstract: "{abstract}"
-    
-    Feedback: "{feedback}"
+    The original abstract and the feedback are given at the end.
     
     Please respond in the following format:
 
@@ -481,44 +506,21 @@ def update_abstract(llm, abstract, feedback):
     EXPLANATION: "Brief explanation of why the abstract was kept or updated"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    '''
+    ''', '''
+    Original Abstract: "{abstract}"
     
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_abstract_update(output):
-    parsed_data = {
-        "SENTIMENT": "",
-        "ACTION": "",
-        "ABSTRACT": "",
-        "EXPLANATION": ""
-    }
-
-    lines = output.split('\n')
-    current_key = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-                if key in parsed_data:
-                    parsed_data[key] = value
-                    current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                parsed_data[current_key] += " " + line.strip('"')
-
-    return parsed_data
+    Feedback: "{feedback}"
+    ''')
 
+ABSTRACT_UPDATE_PARSER = SectionParser([Field("SENTIMENT"), Field("ACTION"), Field("ABSTRACT"), Field("EXPLANATION")],
+                                       skip_unknown=True)
 
-def assess_problem(llm, extracted_problem):
-    prompt = f'''
-    Analyze the following problem description and provide a classification based on its complexity and predictability:
+@parse_function("update_abstract")
+def parse_abstract_update(output):
+    return ABSTRACT_UPDATE_PARSER.parse(output)
 
-    Problem Description: "{extracted_problem}"
+ASSESS_PROBLEM_PROMPT = register_prompt("assess_problem", '''
+    Analyze the problem description given at the end and provide a classification based on its complexity and predictability.
 
     **Instructions:**
     Analyze the text to determine the level of complexity and predictability:
@@ -561,53 +563,47 @@ def assess_problem(llm, extracted_problem):
     CONFIDENCE_REASONING: "Explanation for the confidence score"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    '''
-    
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_problem_assessment(output):
-    parsed_data = {
-        "COMPLEXITY_SCORE": "",
-        "COMPLEXITY_REASONING": "",
-        "PREDICTABILITY_SCORE": "",
-        "PREDICTABILITY_REASONING": "",
-        "CLASSIFICATION": "",
-        "CLASSIFICATION_REASONING": "",
-        "CONFIDENCE_SCORE": "",
-        "CONFIDENCE_REASONING": ""
-    }
+    ''', '''
+    Problem Description: "{extracted_problem}"
+    ''')
 
-    lines = output.split('\n')
-    current_key = None
+def assess_problem_prompt(extracted_problem):
+    return ASSESS_PROBLEM_PROMPT.text(extracted_problem=extracted_problem)
 
-    for line in lines:
-        line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-                if key in parsed_data:
-                    parsed_data[key] = value
-                    current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                parsed_data[current_key] += " " + line.strip('"')
+@prompt_function
+def assess_problem(llm, extracted_problem):
+    response = llm.invoke(ASSESS_PROBLEM_PROMPT.messages(extracted_problem=extracted_problem))
+    return response.content
 
-    return parsed_data
+# Structured variant that returns a validated ProblemAssessment model
+@prompt_function
+def assess_problem_structured(llm, extracted_problem):
+    return invoke_structured(llm, assess_problem_prompt(extracted_problem), ProblemAssessment)
+
+PROBLEM_ASSESSMENT_PARSER = SectionParser([
+    Field("COMPLEXITY_SCORE"),
+    Field("COMPLEXITY_REASONING"),
+    Field("PREDICTABILITY_SCORE"),
+    Field("PREDICTABILITY_REASONING"),
+    Field("CLASSIFICATION"),
+    Field("CLASSIFICATION_REASONING"),
+    Field("CONFIDENCE_SCORE"),
+    Field("CONFIDENCE_REASONING")
+], skip_unknown=True)
+
+@parse_function("assess_problem")
+def parse_problem_assessment(output):
+    return PROBLEM_ASSESSMENT_PARSER.parse(output)
 
 # Function to explain problem classification
+@prompt_function
 def explain_problem_classification(llm, extracted_problem,problem_classification):
-    prompt = f'''
-    ## Problem Analysis
-    
-    **Problem Description:**
-    {extracted_problem}
-
-    **Problem classifications:**
-    {problem_classification}
+    response = llm.invoke(EXPLAIN_CLASSIFICATION_PROMPT.messages(extracted_problem=extracted_problem,
+                                                                 problem_classification=problem_classification))
+    return response.content
 
+# The problem analysis follows the instructions; the output heading stays last for the reply to continue
+EXPLAIN_CLASSIFICATION_PROMPT = register_prompt("explain_problem_classification", '''
     **Instructions:**
     You are tasked to reason the problem classification based on the extracted problems and the below given instructions. Make sure you include all 4 comparison parameters  to reason this classification:
 
@@ -634,27 +630,30 @@ def explain_problem_classification(llm, extracted_problem,problem_classification
     - Calculate a confidence score based on how clearly the problem fits into a quadrant
     - If confidence is low, flag for human review
 
+    The problem description and its classifications are given in the problem analysis at the end.
+    ''', '''
+    ## Problem Analysis
+    
+    **Problem Description:**
+    {extracted_problem}
+
+    **Problem classifications:**
+    {problem_classification}
+
     ## Problem Classification Output
 
     **Results:**
     - Reasons for the given problem classification are: 
-    '''
-
-    response = llm.invoke(prompt)
-    return response.content
+    ''')
 
 #Function to classify problems based on user input
+@prompt_function
 def user_enhanced_problem_classification(llm, extracted_problem,complexity,predictability):
-    prompt = f'''
-    ## Problem Analysis
-    
-    **Problem Description:**
-    {extracted_problem}
-
-    ** User input complexity and predictabilty **:
-    Complexity: {complexity}
-    Predictabilty: {predictability}
+    response = llm.invoke(USER_CLASSIFICATION_PROMPT.messages(extracted_problem=extracted_problem,
+                                                              complexity=complexity, predictability=predictability))
+    return response.content
 
+USER_CLASSIFICATION_PROMPT = register_prompt("user_enhanced_problem_classification", '''
     **Instructions:**
     You are tasked to classify the problem based on the complexity and predictability and the below given instructions:
 
@@ -666,6 +665,17 @@ def user_enhanced_problem_classification(llm, extracted_problem,complexity,predi
     - For scores falling between these ranges, classify based on the nearest quadrant or consider a hybrid classification
 
     MAKE SURE THE CLASSIFICATIONS ARE STRICTLY BASED ON THE COMPLEXITY AND PREDICTABILITY SCORES GIVEN BY THE USER ACCORDING TO THE RULES GIVEN ABOVE.
+
+    The problem description and the user's complexity and predictability are given in the problem analysis at the end.
+    ''', '''
+    ## Problem Analysis
+    
+    **Problem Description:**
+    {extracted_problem}
+
+    ** User input complexity and predictabilty **:
+    Complexity: {complexity}
+    Predictabilty: {predictability}
     
     ## Problem Classification Output
 
@@ -673,16 +683,10 @@ def user_enhanced_problem_classification(llm, extracted_problem,complexity,predi
     - Classification: 
     - Confidence Score:
     - Reasons for the given problem classification are: 
-    '''
+    ''')
 
-    response = llm.invoke(prompt)
-    return response.content
-
-def generate_assumptions(llm, extracted_problem):
-    prompt = f'''
-    You are tasked with generating assumptions for the following problem statement:
-
-    {extracted_problem}
+ASSUMPTIONS_PROMPT = register_prompt("generate_assumptions", '''
+    You are tasked with generating assumptions for the problem statement given at the end.
 
     Generate 4 assumptions that follow these guidelines:
     1. Clearly stated and justified
@@ -719,55 +723,64 @@ def generate_assumptions(llm, extracted_problem):
     UNCERTAINTY_4: "LOW" or "MEDIUM" or "HIGH"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    '''
-    
-    response = llm.invoke(prompt)
+    ''', '''
+    Problem statement:
+    {extracted_problem}
+    ''')
+
+def generate_assumptions_prompt(extracted_problem):
+    return ASSUMPTIONS_PROMPT.text(extracted_problem=extracted_problem)
+
+@prompt_function
+def generate_assumptions(llm, extracted_problem):
+    response = llm.invoke(ASSUMPTIONS_PROMPT.messages(extracted_problem=extracted_problem))
     return response.content
 
+# Structured variant that returns a validated Assumptions model
+@prompt_function
+def generate_assumptions_structured(llm, extracted_problem):
+    return invoke_structured(llm, generate_assumptions_prompt(extracted_problem), Assumptions)
+
+# 'ASSUMPTION_1:', 'ASSUMPTION 2:' or a bare 'ASSUMPTION:' opens the next assumption,
+# with no limit on the number; the RATIONALE/TYPE/UNCERTAINTY lines after it (numbered
+# or not, e.g. 'UNCERTAINTY_LEVEL:') fill it in
+ASSUMPTION_HEADER = re.compile(
+    r'(?:[-*][ \t]+)?(?:\*\*)?(?P<field>ASSUMPTION|RATIONALE|TYPE|UNCERTAINTY)(?:[ _]?\d+)?(?:_LEVEL)?'
+    r'(?:\*\*)?[ \t]*:(?:\*\*)?(?P<value>.*)')
+
+@parse_function("generate_assumptions")
 def parse_assumptions(output):
     parsed_data = {}
-    lines = output.split('\n')
-    current_key = None
-    assumption_count = 0
+    current = None
+    current_field = None
 
-    for line in lines:
+    for line in output.split('\n'):
         line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-                
-                if key.startswith("ASSUMPTION"):
-                    assumption_count += 1
-                    parsed_data[f"assumption_{assumption_count}"] = {
-                        "assumption": value,
-                        "rationale": "",
-                        "type": "",
-                        "uncertainty": ""
-                    }
-                elif key.startswith("RATIONALE"):
-                    parsed_data[f"assumption_{assumption_count}"]["rationale"] = value
-                elif key.startswith("TYPE"):
-                    parsed_data[f"assumption_{assumption_count}"]["type"] = value
-                elif key.startswith("UNCERTAINTY"):
-                    parsed_data[f"assumption_{assumption_count}"]["uncertainty"] = value
-                
-                current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                if current_key.startswith("ASSUMPTION"):
-                    parsed_data[f"assumption_{assumption_count}"]["assumption"] += " " + line.strip('"')
-                elif current_key.startswith("RATIONALE"):
-                    parsed_data[f"assumption_{assumption_count}"]["rationale"] += " " + line.strip('"')
+        if not line:
+            continue
+        match = ASSUMPTION_HEADER.match(line)
+        if match:
+            current_field = match.group("field").lower()
+            if current_field == "assumption":
+                current = {"assumption": "", "rationale": "", "type": "", "uncertainty": ""}
+                parsed_data[f"assumption_{len(parsed_data) + 1}"] = current
+            if current is not None:
+                current[current_field] = match.group("value").strip().strip('"')
+        elif ":" in line:
+            current_field = None
+        elif current is not None and current_field in ("assumption", "rationale"):
+            # A line without a colon continues the assumption or its rationale
+            current[current_field] += " " + line.strip('"')
 
     return parsed_data
-    
+
+@prompt_function
 def generate_description(llm, extracted_problem):
-    prompt = f'''
-    Generate a detailed problem description based on the following information:
+    response = llm.invoke(DESCRIPTION_PROMPT.messages(extracted_problem=extracted_problem))
+    return response.content
 
-    Problem Information: "{extracted_problem}"
+DESCRIPTION_PROMPT = register_prompt("generate_description", '''
+    Generate a detailed problem description based on the problem information given at the end.
 
     Please provide a step-by-step breakdown of the problem, addressing the following points:
 
@@ -804,41 +817,26 @@ def generate_description(llm, extracted_problem):
     STAKEHOLDER_ANALYSIS: "YES/NO"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    '''
-    
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_problem_description(output):
-    parsed_data = {
-        "DESCRIPTION": "",
-        "EVALUATION": {}
-    }
-
-    lines = output.split('\n')
-    current_section = None
-    description_parts = []
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith("DESCRIPTION:"):
-            current_section = "DESCRIPTION"
-        elif line.startswith("EVALUATION:"):
-            current_section = "EVALUATION"
-        elif current_section == "DESCRIPTION" and line:
-            description_parts.append(line.strip('"'))
-        elif current_section == "EVALUATION" and ":" in line:
-            key, value = line.split(":", 1)
-            parsed_data["EVALUATION"][key.strip()] = value.strip().strip('"')
-
-    parsed_data["DESCRIPTION"] = "\n".join(description_parts)
+    ''', '''
+    Problem Information: "{extracted_problem}"
+    ''')
 
-    return parsed_data
+PROBLEM_DESCRIPTION_PARSER = SectionParser([
+    Field("DESCRIPTION", multiline=True),
+    Section("EVALUATION", open=True)
+])
 
+@parse_function("generate_description")
+def parse_problem_description(output):
+    return PROBLEM_DESCRIPTION_PARSER.parse(output)
 
 #Funtion to suggest Problem Breadth and Depth model
+@prompt_function
 def suggest_pdb_model(llm, problem):
-    prompt = f"""
+    response = llm.invoke(PDB_MODEL_PROMPT.messages(problem=problem))
+    return response.content
+
+PDB_MODEL_PROMPT = register_prompt("suggest_pdb_model", """
     ## Instruction ##
     As an AI assistant, suggest an appropriate problem-solving model for the given problem. Choose from these options:
     
@@ -881,6 +879,7 @@ def suggest_pdb_model(llm, problem):
     SUGGESTED MODEL: "5Es"
     REASONING: "Comprehensive approach for public health initiatives, addressing multiple aspects of behavior change and policy implementation."
 
+    """, """
     Now, analyze this problem and suggest an appropriate model:
 
     Problem: {problem}
@@ -889,35 +888,21 @@ def suggest_pdb_model(llm, problem):
     NOTE: VERY IMPORTANT BOTH THE SUGGESTED MODEL and REASONING responses should be within double quotation "..."
 
     ## Response ##
-    """
-    
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_pbd_suggestion(output):
-    # Initialize a dictionary to store the parsed values
-    parsed_data = {
-        "SUGGESTED MODEL": "",
-        "REASONING": ""
-    }
+    """)
 
-    # Split the output by lines and process each line
-    lines = output.split('\n')
+PBD_SUGGESTION_PARSER = SectionParser([Field("SUGGESTED MODEL"), Field("REASONING")])
 
-    for line in lines:
-        line = line.strip()
-        if line.startswith("SUGGESTED MODEL:"):
-            parsed_data["SUGGESTED MODEL"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("REASONING:"):
-            parsed_data["REASONING"] = line.split(":")[1].strip().strip('"')
-        elif "REASONING" in parsed_data and parsed_data["REASONING"]:
-            parsed_data["REASONING"] += " " + line.strip().strip('"')
-
-    return parsed_data
+@parse_function("suggest_pdb_model")
+def parse_pbd_suggestion(output):
+    return PBD_SUGGESTION_PARSER.parse(output)
 
+@prompt_function
 def analyze_with_5w1h(llm, problem):
-    prompt = f"""
-    Analyze the following problem using the 5Ws and H model:
+    response = llm.invoke(FIVE_W_ONE_H_PROMPT.messages(problem=problem))
+    return response.content
+
+FIVE_W_ONE_H_PROMPT = register_prompt("analyze_with_5w1h", """
+    Analyze the problem given at the end using the 5Ws and H model:
 
     Before answering each question, consider the following:
 
@@ -934,8 +919,6 @@ def analyze_with_5w1h(llm, problem):
 
     For each of the 5Ws and H, provide a concise but comprehensive answer. Your analysis should be thorough, considering multiple angles and possibilities.
 
-    Problem: "{problem}"
-
     Provide your analysis in the following format:
 
     WHO: "Main answer"
@@ -965,48 +948,31 @@ def analyze_with_5w1h(llm, problem):
     SUMMARY: "Brief summary of the analysis, highlighting critical aspects, key insights, and recommendations"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    """
-    
-    response = llm.invoke(prompt)
-    return response.content
-
+    """, """
+    Problem: "{problem}"
+    """)
+
+FIVE_W_ONE_H_PARSER = SectionParser([
+    Section("WHO", [Field(header) for header in ("KEY_STAKEHOLDERS", "AFFECTED_PARTIES")], main="MAIN"),
+    Section("WHAT", [Field(header) for header in ("CORE_ISSUE", "RELATED_FACTORS")], main="MAIN"),
+    Section("WHERE", [Field(header) for header in ("PHYSICAL_LOCATIONS", "CONTEXTUAL_ENVIRONMENT")], main="MAIN"),
+    Section("WHEN", [Field(header) for header in ("TIMEFRAME", "MILESTONES")], main="MAIN"),
+    Section("WHY", [Field(header) for header in ("ROOT_CAUSES", "MOTIVATING_FACTORS")], main="MAIN"),
+    Section("HOW", [Field(header) for header in ("POTENTIAL_SOLUTIONS", "IMPLEMENTATION_CHALLENGES")], main="MAIN"),
+    Field("SUMMARY")
+], skip_unknown=True)
+
+@parse_function("analyze_with_5w1h")
 def parse_5w1h_analysis(output):
-    parsed_data = {
-        "WHO": {"MAIN": "", "KEY_STAKEHOLDERS": "", "AFFECTED_PARTIES": ""},
-        "WHAT": {"MAIN": "", "CORE_ISSUE": "", "RELATED_FACTORS": ""},
-        "WHERE": {"MAIN": "", "PHYSICAL_LOCATIONS": "", "CONTEXTUAL_ENVIRONMENT": ""},
-        "WHEN": {"MAIN": "", "TIMEFRAME": "", "MILESTONES": ""},
-        "WHY": {"MAIN": "", "ROOT_CAUSES": "", "MOTIVATING_FACTORS": ""},
-        "HOW": {"MAIN": "", "POTENTIAL_SOLUTIONS": "", "IMPLEMENTATION_CHALLENGES": ""},
-        "SUMMARY": ""
-    }
-
-    lines = output.split('\n')
-    current_section = None
-    current_subsection = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            if line in parsed_data:
-                current_section = line
-                current_subsection = "MAIN"
-            elif ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-                if current_section and key in parsed_data[current_section]:
-                    parsed_data[current_section][key] = value
-                    current_subsection = key
-            elif current_section and current_subsection:
-                parsed_data[current_section][current_subsection] += " " + line.strip('"')
-
-    return parsed_data
-
+    return FIVE_W_ONE_H_PARSER.parse(output)
 
+@prompt_function
 def analyze_with_5ps(llm, problem):
-    prompt = f"""
-    Analyze the following organizational problem or situation using the 5Ps model:
+    response = llm.invoke(FIVE_PS_PROMPT.messages(problem=problem))
+    return response.content
+
+FIVE_PS_PROMPT = register_prompt("analyze_with_5ps", """
+    Analyze the organizational problem or situation given at the end using the 5Ps model:
 
     
     Before analyzing each P, consider the following:
@@ -1025,8 +991,6 @@ def analyze_with_5ps(llm, problem):
     For each of the 5Ps, provide a concise but comprehensive analysis. Your response should be thorough, considering multiple facets of the organization.
 
 
-    Problem: "{problem}"
-
     Provide your analysis in the following format:
 
     PEOPLE: "Main analysis"
@@ -1057,44 +1021,29 @@ def analyze_with_5ps(llm, problem):
     STRATEGIC_IMPLICATIONS: "Brief summary of the analysis, highlighting critical aspects across the 5Ps, key insights, and strategic recommendations"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    """
-    
-    response = llm.invoke(prompt)
-    return response.content
-
+    """, """
+    Problem: "{problem}"
+    """)
+
+FIVE_PS_PARSER = SectionParser([
+    Section("PEOPLE", [Field(header) for header in ("KEY_PERSONNEL", "SKILLS_COMPETENCIES", "ORGANIZATIONAL_STRUCTURE")], main="MAIN"),
+    Section("PROCESS", [Field(header) for header in ("CORE_PROCESSES", "EFFICIENCY_BOTTLENECKS", "PROCESS_INTEGRATION")], main="MAIN"),
+    Section("PRODUCTS", [Field(header) for header in ("PRODUCT_PORTFOLIO", "MARKET_POSITIONING", "INNOVATION_PIPELINE")], main="MAIN"),
+    Section("PROGRAMS", [Field(header) for header in ("KEY_INITIATIVES", "RESOURCE_ALLOCATION", "PROGRAM_EFFECTIVENESS")], main="MAIN"),
+    Section("PERFORMANCE", [Field(header) for header in ("KEY_INDICATORS", "BENCHMARKING_RESULTS", "IMPROVEMENT_AREAS")], main="MAIN"),
+    Field("STRATEGIC_IMPLICATIONS")
+], skip_unknown=True)
+
+@parse_function("analyze_with_5ps")
 def parse_5ps_analysis(output):
-    parsed_data = {
-        "PEOPLE": {"MAIN": "", "KEY_PERSONNEL": "", "SKILLS_COMPETENCIES": "", "ORGANIZATIONAL_STRUCTURE": ""},
-        "PROCESS": {"MAIN": "", "CORE_PROCESSES": "", "EFFICIENCY_BOTTLENECKS": "", "PROCESS_INTEGRATION": ""},
-        "PRODUCTS": {"MAIN": "", "PRODUCT_PORTFOLIO": "", "MARKET_POSITIONING": "", "INNOVATION_PIPELINE": ""},
-        "PROGRAMS": {"MAIN": "", "KEY_INITIATIVES": "", "RESOURCE_ALLOCATION": "", "PROGRAM_EFFECTIVENESS": ""},
-        "PERFORMANCE": {"MAIN": "", "KEY_INDICATORS": "", "BENCHMARKING_RESULTS": "", "IMPROVEMENT_AREAS": ""},
-        "STRATEGIC_IMPLICATIONS": ""
-    }
+    return FIVE_PS_PARSER.parse(output)
 
-    lines = output.split('\n')
-    current_section = None
-    current_subsection = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            if line in parsed_data:
-                current_section = line
-                current_subsection = "MAIN"
-            elif ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-                if current_section and key in parsed_data[current_section]:
-                    parsed_data[current_section][key] = value
-                    current_subsection = key
-            elif current_section and current_subsection:
-                parsed_data[current_section][current_subsection] += " " + line.strip('"')
-
-    return parsed_data
+@prompt_function
 def analyze_with_5ms(llm, problem):
-    prompt = f"""
+    response = llm.invoke(FIVE_MS_PROMPT.messages(problem=problem))
+    return response.content
+
+FIVE_MS_PROMPT = register_prompt("analyze_with_5ms", """
     ## Instruction ##
     As an AI manufacturing and quality control analyst, use the 5Ms model (Man, Machine, Material, Method, Measurement) to thoroughly analyze the given production or quality control problem. This framework is crucial for identifying root causes of issues and improving manufacturing processes.
 
@@ -1110,7 +1059,7 @@ def analyze_with_5ms(llm, problem):
     9. Continuous improvement
     10. Cross-functional impacts
 
-    Problem: {problem}
+    The problem is given at the end.
 
     Provide your analysis in the following format:
 
@@ -1143,80 +1092,30 @@ def analyze_with_5ms(llm, problem):
     RECOMMENDATIONS: "Specific recommendations for process improvement and quality enhancement"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    """
-    
-    response = llm.invoke(prompt)
-    return response.content
-
+    """, """
+    Problem: {problem}
+    """)
+
+FIVE_MS_PARSER = SectionParser([
+    Section("MAN", [Field(header, header.lower()) for header in ("WORKFORCE_SKILLS", "HUMAN_FACTORS", "SHIFT_PATTERNS")], main="overall"),
+    Section("MACHINE", [Field(header, header.lower()) for header in ("EQUIPMENT_CAPABILITIES", "MAINTENANCE", "AUTOMATION")], main="overall"),
+    Section("MATERIAL", [Field(header, header.lower()) for header in ("RAW_MATERIAL", "INVENTORY", "MATERIAL_HANDLING")], main="overall"),
+    Section("METHOD", [Field(header, header.lower()) for header in ("PRODUCTION_PROCESSES", "SOPS", "OPTIMIZATION")], main="overall"),
+    Section("MEASUREMENT", [Field(header, header.lower()) for header in ("QUALITY_METRICS", "INSPECTION", "DATA_ANALYSIS")], main="overall"),
+    Field("ROOT_CAUSE"),
+    Field("RECOMMENDATIONS")
+], skip_unknown=True)
+
+@parse_function("analyze_with_5ms")
 def parse_5ms_analysis(output):
-    parsed_data = {
-        "MAN": {
-            "overall": "",
-            "workforce_skills": "",
-            "human_factors": "",
-            "shift_patterns": ""
-        },
-        "MACHINE": {
-            "overall": "",
-            "equipment_capabilities": "",
-            "maintenance": "",
-            "automation": ""
-        },
-        "MATERIAL": {
-            "overall": "",
-            "raw_material": "",
-            "inventory": "",
-            "material_handling": ""
-        },
-        "METHOD": {
-            "overall": "",
-            "production_processes": "",
-            "sops": "",
-            "optimization": ""
-        },
-        "MEASUREMENT": {
-            "overall": "",
-            "quality_metrics": "",
-            "inspection": "",
-            "data_analysis": ""
-        },
-        "ROOT_CAUSE": "",
-        "RECOMMENDATIONS": ""
-    }
+    return FIVE_MS_PARSER.parse(output)
 
-    lines = output.split('\n')
-    current_category = None
-    current_key = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-
-                if key in parsed_data:
-                    current_category = key
-                    parsed_data[key]["overall"] = value
-                elif key in ["ROOT_CAUSE", "RECOMMENDATIONS"]:
-                    parsed_data[key] = value
-                elif current_category:
-                    parsed_data[current_category][key.lower()] = value
-                current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                if current_key in ["ROOT_CAUSE", "RECOMMENDATIONS"]:
-                    parsed_data[current_key] += " " + line.strip('"')
-                elif current_category:
-                    if current_key in parsed_data[current_category]:
-                        parsed_data[current_category][current_key.lower()] += " " + line.strip('"')
-                    else:
-                        parsed_data[current_category]["overall"] += " " + line.strip('"')
-
-    return parsed_data
+@prompt_function
 def analyze_with_5es(llm, problem):
-    prompt = f"""
+    response = llm.invoke(FIVE_ES_PROMPT.messages(problem=problem))
+    return response.content
+
+FIVE_ES_PROMPT = register_prompt("analyze_with_5es", """
     ## Instruction ##
     As an AI policy and program analyst, use the 5Es model (Environment, Education, Engineering, Enforcement, Evaluation) to comprehensively analyze the given public policy, safety program, or behavior change initiative. This framework is crucial for developing, implementing, and assessing effective interventions.
 
@@ -1232,7 +1131,7 @@ def analyze_with_5es(llm, problem):
     9. Scalability
     10. Unintended consequences
 
-    Problem: {problem}
+    The problem is given at the end.
 
     Provide your analysis in the following format:
 
@@ -1264,81 +1163,29 @@ def analyze_with_5es(llm, problem):
     STRATEGIC_RECOMMENDATIONS: "Summary of key insights and specific recommendations for policy design, implementation, and assessment, including short-term actions and long-term strategies"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    """
-    
-    response = llm.invoke(prompt)
-    return response.content
-
+    """, """
+    Problem: {problem}
+    """)
+
+FIVE_ES_PARSER = SectionParser([
+    Section("ENVIRONMENT", [Field(header, header.lower()) for header in ("PHYSICAL_SOCIAL_CONTEXT", "EXISTING_POLICIES", "BARRIERS_FACILITATORS")], main="overall"),
+    Section("EDUCATION", [Field(header, header.lower()) for header in ("TARGET_AUDIENCE", "EDUCATIONAL_STRATEGIES", "KNOWLEDGE_GAPS")], main="overall"),
+    Section("ENGINEERING", [Field(header, header.lower()) for header in ("DESIGN_INTERVENTIONS", "TECH_SOLUTIONS", "INFRASTRUCTURE")], main="overall"),
+    Section("ENFORCEMENT", [Field(header, header.lower()) for header in ("REGULATORY_MEASURES", "COMPLIANCE_STRATEGIES", "INCENTIVES")], main="overall"),
+    Section("EVALUATION", [Field(header, header.lower()) for header in ("KPIS", "MONITORING_METHODS", "FEEDBACK_MECHANISMS")], main="overall"),
+    Field("STRATEGIC_RECOMMENDATIONS")
+], skip_unknown=True)
+
+@parse_function("analyze_with_5es")
 def parse_5es_analysis(output):
-    parsed_data = {
-        "ENVIRONMENT": {
-            "overall": "",
-            "physical_social_context": "",
-            "existing_policies": "",
-            "barriers_facilitators": ""
-        },
-        "EDUCATION": {
-            "overall": "",
-            "target_audience": "",
-            "educational_strategies": "",
-            "knowledge_gaps": ""
-        },
-        "ENGINEERING": {
-            "overall": "",
-            "design_interventions": "",
-            "tech_solutions": "",
-            "infrastructure": ""
-        },
-        "ENFORCEMENT": {
-            "overall": "",
-            "regulatory_measures": "",
-            "compliance_strategies": "",
-            "incentives": ""
-        },
-        "EVALUATION": {
-            "overall": "",
-            "kpis": "",
-            "monitoring_methods": "",
-            "feedback_mechanisms": ""
-        },
-        "STRATEGIC_RECOMMENDATIONS": ""
-    }
-
-    lines = output.split('\n')
-    current_category = None
-    current_key = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-
-                if key in parsed_data:
-                    current_category = key
-                    if key == "STRATEGIC_RECOMMENDATIONS":
-                        parsed_data[key] = value
-                    else:
-                        parsed_data[key]["overall"] = value
-                elif current_category and key in parsed_data[current_category]:
-                    parsed_data[current_category][key.lower()] = value
-                current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                if current_key == "STRATEGIC_RECOMMENDATIONS":
-                    parsed_data[current_key] += " " + line.strip('"')
-                elif current_category:
-                    if current_key in parsed_data[current_category]:
-                        parsed_data[current_category][current_key.lower()] += " " + line.strip('"')
-                    else:
-                        parsed_data[current_category]["overall"] += " " + line.strip('"')
-
-    return parsed_data
+    return FIVE_ES_PARSER.parse(output)
 
+@prompt_function
 def analyze_with_4ps(llm, problem):
-    prompt = f"""
+    response = llm.invoke(FOUR_PS_PROMPT.messages(problem=problem))
+    return response.content
+
+FOUR_PS_PROMPT = register_prompt("analyze_with_4ps", """
     ## Instruction ##
     As an AI marketing strategist, use the 4Ps model (Product, Price, Place, Promotion) to comprehensively analyze the given marketing challenge or opportunity. This Marketing Mix framework is crucial for developing effective marketing strategies and bringing products or services to market successfully.
 
@@ -1354,7 +1201,7 @@ def analyze_with_4ps(llm, problem):
     9. Global vs. local approach
     10. ROI and metrics
 
-    Problem: {problem}
+    The problem is given at the end.
 
     Provide your analysis in the following format:
 
@@ -1381,82 +1228,30 @@ def analyze_with_4ps(llm, problem):
     INTEGRATED_STRATEGY: "Summary of how the 4Ps interact, key insights, and specific recommendations for an integrated marketing approach, including short-term tactics and long-term strategic positioning"
 
     Note: Ensure all responses are within double quotes as shown in the format above.
-    """
-    
-    response = llm.invoke(prompt)
-    return response.content
-
-def parse_4ps_analysis(output):
-    parsed_data = {
-        "PRODUCT": {
-            "overall": "",
-            "core_features": "",
-            "product_line": "",
-            "branding": ""
-        },
-        "PRICE": {
-            "overall": "",
-            "pricing_strategy": "",
-            "discount_policies": "",
-            "payment_terms": ""
-        },
-        "PLACE": {
-            "overall": "",
-            "distribution_channels": "",
-            "market_coverage": "",
-            "inventory_logistics": ""
-        },
-        "PROMOTION": {
-            "overall": "",
-            "marketing_mix": "",
-            "key_messages": "",
-            "media_strategy": ""
-        },
-        "INTEGRATED_STRATEGY": ""
-    }
-
-    lines = output.split('\n')
-    current_category = None
-    current_key = None
-
-    for line in lines:
-        line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-
-                if key in parsed_data:
-                    current_category = key
-                    if key == "INTEGRATED_STRATEGY":
-                        parsed_data[key] = value
-                    else:
-                        parsed_data[key]["overall"] = value
-                elif current_category and key in parsed_data[current_category]:
-                    parsed_data[current_category][key.lower()] = value
-                current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                if current_key == "INTEGRATED_STRATEGY":
-                    parsed_data[current_key] += " " + line.strip('"')
-                elif current_category:
-                    if current_key in parsed_data[current_category]:
-                        parsed_data[current_category][current_key.lower()] += " " + line.strip('"')
-                    else:
-                        parsed_data[current_category]["overall"] += " " + line.strip('"')
-
-    return parsed_data
+    """, """
+    Problem: {problem}
+    """)
 
+FOUR_PS_PARSER = SectionParser([
+    Section("PRODUCT", [Field(header, header.lower()) for header in ("CORE_FEATURES", "PRODUCT_LINE", "BRANDING")], main="overall"),
+    Section("PRICE", [Field(header, header.lower()) for header in ("PRICING_STRATEGY", "DISCOUNT_POLICIES", "PAYMENT_TERMS")], main="overall"),
+    Section("PLACE", [Field(header, header.lower()) for header in ("DISTRIBUTION_CHANNELS", "MARKET_COVERAGE", "INVENTORY_LOGISTICS")], main="overall"),
+    Section("PROMOTION", [Field(header, header.lower()) for header in ("MARKETING_MIX", "KEY_MESSAGES", "MEDIA_STRATEGY")], main="overall"),
+    Field("INTEGRATED_STRATEGY")
+], skip_unknown=True)
 
+@parse_function("analyze_with_4ps")
+def parse_4ps_analysis(output):
+    return FOUR_PS_PARSER.parse(output)
 
 # Function to generate problem breadth and depth
+@prompt_function
 def generate_breadth_and_depth(llm,extracted_problems):
-    prompt = f"""
-    You are provided with  a detailed description of the problem. Use these details to generate the problem breadth and depth by answering the 5Ws and 1H.
+    response = llm.invoke(BREADTH_AND_DEPTH_PROMPT.messages(extracted_problems=extracted_problems))
+    return response.content
 
-    *Problem Description:*
-    {extracted_problems}
+BREADTH_AND_DEPTH_PROMPT = register_prompt("generate_breadth_and_depth", """
+    You are provided with  a detailed description of the problem, given at the end. Use these details to generate the problem breadth and depth by answering the 5Ws and 1H.
 
     Your task is to provide a detailed response to the following questions:
     **What:** Define the Problem Statement. This is the type of question we ask in order to narrow the problem and focus in on key issues.
@@ -1473,19 +1268,21 @@ def generate_breadth_and_depth(llm,extracted_problems):
     **How is it not a Problem?**: The how-not question is present to encourage us to think about how it is not affecting the current environment.
 
     Provide comprehensive and relevant answers based on the given domain, sub-domain, title, abstract, and description.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """, """
+    *Problem Description:*
+    {extracted_problems}
+    """)
 
 # Function to update problem depth and breadth
+@prompt_function
 def update_depth_breadth(llm,problem_breadth_depth,feedback):
-    prompt = f"""
+    response = llm.invoke(UPDATE_DEPTH_BREADTH_PROMPT.messages(problem_breadth_depth=problem_breadth_depth,
+                                                               feedback=feedback))
+    return response.content
+
+UPDATE_DEPTH_BREADTH_PROMPT = register_prompt("update_depth_breadth", """
     You are tasked with understand the sentiment of a feedback and updating the problem breadth and depth if required based on the feedback provided by the user.
-        Here is the original Title:
-        {problem_breadth_depth}
-        
-        And here is the feedback:
-        {feedback}
+        The original problem breadth and depth and the feedback are given at the end.
         
         If the feedback is positive then your response will the same problem breadth and depth, otherwise please update the problem breadth and depth according to the feedback. 
         Thus your response will be one of the following:
@@ -1493,25 +1290,29 @@ def update_depth_breadth(llm,problem_breadth_depth,feedback):
         Output:
 
         Okay then we will stick with the same Title:
-        {problem_breadth_depth}
+        [the original problem breadth and depth]
 
         or
 
         Okay here's an updated Problem breadth and depth:
         
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """, """
+        Here is the original Title:
+        {problem_breadth_depth}
+        
+        And here is the feedback:
+        {feedback}
+    """)
 
 
+@prompt_function
 def problem_landscape(llm, extracted_information):
-    prompt = f"""
-        ## CONTEXT ##
-        Here is some information about the problem:
-        {extracted_information}
+    response = llm.invoke(PROBLEM_LANDSCAPE_PROMPT.messages(extracted_information=extracted_information))
+    return response.content
 
+PROBLEM_LANDSCAPE_PROMPT = register_prompt("problem_landscape", """
         ## TASK ##
-        Your task is to create a detailed function map for the given technology/system. Identify specific past, present, and future systems, subsystems, and supersystems. A function map illustrates the relationships between systems, subsystems, and super-systems within a larger framework.
+        Your task is to create a detailed function map for the technology/system given as Your Input at the end. Identify specific past, present, and future systems, subsystems, and supersystems. A function map illustrates the relationships between systems, subsystems, and super-systems within a larger framework.
 
         Follow these guidelines:
 
@@ -1563,52 +1364,27 @@ def problem_landscape(llm, extracted_information):
         FUTURE SYSTEM: "Solid-state batteries, Graphene-based batteries, Sodium-ion batteries, Flow batteries, Aluminium-air batteries"
         FUTURE SUB SYSTEM: "Advanced electrode materials, Energy-dense electrolytes, Intelligent BMS, Rapid charging technology, Self-healing battery technologies"
 
-        Please provide highly detailed and specific components for each category in a similar format for the problem system: {extracted_information}.
-        
+        Please provide highly detailed and specific components for each category in a similar format for the problem system.
+
+    """, """
         Your Input: {extracted_information}
         Your output:
-
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
 #Function 
-def parse_problem_landscape_output(output):
-    # Initialize a dictionary to store the parsed values
-    parsed_data = {
-        "past_super_system": "",
-        "past_system": "",
-        "past_sub_system": "",
-        "present_super_system": "",
-        "present_system": "",
-        "present_sub_system": "",
-        "future_super_system": "",
-        "future_system": "",
-        "future_sub_system": ""
-    }
+PROBLEM_LANDSCAPE_PARSER = SectionParser([
+    Field(header, header.lower().replace(" ", "_"))
+    for header in (
+        "PAST SUPER SYSTEM", "PAST SYSTEM", "PAST SUB SYSTEM",
+        "PRESENT SUPER SYSTEM", "PRESENT SYSTEM", "PRESENT SUB SYSTEM",
+        "FUTURE SUPER SYSTEM", "FUTURE SYSTEM", "FUTURE SUB SYSTEM"
+    )
+])
 
-    # Split the output by lines and process each line
-    for line in output.split('\n'):
-        # Remove leading and trailing whitespace from each line
-        line = line.strip()
-        if line.startswith("PAST SUPER SYSTEM:"):
-            parsed_data["past_super_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("PAST SYSTEM:"):
-            parsed_data["past_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("PAST SUB SYSTEM:"):
-            parsed_data["past_sub_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("PRESENT SUPER SYSTEM:"):
-            parsed_data["present_super_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("PRESENT SYSTEM:"):
-            parsed_data["present_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("PRESENT SUB SYSTEM:"):
-            parsed_data["present_sub_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("FUTURE SUPER SYSTEM:"):
-            parsed_data["future_super_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("FUTURE SYSTEM:"):
-            parsed_data["future_system"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("FUTURE SUB SYSTEM:"):
-            parsed_data["future_sub_system"] = line.split(":")[1].strip().strip('"')
+@parse_function("problem_landscape")
+def parse_problem_landscape_output(output):
+    import pandas as pd
+    parsed_data = PROBLEM_LANDSCAPE_PARSER.parse(output)
     #st.write(parsed_data)
     # Create a DataFrame
     data = {
@@ -1623,10 +1399,14 @@ def parse_problem_landscape_output(output):
 
     return df,parsed_data
 
+@prompt_function
 def opportunity_breadth(llm, opportunity):
-    prompt = f"""
+    response = llm.invoke(OPPORTUNITY_BREADTH_PROMPT.messages(opportunity=opportunity))
+    return response.content
+
+OPPORTUNITY_BREADTH_PROMPT = register_prompt("opportunity_breadth", """
     ## Instruction ##
-    Conduct a thorough Opportunity Breadth analysis for the following opportunity: {opportunity}
+    Conduct a thorough Opportunity Breadth analysis for the opportunity given at the end.
 
     1. Future-Oriented PESTEL:
        Analyze Political, Economic, Social, Technological, Environmental, and Legal factors, focusing on emerging trends and potential future states. For each factor, identify potential unmet customer needs or jobs-to-be-done.
@@ -1732,16 +1512,19 @@ def opportunity_breadth(llm, opportunity):
        - Qualification Criteria: Regions with <50% public transport coverage, >30% population below poverty line
          Innovation Avenue: Create a rural-focused AV platform with local manufacturing and maintenance
 
+    """, """
     Now, provide a similar analysis for the given opportunity: {opportunity}
     Follow the same structure and level of detail as the example.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
+@prompt_function
 def opportunity_depth(llm, opportunity):
-    prompt = f"""
+    response = llm.invoke(OPPORTUNITY_DEPTH_PROMPT.messages(opportunity=opportunity))
+    return response.content
+
+OPPORTUNITY_DEPTH_PROMPT = register_prompt("opportunity_depth", """
     ## Instruction ##
-    Conduct a thorough Opportunity Depth analysis for the following opportunity: {opportunity}
+    Conduct a thorough Opportunity Depth analysis for the opportunity given at the end.
 
     1. Need Connection and Impact Assessment:
        - Identify and list the specific needs this opportunity addresses
@@ -1869,22 +1652,21 @@ def opportunity_depth(llm, opportunity):
          b) Potential job displacement in traditional transportation sector
             Mitigation: Develop retraining programs and create new jobs in AV maintenance and operations
 
+    """, """
     Now, provide a similar analysis for the given opportunity: {opportunity}
     Follow the same structure and level of detail as the example.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
+@prompt_function
 def opportunity_synthesize(llm, breadth_analysis, depth_analysis, opportunity):
-    prompt = f"""
-    ## Instruction ##
-    Synthesize insights from the following breadth and depth analyses for the opportunity: {opportunity}
-
-    Breadth Analysis:
-    {breadth_analysis}
+    response = llm.invoke(OPPORTUNITY_SYNTHESIS_PROMPT.messages(breadth_analysis=breadth_analysis,
+                                                                depth_analysis=depth_analysis,
+                                                                opportunity=opportunity))
+    return response.content
 
-    Depth Analysis:
-    {depth_analysis}
+OPPORTUNITY_SYNTHESIS_PROMPT = register_prompt("opportunity_synthesize", """
+    ## Instruction ##
+    Synthesize insights from the following breadth and depth analyses, given at the end with the opportunity they cover.
 
     Based on these analyses:
     1. Identify the most promising aspects of this opportunity for breakthrough and radical innovations.
@@ -1925,16 +1707,23 @@ def opportunity_synthesize(llm, breadth_analysis, depth_analysis, opportunity):
     e) Relevant Time Horizon: Mid-term (3-7 years) to Long-term (7+ years), with gradual implementation starting in controlled environments and expanding over time.
 
     Provide a similar comprehensive analysis for the given opportunity.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """, """
+    Opportunity: {opportunity}
+
+    Breadth Analysis:
+    {breadth_analysis}
+
+    Depth Analysis:
+    {depth_analysis}
+    """)
+@prompt_function
 def opportunity_prepare_for_landscape(llm, synthesis, opportunity):
-    prompt = f"""
-    ## Instruction ##
-    Based on the following synthesis for the opportunity '{opportunity}', prepare insights in a format that can be easily mapped onto the Opportunity Landscape (9 windows) in the next stage.
+    response = llm.invoke(OPPORTUNITY_PRE_LANDSCAPE_PROMPT.messages(synthesis=synthesis, opportunity=opportunity))
+    return response.content
 
-    Synthesis:
-    {synthesis}
+OPPORTUNITY_PRE_LANDSCAPE_PROMPT = register_prompt("opportunity_prepare_for_landscape", """
+    ## Instruction ##
+    Based on the synthesis for the opportunity given at the end, prepare insights in a format that can be easily mapped onto the Opportunity Landscape (9 windows) in the next stage.
 
     Create a structured summary with the following aspects:
 
@@ -1969,27 +1758,19 @@ def opportunity_prepare_for_landscape(llm, synthesis, opportunity):
     RISK_LEVEL: "High"
 
     Provide a similar summary for the given opportunity, ensuring all aspects are covered in detail.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """, """
+    Opportunity: '{opportunity}'
 
-def parse_opportunity_pre_landscape(output):
-    parsed_data = {}
-    lines = output.split('\n')
-    current_key = None
+    Synthesis:
+    {synthesis}
+    """)
 
-    for line in lines:
-        line = line.strip()
-        if line:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip().strip('"')
-                parsed_data[key] = value
-                current_key = key
-            elif current_key:
-                # If there's no colon, it's a continuation of the previous value
-                parsed_data[current_key] += " " + line.strip('"')
+OPPORTUNITY_PRE_LANDSCAPE_PARSER = SectionParser([], open=True)
+
+@parse_function("opportunity_prepare_for_landscape")
+def parse_opportunity_pre_landscape(output):
+    import pandas as pd
+    parsed_data = OPPORTUNITY_PRE_LANDSCAPE_PARSER.parse(output)
 
     # Convert the parsed data to a DataFrame
     df = pd.DataFrame(list(parsed_data.items()), columns=['Aspect', 'Details'])
@@ -2000,14 +1781,14 @@ def parse_opportunity_pre_landscape(output):
     # Return the parsed data as JSON
     return parsed_data
 
+@prompt_function
 def opportunity_landscape(llm, extracted_information):
-    prompt = f"""
-        ## CONTEXT ##
-        Here is some information about the opportunity:
-        {extracted_information}
+    response = llm.invoke(OPPORTUNITY_LANDSCAPE_PROMPT.messages(extracted_information=extracted_information))
+    return response.content
 
+OPPORTUNITY_LANDSCAPE_PROMPT = register_prompt("opportunity_landscape", """
         ## TASK ##
-        Your task is to create a detailed Opportunity Landscape analysis using the 9 Windows approach for the given opportunity. This analysis will explore the opportunity across different system levels and time frames, considering various aspects as outlined in the guidelines below.
+        Your task is to create a detailed Opportunity Landscape analysis using the 9 Windows approach for the opportunity given as Your Input at the end. This analysis will explore the opportunity across different system levels and time frames, considering various aspects as outlined in the guidelines below.
 
         Follow these guidelines:
 
@@ -2126,67 +1907,30 @@ def opportunity_landscape(llm, extracted_information):
         Present: "Advanced sensor suite (LIDAR, high-res cameras, radar). Machine learning algorithms for complex decision making. Improved processing with edge computing. High-definition mapping of some Indian roads."
         Future: "Next-gen sensors with higher accuracy, lower cost. Advanced AI with real-time learning and adaptation. Quantum computing for complex traffic optimization. Seamless integration with smart infrastructure."
 
+    """, """
         Your Input: {extracted_information}
         Your output:
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
+
+OPPORTUNITY_LANDSCAPE_PARSER = SectionParser([
+    Section("SYSTEM DEFINITION", [Field("Core Opportunity", "core"), Field("Broader Context", "context"), Field("Component Parts", "components")], key="system_definition"),
+    Section("SUPER-SYSTEM", [Field("Past", "past"), Field("Present", "present"), Field("Future", "future")], key="super_system"),
+    Section("SYSTEM", [Field("Past", "past"), Field("Present", "present"), Field("Future", "future")], key="system"),
+    Section("SUB-SYSTEM", [Field("Past", "past"), Field("Present", "present"), Field("Future", "future")], key="sub_system"),
+    Section("REGULATORY ENVIRONMENT", [Field("Past", "past"), Field("Present", "present"), Field("Future", "future")], key="regulatory_environment"),
+    Section("MARKET READINESS", [Field("Past", "past"), Field("Present", "present"), Field("Future", "future")], key="market_readiness"),
+    Section("INFRASTRUCTURE READINESS", [Field("Past", "past"), Field("Present", "present"), Field("Future", "future")], key="infrastructure_readiness"),
+    Field("INTERACTIONS AND PATTERNS", "interactions_patterns"),
+    Field("OPPORTUNITY IDENTIFICATION", "opportunity_identification"),
+    Field("CONSTRAINTS AND ENABLERS", "constraints_enablers"),
+    Field("SYNTHESIS", "synthesis")
+])
 
 # Function to parse the output
+@parse_function("opportunity_landscape")
 def parse_opportunity_landscape_output(output):
-    # Initialize a dictionary to store the parsed values
-    parsed_data = {
-        "system_definition": {"core": "", "context": "", "components": ""},
-        "super_system": {"past": "", "present": "", "future": ""},
-        "system": {"past": "", "present": "", "future": ""},
-        "sub_system": {"past": "", "present": "", "future": ""},
-        "regulatory_environment": {"past": "", "present": "", "future": ""},
-        "market_readiness": {"past": "", "present": "", "future": ""},
-        "infrastructure_readiness": {"past": "", "present": "", "future": ""},
-        "interactions_patterns": "",
-        "opportunity_identification": "",
-        "constraints_enablers": "",
-        "synthesis": ""
-    }
-
-    # Split the output by lines and process each line
-    current_section = ""
-    for line in output.split('\n'):
-        line = line.strip()
-        if line.startswith("SYSTEM DEFINITION:"):
-            current_section = "system_definition"
-        elif line.startswith("Core Opportunity:"):
-            parsed_data["system_definition"]["core"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("Broader Context:"):
-            parsed_data["system_definition"]["context"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("Component Parts:"):
-            parsed_data["system_definition"]["components"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("SUPER-SYSTEM:"):
-            current_section = "super_system"
-        elif line.startswith("SYSTEM:"):
-            current_section = "system"
-        elif line.startswith("SUB-SYSTEM:"):
-            current_section = "sub_system"
-        elif line.startswith("REGULATORY ENVIRONMENT:"):
-            current_section = "regulatory_environment"
-        elif line.startswith("MARKET READINESS:"):
-            current_section = "market_readiness"
-        elif line.startswith("INFRASTRUCTURE READINESS:"):
-            current_section = "infrastructure_readiness"
-        elif line.startswith("Past:") and current_section:
-            parsed_data[current_section]["past"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("Present:") and current_section:
-            parsed_data[current_section]["present"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("Future:") and current_section:
-            parsed_data[current_section]["future"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("INTERACTIONS AND PATTERNS:"):
-            parsed_data["interactions_patterns"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("OPPORTUNITY IDENTIFICATION:"):
-            parsed_data["opportunity_identification"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("CONSTRAINTS AND ENABLERS:"):
-            parsed_data["constraints_enablers"] = line.split(":")[1].strip().strip('"')
-        elif line.startswith("SYNTHESIS:"):
-            parsed_data["synthesis"] = line.split(":")[1].strip().strip('"')
+    import pandas as pd
+    parsed_data = OPPORTUNITY_LANDSCAPE_PARSER.parse(output)
 
     # Create DataFrames
     main_df = pd.DataFrame({
@@ -2212,10 +1956,9 @@ def parse_opportunity_landscape_output(output):
 
     return main_df, additional_info_df, parsed_data
 
-def breakthrough_opportunity_analysis(llm, opportunity):
-    prompt = f"""
+BREAKTHROUGH_ANALYSIS_PROMPT = register_prompt("breakthrough_opportunity_analysis", """
     ## Instruction ##
-    Conduct a comprehensive Breakthrough Opportunity Analysis for the following innovation opportunity: {opportunity}
+    Conduct a comprehensive Breakthrough Opportunity Analysis for the innovation opportunity given at the end.
 
     Evaluate the opportunity's potential to create significant, transformative change in its industry or market. Provide a detailed assessment for each of the following criteria:
 
@@ -2339,12 +2082,26 @@ def breakthrough_opportunity_analysis(llm, opportunity):
     3. Initiate R&D on India-specific AI algorithms for autonomous driving
     4. Plan pilot projects in controlled environments
 
+    """, """
     Now, provide a similar analysis for the given opportunity: {opportunity}
     Follow the same structure and level of detail as the example.
-    """
-    response = llm.invoke(prompt)
+    """)
+
+def breakthrough_opportunity_analysis_prompt(opportunity):
+    return BREAKTHROUGH_ANALYSIS_PROMPT.messages(opportunity=opportunity)
+
+@prompt_function
+def breakthrough_opportunity_analysis(llm, opportunity):
+    response = llm.invoke(breakthrough_opportunity_analysis_prompt(opportunity))
     return response.content
 
+# Streaming variant that yields the analysis token by token
+@prompt_function
+def stream_breakthrough_opportunity_analysis(llm, opportunity):
+    for chunk in llm.stream(breakthrough_opportunity_analysis_prompt(opportunity)):
+        yield chunk.content
+
+@parse_function("breakthrough_opportunity_analysis")
 def parse_breakthrough_analysis(analysis):
     # Initialize a dictionary to store the parsed results
     parsed_results = {
@@ -2388,10 +2145,9 @@ def parse_breakthrough_analysis(analysis):
 
     return parsed_results
 
-def future_wheel_analysis(llm, opportunity):
-    prompt = f"""
+FUTURE_WHEEL_PROMPT = register_prompt("future_wheel_analysis", """
     ## Instruction ##
-    Conduct a comprehensive Future Wheel Analysis for the following innovation opportunity: {opportunity}
+    Conduct a comprehensive Future Wheel Analysis for the innovation opportunity given at the end.
 
     Explore the potential consequences and ripple effects of implementing this innovation. Follow this structure:
 
@@ -2475,16 +2231,33 @@ def future_wheel_analysis(llm, opportunity):
        - Managing energy use and supporting traditional farming communities will be crucial challenges
        - Further research needed on optimizing energy efficiency in vertical farms and integrating them into urban infrastructure
 
+    """, """
     Now, provide a similar analysis for the given opportunity: {opportunity}
     Follow the same structure and level of detail as the example.
-    """
-    response = llm.invoke(prompt)
+    """)
+
+def future_wheel_analysis_prompt(opportunity):
+    return FUTURE_WHEEL_PROMPT.messages(opportunity=opportunity)
+
+@prompt_function
+def future_wheel_analysis(llm, opportunity):
+    response = llm.invoke(future_wheel_analysis_prompt(opportunity))
     return response.content
 
+# Streaming variant that yields the analysis token by token
+@prompt_function
+def stream_future_wheel_analysis(llm, opportunity):
+    for chunk in llm.stream(future_wheel_analysis_prompt(opportunity)):
+        yield chunk.content
+
 #Funtions to create function map updated.
+@prompt_function
 def identify_useful_function_map(llm, components):
-    prompt = f"""
-    Create a detailed Useful Function Map for the given system components. Follow these steps:
+    response = llm.invoke(USEFUL_FUNCTION_MAP_PROMPT.messages(components=components))
+    return response.content
+
+USEFUL_FUNCTION_MAP_PROMPT = register_prompt("identify_useful_function_map", """
+    Create a detailed Useful Function Map for the system components given at the end. Follow these steps:
 
     1. Use the provided components to create a matrix where both rows and columns are labeled with these components.
     2. For each interaction between components, identify only the useful functions (UF). Think very carefully about all possible useful functions.
@@ -2514,16 +2287,19 @@ def identify_useful_function_map(llm, components):
 
     This example demonstrates the ideal format and level of detail we're aiming for. Your task is to create a similar matrix using the provided components, identifying only useful functions for each interaction.
 
+    """, """
     Components: {components}
 
     Please provide the Useful Function Map in a markdown table format similar to the example above, using the given components.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
+@prompt_function
 def identify_harmful_function_map(llm, components):
-    prompt = f"""
-    Create a detailed Harmful Function Map for the given system components. Follow these steps:
+    response = llm.invoke(HARMFUL_FUNCTION_MAP_PROMPT.messages(components=components))
+    return response.content
+
+HARMFUL_FUNCTION_MAP_PROMPT = register_prompt("identify_harmful_function_map", """
+    Create a detailed Harmful Function Map for the system components given at the end. Follow these steps:
 
     1. Use the provided components to create a matrix where both rows and columns are labeled with these components.
     2. For each interaction between components, identify only the harmful functions (HF). Think very carefully about all possible harmful functions.
@@ -2553,22 +2329,24 @@ def identify_harmful_function_map(llm, components):
 
     This example demonstrates the ideal format and level of detail we're aiming for. Your task is to create a similar matrix using the provided components, identifying only harmful functions for each interaction.
 
+    """, """
     Components: {components}
 
     Please provide the Harmful Function Map in a markdown table format similar to the example above, using the given components.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
 #Function to use CREATE think model for Ideas.
+@prompt_function
 def create_adjacent_domain_prompt(llm, idea):
-    prompt = f"""
+    response = llm.invoke(ADJACENT_DOMAIN_PROMPT.messages(idea=idea))
+    return response.content
+
+ADJACENT_DOMAIN_PROMPT = register_prompt("create_adjacent_domain_prompt", """
     Let's explore ways to enhance and reimagine your product idea using the CREATE method. We'll go through each step together, considering both intuitive insights and creative suggestions.
 
     WHEN YOU ARE FRAMING YOUR ANSWER THINK OF ADJACENTS DOMAIN OF THE FOLLOWING IDEA AND USE DATA FROM ADJACENT DOMAINS TO ANSWER THE GIVEN POINTS.
     
-    Your product idea:
-    {idea}
+    Your product idea is given at the end.
 
     For each CREATE step, we'll consider:
     1. Intuitive insights: What naturally comes to mind when thinking about this aspect?
@@ -2699,23 +2477,25 @@ def create_adjacent_domain_prompt(llm, idea):
     - Intuitive insights: Grid storage, renewable energy projects, portable power.
     - Creative suggestions: Electric farm equipment, smart home integration, public transportation applications.
 
+    
+    
+    """, """
     ##Your input : {idea}
     Your output:
 
     Give output in markdown format.
-    
-    
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
 #Function to use CREATE think model for Ideas.
+@prompt_function
 def create_same_domain_prompt(llm, idea):
-    prompt = f"""
+    response = llm.invoke(SAME_DOMAIN_PROMPT.messages(idea=idea))
+    return response.content
+
+SAME_DOMAIN_PROMPT = register_prompt("create_same_domain_prompt", """
     Let's explore ways to enhance and reimagine your product idea using the CREATE method. We'll go through each step together, considering both intuitive insights and creative suggestions.
 
-    Your product idea:
-    {idea}
+    Your product idea is given at the end.
 
     For each CREATE step, we'll consider:
     1. Intuitive insights: What naturally comes to mind when thinking about this aspect?
@@ -2845,19 +2625,17 @@ def create_same_domain_prompt(llm, idea):
     - Creative suggestions: Marine and aerospace applications, compact emergency power systems."
 
 
+    """, """
     ##Your input : {idea}
     Your output:
 
     Give output in markdown format.
-    """
-    response = llm.invoke(prompt)
-    return response.content
+    """)
 
 #Function to do Attribute Analysis
-def attribute_analysis(llm, idea):
-    prompt = f"""
+ATTRIBUTE_ANALYSIS_PROMPT = register_prompt("attribute_analysis", """
         ## Instruction ##
-        Conduct a comprehensive and innovative attribute analysis for the following idea: {idea}
+        Conduct a comprehensive and innovative attribute analysis for the idea given at the end.
 
         Follow these detailed steps:
         1. Identify 4 main categories of attributes relevant to the idea.
@@ -3055,18 +2833,29 @@ def attribute_analysis(llm, idea):
         Summary:
         These combinations demonstrate a progression from current market-ready solutions to highly innovative concepts. They address various user needs, from sustainability and productivity to health monitoring and futuristic interactions. The analysis highlights the potential impact on different user groups and industries, while also considering technological trends and ethical implications. As smartphone technology continues to evolve, these combinations suggest potential directions for innovation, emphasizing the importance of balancing functionality, user experience, and societal impact.
 
+        """, """
         Use this example as a guide to create a similar attribute analysis for: {idea}
 
         ## End Instruction ##
-        """
+        """)
 
-    response = llm.invoke(prompt)
+def attribute_analysis_prompt(idea):
+    return ATTRIBUTE_ANALYSIS_PROMPT.messages(idea=idea)
+
+@prompt_function
+def attribute_analysis(llm, idea):
+    response = llm.invoke(attribute_analysis_prompt(idea))
     return response.content
 
-def morphological_analysis(llm, idea):
-    prompt = f"""
+# Streaming variant that yields the analysis token by token
+@prompt_function
+def stream_attribute_analysis(llm, idea):
+    for chunk in llm.stream(attribute_analysis_prompt(idea)):
+        yield chunk.content
+
+MORPHOLOGICAL_ANALYSIS_PROMPT = register_prompt("morphological_analysis", """
         ## Instruction ##
-        Conduct a comprehensive and innovative morphological analysis for the following idea: {idea}
+        Conduct a comprehensive and innovative morphological analysis for the idea given at the end.
 
         Follow these detailed steps:
         1. Identify 4 main categories of attributes relevant to the idea.
@@ -3241,18 +3030,34 @@ def morphological_analysis(llm, idea):
         Conclude your Morphological Analysis with a summary of the key insights gained and the potential impact of these innovative combinations on the chosen product, service, or technology.
 
         ## End Instruction ##
-        """
+        """, """
+        Idea: {idea}
+        """)
 
-    response = llm.invoke(prompt)
+def morphological_analysis_prompt(idea):
+    return MORPHOLOGICAL_ANALYSIS_PROMPT.messages(idea=idea)
+
+@prompt_function
+def morphological_analysis(llm, idea):
+    response = llm.invoke(morphological_analysis_prompt(idea))
     return response.content
 
+# Streaming variant that yields the analysis token by token
+@prompt_function
+def stream_morphological_analysis(llm, idea):
+    for chunk in llm.stream(morphological_analysis_prompt(idea)):
+        yield chunk.content
+
 
 # Function to prepare constraints
+@prompt_function
 def generate_constraints(llm, extracted_problem):
-    prompt = f'''
+    response = llm.invoke(CONSTRAINTS_PROMPT.messages(extracted_problem=extracted_problem))
+    return response.content
+
+CONSTRAINTS_PROMPT = register_prompt("generate_constraints", '''
         You are tasked with generating constraints for a problem statement from some information provided to you by the innovator.
-        Here are some information related to a problem. 
-        {extracted_problem} 
+        The information related to the problem is given at the end.
         Using these extracted elements, create constraints that follow these guidelines:
 
         1. Identifies limiting factors clearly:
@@ -3280,17 +3085,21 @@ def generate_constraints(llm, extracted_problem):
         - Safety Constraint: "The technology must meet industry safety standards to prevent accidents."
         - Scalability Constraint: "The solution should be scalable to accommodate future population growth."
 
+    ''', '''
+        Here are some information related to a problem. 
+        {extracted_problem} 
         Please generate specific constraints based on the problem statement provided.
-    '''
-    response = llm.invoke(prompt)
-    return response.content
+    ''')
 
 # Function to prepare risks
+@prompt_function
 def generate_risks(llm, extracted_problem):
-    prompt = f'''
+    response = llm.invoke(RISKS_PROMPT.messages(extracted_problem=extracted_problem))
+    return response.content
+
+RISKS_PROMPT = register_prompt("generate_risks", '''
         You are tasked with generating risks for a problem statement from some information provided to you by the innovator.
-        Here are some information related to a problem. 
-        {extracted_problem} 
+        The information related to the problem is given at the end.
         Using these extracted elements, create risks that follow these guidelines:
 
         1. Clearly identified and categorized:
@@ -3322,14 +3131,19 @@ def generate_risks(llm, extracted_problem):
         Operational Risk: "System downtime during peak traffic hours, impacting service reliability."
         Mitigation: Redundancy planning and regular maintenance schedules to minimize downtime.
 
+    ''', '''
+        Here are some information related to a problem. 
+        {extracted_problem} 
         Please generate specific risks based on the problem statement provided.
-    '''
-    response = llm.invoke(prompt)
-    return response.content
+    ''')
 
 
+@prompt_function
 def market_analysis(llm, idea, market_data):
-    prompt = f"""
+    response = llm.invoke(MARKET_ANALYSIS_PROMPT.messages(idea=idea, market_data=market_data))
+    return response.content
+
+MARKET_ANALYSIS_PROMPT = register_prompt("market_analysis", """
     ## Instruction ##
     Analyze and summarize the provided market data according to the following components, using inline citations where possible:
 
@@ -3346,17 +3160,343 @@ def market_analysis(llm, idea, market_data):
 
     Use inline citations in the format (Source "URL") where X is the URL of the source document. For example, (Source www.xyz.com) for information for the mentioned point.
 
+    """, """
     This is the domain whose market has to be searched: {idea}
 
     Market Data:
     {market_data}
 
     Your analysis should be clear, data-driven, and actionable for business decision-making. Ensure to cite the sources for key information and statistics where possible.
-    """
+    """)
+
 
-    response = llm.invoke(prompt)
+@prompt_function
+def summarize_market_source(llm, source):
+    response = llm.invoke(SUMMARIZE_MARKET_SOURCE_PROMPT.messages(source=source))
     return response.content
 
+SUMMARIZE_MARKET_SOURCE_PROMPT = register_prompt("summarize_market_source", """
+    ## Instruction ##
+    Condense the market source below into a compact fact sheet.
+
+    Extract only facts stated in the source that bear on these components:
+    Market size; Sales analysis; Geographic location; Market segmentation; Demographic description;
+    Analysis of market demand; Competition in the market; Consumer insights & requirements.
+
+    Use the format:
+    COMPONENT: fact; fact; fact
+
+    Keep numbers, dates, company names and units exactly as written. Leave out components the source says nothing about.
+    Do not add information that is not in the source. Keep the fact sheet under 200 words.
+
+    """, """
+    Source:
+    {source}
+    """)
+
+
+@prompt_function
+def reduce_market_analysis(llm, idea, fact_sheets):
+    response = llm.invoke(REDUCE_MARKET_ANALYSIS_PROMPT.messages(idea=idea, fact_sheets=fact_sheets))
+    return response.content
+
+REDUCE_MARKET_ANALYSIS_PROMPT = register_prompt("reduce_market_analysis", """
+    ## Instruction ##
+    Analyze and summarize the market using the fact sheets below, one per source, according to the following components, using inline citations where possible:
+
+    1. Market size: Estimate the total market size based on the given data.
+    2. Sales analysis: Examine sales trends, patterns, and key performance indicators.
+    3. Geographic location: Identify key regions or areas of interest in the market.
+    4. Market segmentation: Divide the market into distinct groups based on shared characteristics.
+    5. Demographic description: Describe the key demographic factors of the target market.
+    6. Analysis of market demand: Evaluate current and projected demand for products or services.
+    7. Competition in the market: Identify major competitors and assess their market positions.
+    8. Consumer insights & requirements: Highlight key consumer needs, preferences, and behaviors.
+
+    Provide a concise summary for each component. Where fact sheets disagree, say so and cite both. If any component lacks sufficient information, mention that the data is limited or unavailable for that aspect.
+
+    Use inline citations in the format (Source "URL") where URL is the SOURCE line of the fact sheet the information came from. For example, (Source www.xyz.com) for information for the mentioned point.
+
+    """, """
+    This is the domain whose market has to be searched: {idea}
+
+    Fact Sheets:
+    {fact_sheets}
+
+    Your analysis should be clear, data-driven, and actionable for business decision-making. Ensure to cite the sources for key information and statistics where possible.
+    """)
+
+
+# Market analysis budgets, overridable from an optional [market] secrets section:
+# CONTEXT_TOKENS caps the single-pass market_data context and PASSAGE_TOKENS the ranked
+# passages in it; MAP_SOURCE_TOKENS is the per-source budget of the map-reduce mode.
+# Sources at least NEAR_DUPLICATE_THRESHOLD similar (estimated Jaccard over word
+# shingles) are treated as copies of one another; 0 turns the check off.
+# WATCH_PATH holds the state of ideas refreshed incrementally and SUMMARY_CACHE_PATH
+# the per-source fact sheets shared by every idea; with REUSE_SUMMARIES the single-pass
+# analysis also reads a source's fact sheet in place of its passages when there is one.
+MARKET_DEFAULTS = {
+    "CONTEXT_TOKENS": 16000,
+    "SOURCE_TOKENS": None,
+    "PASSAGE_TOKENS": 6000,
+    "PASSAGE_WORDS": DEFAULT_PASSAGE_WORDS,
+    "MAP_SOURCE_TOKENS": 3000,
+    "ENCODING": DEFAULT_ENCODING,
+    "NEAR_DUPLICATE_THRESHOLD": DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    "WATCH_PATH": ".cache/market_watch.sqlite3",
+    "SUMMARY_CACHE_PATH": ".cache/source_summaries.sqlite3",
+    "REUSE_SUMMARIES": True,
+}
+
+# Retrieval queries for the eight components market_analysis reports on
+MARKET_COMPONENT_QUERIES = [
+    "market size total addressable market value revenue billion million valuation CAGR",
+    "sales trends growth units sold revenue performance KPI quarter year",
+    "region regional geographic country North America Europe Asia Pacific",
+    "market segmentation segment type application end user category",
+    "demographic age income gender consumers population households",
+    "demand forecast projected growth adoption drivers outlook",
+    "competitors competition market share leading companies players startups",
+    "consumer needs preferences behavior requirements pain points survey",
+]
+
+def get_market_settings():
+    settings = dict(MARKET_DEFAULTS)
+    settings.update(st.secrets.get("market", {}))
+    return settings
+
+@st.cache_resource
+def get_market_watch():
+    _resources["market_watch"] = MarketWatch(get_market_settings()["WATCH_PATH"])
+    return _resources["market_watch"]
+
+def market_watch_stats():
+    return _resource_stats("market_watch")
+
+@st.cache_resource
+def get_summary_cache():
+    _resources["summary_cache"] = SourceSummaryCache(get_market_settings()["SUMMARY_CACHE_PATH"])
+    return _resources["summary_cache"]
+
+def summary_cache_stats():
+    return _resource_stats("summary_cache")
+
+def get_market_packer(settings=None):
+    settings = settings or get_market_settings()
+    per_source_tokens = settings["SOURCE_TOKENS"]
+    return ContextPacker(int(settings["CONTEXT_TOKENS"]),
+                         per_source_tokens=int(per_source_tokens) if per_source_tokens else None,
+                         encoding=get_encoding(settings["ENCODING"]))
+
+# Facets searched alongside the main query in fan-out mode
+MARKET_FACETS = [
+    "market size, growth rate and forecast",
+    "competitors, market share and leading companies",
+    "customer demographics and target segments",
+    "regional markets and geographic demand",
+    "consumer needs, pain points and buying behaviour",
+    "pricing, sales and revenue trends",
+]
+
+def market_facet_queries(idea):
+    return [f"{idea}: {facet}" for facet in MARKET_FACETS]
+
+# Function to run the market searches for an idea. With fanout the idea is also
+# searched once per market facet, concurrently. start_published_date limits the
+# results to documents published on or after that date; fresh skips the Exa cache
+# and the local store. Stored documents only answer when they are about the idea
+# itself, not merely about markets.
+def search_market(idea, fanout=True, start_published_date=None, fresh=False):
+    prompt = f"""
+    Here is an idea: {idea}. 
+    Give me market trends, opportunities, and competition for this idea for the current market for this idea.
+    """
+    if fanout:
+        return search_fanout([prompt] + market_facet_queries(idea), start_published_date=start_published_date,
+                             fresh=fresh, topic=idea)
+    return search_and_extract(prompt, start_published_date=start_published_date, fresh=fresh, topic=idea)
+
+# Function to keep one copy of every syndicated source. Returns (data, citations)
+# where citations[i] lists the URLs data[i] was also published at.
+def collapse_market_sources(data, settings):
+    threshold = float(settings["NEAR_DUPLICATE_THRESHOLD"])
+    if not threshold:
+        return data, [[] for _ in data]
+    data, citations = collapse_near_duplicates(data, threshold)
+    return data, [urls[1:] for urls in citations]
+
+def market_source_header(d, also_published_at=(), label="Text"):
+    also = f"\n        \nAlso published at: {', '.join(also_published_at)}" if also_published_at else ""
+    return f"""\n Market Content 
+        \nTitle:{d.title} 
+        \nDate: {d.published_date}
+        \nAuthor: {d.author}
+        \nURL: {d.url}{also}
+        \n{label}: """
+
+# Function to chunk the fetched texts and rank the passages against the idea and the
+# eight market components (idea None ranks against the components alone). The best
+# passages are taken until `budget` tokens are used, across all sources or, with
+# per_source, for each source separately.
+# Returns {result index: [passage, ...]} with the passages in document order.
+def select_market_passages(idea, data, budget, passage_words, count, per_source=False):
+    passages = [Passage(index, position, text)
+                for index, d in enumerate(data)
+                for position, text in enumerate(chunk_text(d.text or "", passage_words))]
+    ranked = rank_passages(passages, ([idea] if idea else []) + MARKET_COMPONENT_QUERIES)
+    if per_source:
+        by_source = {}
+        for passage in ranked:
+            by_source.setdefault(passage.source, []).append(passage)
+        chosen = [passage for group in by_source.values() for passage in select_passages(group, budget, count)]
+    else:
+        chosen = select_passages(ranked, budget, count)
+
+    selected = {}
+    for passage in sorted(chosen):
+        selected.setdefault(passage.source, []).append(passage.text)
+    return selected
+
+# Function to search Exa for an idea and build the market_data context for market_analysis.
+# Syndicated copies are collapsed, sources already summarized for any idea are read from
+# their fact sheet and only the best passages of the others are packed.
+# Returns (market_data, usage) with the tokens, passages and copies per source.
+def gather_market_data(idea, packer=None, fanout=True, summary_cache=None):
+    settings = get_market_settings()
+    packer = packer or get_market_packer(settings)
+    data, citations = collapse_market_sources(search_market(idea, fanout), settings)
+    summaries = {}
+    if settings["REUSE_SUMMARIES"]:
+        summary_cache = summary_cache or get_summary_cache()
+        for index, d in enumerate(data):
+            summary = summary_cache.get(d.url, d.text)
+            if summary is not None:
+                summaries[index] = summary
+    unsummarized = [index for index in range(len(data)) if index not in summaries]
+    selected = select_market_passages(idea, [data[index] for index in unsummarized], int(settings["PASSAGE_TOKENS"]),
+                                      int(settings["PASSAGE_WORDS"]), packer.count)
+    selected = {unsummarized[position]: passages for position, passages in selected.items()}
+
+    sources, order = [], []
+    for index, d in enumerate(data):
+        if index in summaries:
+            sources.append(Source(d.url, market_source_header(d, citations[index], "Summary"), summaries[index]))
+        elif index in selected:
+            sources.append(Source(d.url, market_source_header(d, citations[index]), "\n...\n".join(selected[index])))
+        else:
+            continue
+        order.append(index)
+    market_data, usage = packer.pack(sources)
+    for row, index in zip(usage, order):
+        row["passages"] = len(selected.get(index, ()))
+        row["summary"] = index in summaries
+        row["copies"] = len(citations[index])
+    return market_data, usage
+
+# Function to get a fact sheet for every source in data. Sheets already in the shared
+# summary cache are reused; the others are written concurrently from each source's best
+# passages for the market components, independent of any idea, and cached. Returns
+# (sheets, written) keyed by index into data, with the input tokens of each sheet written;
+# sources that failed to summarize have no sheet.
+def summarize_market_sources(llm, data, settings, packer, summary_cache=None):
+    summary_cache = summary_cache or get_summary_cache()
+    sheets = {}
+    for index, d in enumerate(data):
+        sheet = summary_cache.get(d.url, d.text)
+        if sheet is not None:
+            sheets[index] = sheet
+    missing = [index for index in range(len(data)) if index not in sheets]
+    selected = select_market_passages(None, [data[index] for index in missing], int(settings["MAP_SOURCE_TOKENS"]),
+                                      int(settings["PASSAGE_WORDS"]), packer.count, per_source=True)
+
+    calls, written = {}, {}
+    for position, passages in selected.items():
+        index = missing[position]
+        source = market_source_header(data[index]) + "\n...\n".join(passages)
+        written[index] = packer.count(source)
+        calls[index] = functools.partial(summarize_market_source, llm, source)
+    for index, sheet, error in run_concurrently(calls):
+        if error is None:
+            summary_cache.put(data[index].url, data[index].text, sheet)
+            sheets[index] = sheet
+    if calls and not sheets:
+        raise RuntimeError("Every market source failed to summarize")
+    return sheets, written
+
+def format_fact_sheets(data, citations, sheets):
+    fact_sheets = []
+    for index in sorted(sheets):
+        also = f"ALSO PUBLISHED AT: {', '.join(citations[index])}\n" if citations[index] else ""
+        fact_sheets.append(f"SOURCE: {data[index].url}\n{also}{sheets[index]}")
+    return "\n\n".join(fact_sheets)
+
+# Function to analyse the market map-reduce style: every source is condensed into a
+# fact sheet in parallel (or taken from the shared summary cache) and the report is
+# written from the fact sheets alone, so latency stays close to two LLM calls however
+# many sources there are. Returns (analysis, usage) with one row per source.
+def map_reduce_market_analysis(llm, idea, fanout=True, packer=None):
+    settings = get_market_settings()
+    packer = packer or get_market_packer(settings)
+    data, citations = collapse_market_sources(search_market(idea, fanout), settings)
+    sheets, written = summarize_market_sources(llm, data, settings, packer)
+    analysis = reduce_market_analysis(llm, idea, format_fact_sheets(data, citations, sheets))
+    return analysis, market_sources_usage(data, citations, sheets, written, packer)
+
+# Function to refresh the analysis of a tracked idea. Only documents published since the
+# newest one seen for the idea are searched for, on Exa itself rather than in the cache
+# or the local store, which could only return documents fetched before, and merged into
+# the idea's corpus; fact sheets of known sources come from the summary cache and the
+# report is re-reduced only when a source was added. The first run for an idea is a full map-reduce analysis.
+# Returns (analysis, usage) with one row per source and whether it is new.
+def refresh_market_analysis(llm, idea, fanout=True, packer=None, watch=None):
+    settings = get_market_settings()
+    packer = packer or get_market_packer(settings)
+    watch = watch or get_market_watch()
+    state = watch.get(idea)
+    watermark = state["watermark"] if state else None
+
+    added = watch.add_sources(idea, search_market(idea, fanout, start_published_date=watermark, fresh=True))
+    state = watch.get(idea)
+    new_urls = {result.url for result in added}
+    data, citations = collapse_market_sources(state["sources"], settings)
+    sheets, written = summarize_market_sources(llm, data, settings, packer)
+
+    analysis = state["analysis"]
+    if analysis is None or new_urls:
+        analysis = reduce_market_analysis(llm, idea, format_fact_sheets(data, citations, sheets))
+        watch.set_analysis(idea, analysis)
+
+    usage = market_sources_usage(data, citations, sheets, written, packer)
+    for row, d in zip(usage, data):
+        row["new"] = d.url in new_urls
+    return analysis, usage
+
+def market_sources_usage(data, citations, sheets, written, packer):
+    return [{
+        "source": d.url,
+        "copies": len(citations[index]),
+        "fact_sheet": "written" if index in written and index in sheets else "cached" if index in sheets else "none",
+        "tokens": written.get(index, 0),
+        "fact_sheet_tokens": packer.count(sheets[index]) if index in sheets else 0,
+        "included": index in sheets,
+    } for index, d in enumerate(data)]
+
+
+# Function to describe the Opportunity Breadth and Depth pipeline as a DAG for parallel.run_dag.
+# Nodes return the raw LLM output; parsing is left to the caller.
+def opportunity_pipeline(llm, opportunity):
+    def landscape(opp_breadth, opp_depth):
+        extracted_information = f"""\n Opportunity Breadth: {opp_breadth} \n Opportunity Depth: {opp_depth} """
+        return opportunity_landscape(llm,extracted_information)
+
+    return {
+        "breadth": (lambda: opportunity_breadth(llm,opportunity), []),
+        "depth": (lambda: opportunity_depth(llm,opportunity), []),
+        "synthesis": (lambda opp_breadth, opp_depth: opportunity_synthesize(llm,opp_breadth,opp_depth,opportunity), ["breadth", "depth"]),
+        "pre_landscape": (lambda synthesis: opportunity_prepare_for_landscape(llm,synthesis,opportunity), ["synthesis"]),
+        "landscape": (landscape, ["breadth", "depth"])
+    }
+
 
 def convo():
     st.title("Kreat Conversation")
@@ -3402,6 +3542,7 @@ def convo():
     ]
 
     choice = st.sidebar.selectbox("Select a Function", function_names)
+    structured = st.sidebar.checkbox("Structured output (JSON mode)")
     llm = initialize_llm()  # Initialize AzureChatOpenAI
 
     # Main content based on sidebar choice
@@ -3419,10 +3560,14 @@ def convo():
     elif choice == "Generate Title✅":
         extracted_information = st.text_area("Input the extracted Information(user won't need to enter): ")
         if st.button("Run"):
-            with st.spinner("Generating Title..."):
-                result = generate_title(llm,extracted_information)
-            st.code(result)
-            st.write(parse_title_generation(result))
+            if structured:
+                with st.spinner("Generating Title..."):
+                    st.json(generate_title_structured(llm,extracted_information).dict())
+            else:
+                with st.spinner("Generating Title..."):
+                    result = generate_title(llm,extracted_information)
+                st.code(result)
+                st.write(parse_title_generation(result))
 
     elif choice == "Update Title✅":
         current_title = st.text_input("Current Title(User won't need to enter)")
@@ -3450,10 +3595,14 @@ def convo():
     elif choice == "Assess Problem Type✅":
         extracted_problems = st.text_area("Enter the extracted problems(User would not have to enter):")
         if st.button("Run"):
-            with st.spinner("Assessing Problem type..."):
-                problem_classification = assess_problem(llm,extracted_problems)
-            st.code(problem_classification)
-            st.write(parse_problem_assessment(problem_classification))
+            if structured:
+                with st.spinner("Assessing Problem type..."):
+                    st.json(assess_problem_structured(llm,extracted_problems).dict())
+            else:
+                with st.spinner("Assessing Problem type..."):
+                    problem_classification = assess_problem(llm,extracted_problems)
+                st.code(problem_classification)
+                st.write(parse_problem_assessment(problem_classification))
 
     elif choice == "Explain Problem Type Assessment✅":
         extracted_problems = st.text_area("Enter the extracted problems(User would not have to enter):")
@@ -3476,10 +3625,14 @@ def convo():
     elif choice == "Generate Assumptions✅":
         extracted_problems = st.text_area("Enter the extracted problems(User would not have to enter):")
         if st.button("Run"):
-            with st.spinner("Generating Assumptions..."):
-                assumptions = generate_assumptions(llm,extracted_problems)
-            st.code(assumptions)
-            st.write(parse_assumptions(assumptions))
+            if structured:
+                with st.spinner("Generating Assumptions..."):
+                    st.json(generate_assumptions_structured(llm,extracted_problems).dict())
+            else:
+                with st.spinner("Generating Assumptions..."):
+                    assumptions = generate_assumptions(llm,extracted_problems)
+                st.code(assumptions)
+                st.write(parse_assumptions(assumptions))
 
 
     elif choice == "Access Data Sources":
@@ -3534,20 +3687,48 @@ def convo():
             "4Ps": model_4ps
         }
 
-        # Create the radio button in the main area
-        model_selection = st.radio("Select a Model", list(models.keys()))
+        run_all = st.checkbox("Run all models")
 
-        # Add some space
-        st.write("")
-
-        # Display the selected model
-        models[model_selection]()
+        if run_all:
+            analyses = {
+                "5Ws and H": analyze_with_5w1h,
+                "5Ps": analyze_with_5ps,
+                "5Ms": analyze_with_5ms,
+                "5Es": analyze_with_5es,
+                "4Ps": analyze_with_4ps
+            }
+            # Lay out one tab per model up front and fill each one as its call finishes
+            placeholders = {}
+            for name, tab in zip(analyses, st.tabs(list(analyses.keys()))):
+                with tab:
+                    st.header(f"{name} Model")
+                    placeholders[name] = st.empty()
+                    placeholders[name].info("Analyzing...")
+
+            calls = {name: functools.partial(analyze, llm, problem) for name, analyze in analyses.items()}
+            for name, analysis, error in run_concurrently(calls, max_workers=len(calls)):
+                if error is not None:
+                    placeholders[name].error(f"{name} analysis failed: {error}")
+                else:
+                    placeholders[name].write(analysis)
+        else:
+            # Create the radio button in the main area
+            model_selection = st.radio("Select a Model", list(models.keys()))
+
+            # Add some space
+            st.write("")
+
+            # Display the selected model
+            models[model_selection]()
 
     elif choice == "Check Title✅":
         title = st.text_input("Enter a title:")
         if st.button("Run"):
-            evaluation = check_title(llm,title)
-            st.write(parse_title_check(evaluation))
+            if structured:
+                st.json(check_title_structured(llm,title).dict())
+            else:
+                evaluation = check_title(llm,title)
+                st.write(parse_title_check(evaluation))
         
     elif choice == "Analyze Problem Breadth and Depth✅":
         extracted_problems = st.text_area("Enter extracted problems(user won't have to add):")
@@ -3604,40 +3785,51 @@ def convo():
     elif choice == "Opportunity Breadth and Depth✅":
         opportunity = st.text_input("Enter your Opportunity: ")
         if st.button("Run"):
-            with st.spinner("Generating Opportunity Breadth..."):
-                opp_breadth = opportunity_breadth(llm,opportunity)
-                st.write(opp_breadth)
-            with st.spinner("Generating Opportunity Depth..."):
-                opp_depth = opportunity_depth(llm,opportunity)
-                st.write(opp_depth)
-            with st.spinner("Integrating breadth and depth... Your analysis is almost ready..."):
-                synthesis = opportunity_synthesize(llm,opp_breadth,opp_depth,opportunity)
-                initial_response = opportunity_prepare_for_landscape(llm,synthesis,opportunity)
-                response = parse_opportunity_pre_landscape(initial_response)
-                st.write(response)
-            with st.spinner("Creating Opportunity Landscape..."):
-                extracted_information = f"""\n Opportunity Breadth: {opp_breadth} \n Opportunity Depth: {opp_depth} """
-                opp_landscape = opportunity_landscape(llm,extracted_information)
-                response = parse_opportunity_landscape_output(opp_landscape)
-                
+            # Breadth and depth are independent, so they run side by side and the
+            # landscape starts as soon as both are ready, alongside the synthesis
+            sections = {
+                "breadth": st.container(),
+                "depth": st.container(),
+                "pre_landscape": st.container(),
+                "landscape": st.container()
+            }
+
+            # Parsers write to the page, so they run here in the script thread
+            # rather than inside the pipeline nodes
+            def show_node(name, result):
+                if name == "pre_landscape":
+                    with sections[name]:
+                        st.write(parse_opportunity_pre_landscape(result))
+                elif name == "landscape":
+                    with sections[name]:
+                        parse_opportunity_landscape_output(result)
+                elif name in sections:
+                    sections[name].write(result)
+
+            pipeline = opportunity_pipeline(llm, opportunity)
+            with st.spinner("Generating Opportunity Breadth, Depth and Landscape..."):
+                _, timings = run_dag(pipeline, on_complete=show_node)
+
+            with st.expander("Pipeline timings"):
+                import pandas as pd
+                path, total = critical_path(pipeline, timings)
+                st.table(pd.DataFrame(timings).T.sort_values("start").round(2))
+                st.write(f"Critical path: {' → '.join(path)} ({total:.2f}s)")
+
     elif choice == "Breakthrough Opportunity Analysis✅":
         opportunity = st.text_input("Enter your Opportunity: ")
         if st.button("Run"):
-            with st.spinner("Analysing Breakthrough Opportunity..."):
-                initial_response = breakthrough_opportunity_analysis(llm,opportunity)
-                st.write(initial_response)
-                # response = parse_breakthrough_analysis(initial_response)
-                # print(response)
+            initial_response = st.write_stream(stream_breakthrough_opportunity_analysis(llm,opportunity))
+            # response = parse_breakthrough_analysis(initial_response)
+            # print(response)
 
     
     elif choice == "Future Wheel Analysis✅":
         opportunity = st.text_input("Enter your Opportunity: ")
         if st.button("Run"):
-            with st.spinner("Future Wheel Analysis loading..."):
-                initial_response = future_wheel_analysis(llm,opportunity)
-                st.write(initial_response)
-                # response = parse_breakthrough_analysis(initial_response)
-                # print(response)
+            initial_response = st.write_stream(stream_future_wheel_analysis(llm,opportunity))
+            # response = parse_breakthrough_analysis(initial_response)
+            # print(response)
 
 
     elif choice == "CREATE Model for ideas✅":
@@ -3652,43 +3844,36 @@ def convo():
     elif choice == "Attribute Analysis✅":
         idea = st.text_input("Enter any idea: ")
         if st.button("Run"):
-            with st.spinner("Performing Attribute Analysis...."):
-                st.markdown(attribute_analysis(llm,idea))
+            st.write_stream(stream_attribute_analysis(llm,idea))
 
     elif choice == "Morphological Analysis✅":
         idea = st.text_input("Enter any idea: ")
         if st.button("Run"):
-            with st.spinner("Performing Morphological Analysis...."):
-                st.markdown(morphological_analysis(llm,idea))
+            st.write_stream(stream_morphological_analysis(llm,idea))
 
     elif choice == "Market analysis✅":
         idea = st.text_input("Enter an idea(Users won't have to enter):")
+        fanout = st.checkbox("Search every market facet", value=True)
+        mode = st.radio("Analysis mode", ["Single pass", "Map-reduce over sources", "Refresh tracked idea"],
+                        horizontal=True)
         if st.button("Run"):
-            with st.spinner("Extracting Market Data: "):
-                prompt = f"""
-                Here is an idea: {idea}. 
-                Give me market trends, opportunities, and competition for this idea for the current market for this idea.
-                """
-                data = search_and_extract(prompt)
-                market_data = ""
-                for d in data:
-                    url = d.url
-                    title = d.title
-                    date = d.published_date
-                    author = d.author
-                    text = d.text
-                    split_market_data = market_data.split()
-                    if len(split_market_data)<14000:
-                        market_data += f"""\n Market Content 
-                        \nTitle:{title} 
-                        \nDate: {date}
-                        \nAuthor: {author}
-                        \nText: {text}
-                        \nURL: {url}
-                        """
-                #st.write(market_data)        
-            with st.spinner("Generating Market Analysis..."):
-                st.write(market_analysis(llm,idea,market_data))      
+            if mode == "Single pass":
+                with st.spinner("Extracting Market Data: "):
+                    market_data, usage = gather_market_data(idea, fanout=fanout)
+                    #st.write(market_data)        
+                with st.spinner("Generating Market Analysis..."):
+                    st.write(market_analysis(llm,idea,market_data))
+            elif mode == "Map-reduce over sources":
+                with st.spinner("Summarizing each source and generating Market Analysis..."):
+                    analysis, usage = map_reduce_market_analysis(llm, idea, fanout=fanout)
+                st.write(analysis)
+            else:
+                with st.spinner("Fetching new sources and updating Market Analysis..."):
+                    analysis, usage = refresh_market_analysis(llm, idea, fanout=fanout)
+                st.caption(f"{sum(row['new'] for row in usage)} new of {len(usage)} tracked sources")
+                st.write(analysis)
+            with st.expander("Context usage"):
+                st.table(usage)      
 
     elif choice == "Apply TRIZ Principle":
         st.write("Prompt Under Development")
@@ -0,0 +1,153 @@
+# dedup.py
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that only track the visit and never change the page
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|source)$", re.I)
+_NON_WORD = re.compile(r"\W+")
+
+
+# Function to reduce a URL to the form two links to the same page share:
+# no scheme, no 'www.', no fragment, no tracking parameters, no trailing slash
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(key)))
+    path = parts.path.rstrip("/")
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+# Fingerprint of a text that ignores case, punctuation and whitespace, so the
+# same article syndicated under different URLs collapses to one entry
+def content_fingerprint(text):
+    words = _NON_WORD.sub(" ", (text or "").lower()).split()
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest() if words else None
+
+
+# Function to merge several result lists into one, keeping the first
+# occurrence of every URL and of every text. Order is preserved.
+def merge_results(result_lists):
+    merged, urls, fingerprints = [], set(), set()
+    for results in result_lists:
+        for result in results:
+            url = normalize_url(result.url)
+            fingerprint = content_fingerprint(result.text)
+            if url in urls or (fingerprint is not None and fingerprint in fingerprints):
+                continue
+            urls.add(url)
+            if fingerprint is not None:
+                fingerprints.add(fingerprint)
+            merged.append(result)
+    return merged
+
+
+# MinHash/LSH settings: 128 permutations in 32 bands of 4 rows puts the LSH
+# candidate threshold near 0.42 Jaccard, so copies with light edits still meet
+# in a bucket; candidates are then confirmed against the signature estimate
+# with `threshold`
+DEFAULT_SHINGLE_WORDS = 4
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.75
+
+# Function to hash every k-word shingle of a document to a 32-bit value, given
+# the random 64-bit hash of each of its words. The windows are combined with
+# numpy, so the cost is linear in the number of words.
+def _shingle_hashes(word_hashes, k):
+    import numpy as np
+    k = min(k, len(word_hashes))
+    combined = np.zeros(len(word_hashes) - k + 1, dtype=np.uint64)
+    for offset in range(k):
+        # Wrapping uint64 arithmetic is intended here
+        combined = combined * np.uint64(1000003) + word_hashes[offset:offset + len(combined)]
+    return np.unique(combined >> np.uint64(32))
+
+
+# MinHash signatures with multiply-shift hash functions h(x) = (a*x + b) >> 32
+class MinHasher:
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, seed=1):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    # Shingles are hashed in blocks so memory stays bounded for long documents
+    def signature(self, hashes, block=512):
+        import numpy as np
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for start in range(0, len(hashes), block):
+                permuted = (np.outer(hashes[start:start + block], self.a) + self.b) >> np.uint64(32)
+                np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature
+
+
+# Function to group near-identical texts. Returns clusters as lists of indices,
+# each sorted, ordered by their first member. Texts with no words never cluster.
+# Words are numbered through one dictionary for the whole batch and hashed by
+# table lookup, which keeps thousands of documents per call cheap.
+def near_duplicate_clusters(texts, threshold=DEFAULT_NEAR_DUPLICATE_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                            bands=DEFAULT_BANDS, shingle_words=DEFAULT_SHINGLE_WORDS):
+    import numpy as np
+    vocabulary = {}
+    documents = []
+    for text in texts:
+        words = _NON_WORD.sub(" ", (text or "").lower()).split()
+        documents.append(np.fromiter((vocabulary.setdefault(word, len(vocabulary)) for word in words),
+                                     dtype=np.int64, count=len(words)))
+    table = np.random.default_rng(0).integers(0, np.iinfo(np.uint64).max, size=max(len(vocabulary), 1),
+                                              dtype=np.uint64, endpoint=True)
+
+    hasher = MinHasher(num_perm)
+    rows = num_perm // bands
+    signatures = [
+        hasher.signature(_shingle_hashes(table[word_ids], shingle_words)) if len(word_ids) else None
+        for word_ids in documents
+    ]
+
+    parent = list(range(len(signatures)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    buckets = {}
+    for index, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(bands):
+            key = (band, signature[band * rows:(band + 1) * rows].tobytes())
+            first = buckets.setdefault(key, index)
+            if first == index:
+                continue
+            root, other = find(first), find(index)
+            if root != other and (signatures[first] == signature).mean() >= threshold:
+                parent[max(root, other)] = min(root, other)
+
+    clusters = {}
+    for index in range(len(signatures)):
+        clusters.setdefault(find(index), []).append(index)
+    return sorted(clusters.values())
+
+
+# Function to keep one representative (the first, i.e. best ranked) of every
+# cluster of near-duplicate results. Returns (results, citations) where
+# citations[i] lists the URLs of every copy of results[i], its own first.
+def collapse_near_duplicates(results, threshold=DEFAULT_NEAR_DUPLICATE_THRESHOLD):
+    results = list(results)
+    kept, citations = [], []
+    for cluster in near_duplicate_clusters([result.text for result in results], threshold):
+        kept.append(results[cluster[0]])
+        urls = []
+        for index in cluster:
+            if results[index].url not in urls:
+                urls.append(results[index].url)
+        citations.append(urls)
+    return kept, citations
@@ -0,0 +1,140 @@
+# doc_store.py
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from dedup import normalize_url
+from passage_ranker import tokenize
+from search_results import Result
+
+DEFAULT_MIN_COVERAGE = 0.6
+# Lowest relevance (flipped bm25) a stored document may have. FTS5 gives terms found in
+# most documents almost no weight, so documents matching only generic words fall below it.
+DEFAULT_MIN_SCORE = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    url_key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    exa_id TEXT,
+    title TEXT,
+    author TEXT,
+    published_date TEXT,
+    text TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, text, content='documents', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+    INSERT INTO documents_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+"""
+
+
+def _domain(url):
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+# Every fetched Exa document, indexed with FTS5 so later searches for
+# overlapping ideas can be answered locally before going to the network
+class DocumentStore:
+    def __init__(self, path, min_coverage=DEFAULT_MIN_COVERAGE, min_score=DEFAULT_MIN_SCORE):
+        self.path = path
+        self.min_coverage = min_coverage
+        self.min_score = min_score
+        self.counts = {"lookups": 0, "served_locally": 0, "partial": 0, "stored": 0}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # Stores (or refreshes) documents with text, keyed by normalized URL
+    def add(self, results):
+        rows = [
+            (normalize_url(result.url), result.url, getattr(result, "id", None), result.title, result.author,
+             result.published_date, result.text, time.time())
+            for result in results if result.url and result.text
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO documents (url_key, url, exa_id, title, author, published_date, text, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url_key) DO UPDATE SET url = excluded.url, exa_id = excluded.exa_id, "
+                "title = excluded.title, author = excluded.author, published_date = excluded.published_date, "
+                "text = excluded.text, fetched_at = excluded.fetched_at",
+                rows,
+            )
+            self._conn.commit()
+            self.counts["stored"] += len(rows)
+
+    # Function to find stored documents for a query, best first. A document
+    # qualifies when it scores at least min_score, contains at least min_coverage
+    # of the terms of `topic` (the query itself when None) and passes the same
+    # domain and date filters the Exa search would apply. Pass the subject of a
+    # templated query as topic so the template's own wording cannot qualify a
+    # document on its own.
+    def search(self, query, limit=3, include_domains=None, start_published_date=None, topic=None):
+        terms = sorted(set(tokenize(query)))
+        required = sorted(set(tokenize(topic))) if topic is not None else terms
+        if not terms or not required:
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        domains = {domain.lower().removeprefix("www.") for domain in include_domains} if include_domains else None
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.url, d.exa_id, d.title, bm25(documents_fts, 2.0, 1.0), d.published_date, d.author, d.text "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? ORDER BY bm25(documents_fts, 2.0, 1.0) LIMIT ?",
+                (match, max(limit * 10, 50)),
+            ).fetchall()
+
+        found = []
+        for url, exa_id, title, rank, published_date, author, text in rows:
+            # Rows are best first: everything after a weak match is weaker still
+            if -rank < self.min_score:
+                break
+            if domains is not None and _domain(url) not in domains:
+                continue
+            if start_published_date and (not published_date or published_date < start_published_date):
+                continue
+            words = set(tokenize(f"{title or ''} {text}"))
+            if sum(term in words for term in required) < self.min_coverage * len(required):
+                continue
+            # bm25() is lower for better matches; flip it so higher is better like Exa's score
+            found.append(Result(url, exa_id, title, -rank, published_date, author, text))
+            if len(found) == limit:
+                break
+        return found
+
+    def record_lookup(self, found, wanted):
+        with self._lock:
+            self.counts["lookups"] += 1
+            if found >= wanted:
+                self.counts["served_locally"] += 1
+            elif found:
+                self.counts["partial"] += 1
+
+    def stats(self):
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            return dict(self.counts, documents=documents)
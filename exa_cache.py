@@ -0,0 +1,94 @@
+# exa_cache.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from search_results import Result
+
+DEFAULT_TTL = 24 * 3600
+
+
+# Function to normalize a search query so trivially different spellings share one entry
+def normalize_query(query):
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def search_key(query, include_domains=None, start_published_date=None, num_results=None):
+    payload = json.dumps([
+        normalize_query(query),
+        sorted(domain.lower() for domain in include_domains) if include_domains else None,
+        start_published_date,
+        num_results,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Results are stored as a zlib-compressed JSON list of rows in Result field order
+def _pack(results):
+    return zlib.compress(json.dumps([list(result) for result in results], separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(blob):
+    return [Result(*row) for row in json.loads(zlib.decompress(blob))]
+
+
+class ExaSearchCache:
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            "key TEXT PRIMARY KEY, query TEXT NOT NULL, results BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    # Returns the cached results, or None when missing or older than the TTL
+    def get(self, query, include_domains=None, start_published_date=None, num_results=None):
+        key = search_key(query, include_domains, start_published_date, num_results)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, stored_at FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _unpack(row[0])
+
+    # Stores the results and returns them as Result records that share the
+    # callers' text strings rather than decoded copies
+    def put(self, query, results, include_domains=None, start_published_date=None, num_results=None):
+        key = search_key(query, include_domains, start_published_date, num_results)
+        records = [Result.from_object(result) for result in results]
+        blob = _pack(records)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (key, query, results, stored_at) VALUES (?, ?, ?, ?)",
+                (key, normalize_query(query), blob, time.time()),
+            )
+            self._conn.execute("DELETE FROM searches WHERE stored_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+        return records
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
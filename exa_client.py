@@ -0,0 +1,247 @@
+# exa_client.py
+
+import asyncio
+import random
+import threading
+import time
+import httpx
+
+from histogram import LatencyHistogram
+from search_results import Result, SearchResponse
+
+DEFAULT_BASE_URL = "https://api.exa.ai"
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_DEADLINE = 30.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 8.0
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET = 30.0
+
+class ExaError(RuntimeError):
+    pass
+
+
+# Timeouts, connection errors, 429 and 5xx: worth another attempt
+class TransientExaError(ExaError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(ExaError):
+    pass
+
+
+class CircuitOpenError(ExaError):
+    pass
+
+
+# Opens after `failures` consecutive failed calls and rejects calls for
+# reset_timeout seconds; then a single trial call decides whether it closes again
+class CircuitBreaker:
+    def __init__(self, failures=DEFAULT_BREAKER_FAILURES, reset_timeout=DEFAULT_BREAKER_RESET):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial:
+                return False
+            self.trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive += 1
+            if self.trial or self.consecutive >= self.failures:
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+    # Ends a trial call without counting it either way
+    def release(self):
+        with self._lock:
+            self.trial = False
+
+
+def _parse_retry_after(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_result(item):
+    return Result(item.get("url"), item.get("id"), item.get("title"), item.get("score"),
+                  item.get("publishedDate"), item.get("author"), item.get("text"))
+
+
+# Exa search over a pooled httpx.AsyncClient. Every call has an overall deadline
+# covering all of its attempts; transient failures are retried with full-jitter
+# exponential backoff, at most max_concurrency requests are in flight, and the
+# circuit breaker fails fast while Exa is down.
+class AsyncExaClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, deadline=DEFAULT_DEADLINE,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, breaker=None, limits=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self.limits = limits or httpx.Limits(max_connections=max_concurrency,
+                                             max_keepalive_connections=max_concurrency)
+        self.attempt_latency = LatencyHistogram()
+        self.call_latency = LatencyHistogram()
+        self.counters = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "rejected": 0, "deadline_exceeded": 0}
+        self._client = None
+        self._semaphore = None
+
+    # The HTTP client and semaphore belong to the loop of the first call
+    def _ensure_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"x-api-key": self.api_key, "Content-Type": "application/json"},
+                limits=self.limits,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _attempt(self, payload, timeout):
+        client = self._ensure_client()
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/search", json=payload, timeout=timeout)
+            except (httpx.TimeoutException, httpx.TransportError) as error:
+                raise TransientExaError(f"{type(error).__name__}: {error}") from error
+            finally:
+                self.attempt_latency.observe(time.perf_counter() - start)
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientExaError(f"Exa returned {response.status_code}",
+                                    retry_after=_parse_retry_after(response.headers.get("retry-after")))
+        if response.status_code != 200:
+            raise ExaError(f"Exa returned {response.status_code}: {response.text[:200]}")
+        body = response.json()
+        return SearchResponse([_to_result(item) for item in body.get("results", [])], body.get("autopromptString"))
+
+    async def search_and_contents(self, query, use_autoprompt=False, include_domains=None,
+                                  start_published_date=None, num_results=None, deadline=None):
+        payload = {"query": query, "useAutoprompt": use_autoprompt, "contents": {"text": True}}
+        if include_domains:
+            payload["includeDomains"] = list(include_domains)
+        if start_published_date:
+            payload["startPublishedDate"] = start_published_date
+        if num_results is not None:
+            payload["numResults"] = num_results
+
+        self.counters["calls"] += 1
+        if not self.breaker.allow():
+            self.counters["rejected"] += 1
+            raise CircuitOpenError("Exa circuit breaker is open")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        expires = started + (deadline or self.deadline)
+        attempt = 0
+        try:
+            while True:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    self.counters["deadline_exceeded"] += 1
+                    raise DeadlineExceeded(f"Exa search exceeded its {deadline or self.deadline}s deadline")
+                self.counters["attempts"] += 1
+                try:
+                    result = await self._attempt(payload, min(self.timeout, remaining))
+                except TransientExaError as error:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                    if error.retry_after is not None:
+                        delay = max(delay, error.retry_after)
+                    if loop.time() + delay >= expires:
+                        raise
+                    attempt += 1
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return result
+        except (TransientExaError, DeadlineExceeded):
+            self.counters["failures"] += 1
+            self.breaker.record_failure()
+            raise
+        except BaseException as error:
+            # A rejected request or a cancelled call says nothing about whether Exa
+            # is down; it only gives up a half-open breaker's trial
+            self.counters["failures"] += isinstance(error, Exception)
+            self.breaker.release()
+            raise
+        finally:
+            self.call_latency.observe(loop.time() - started)
+
+    def stats(self):
+        return dict(
+            self.counters,
+            circuit=self.breaker.state,
+            call_p50=self.call_latency.quantile(0.5),
+            call_p95=self.call_latency.quantile(0.95),
+            call_latency=self.call_latency.snapshot(),
+            attempt_latency=self.attempt_latency.snapshot(),
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Blocking facade for Streamlit threads: the async client lives on an event
+# loop in a daemon thread and every call waits for its coroutine there, so
+# concurrent callers share one connection pool and one concurrency cap
+class ExaClient:
+    def __init__(self, api_key, **options):
+        self.async_client = AsyncExaClient(api_key, **options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="exa-client", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def search_and_contents(self, query, **kwargs):
+        return self.run(self.async_client.search_and_contents(query, **kwargs))
+
+    def stats(self):
+        return self.async_client.stats()
+
+    def close(self):
+        self.run(self.async_client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,42 @@
+# histogram.py
+
+import bisect
+import threading
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# Cumulative-bucket histogram in the Prometheus layout
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+
+    # Upper bound of the bucket holding the given quantile
+    def quantile(self, fraction):
+        with self._lock:
+            count = sum(self.counts)
+            if not count:
+                return 0.0
+            running = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), self.counts):
+                running += bucket
+                if running >= fraction * count:
+                    return bound
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), self.counts):
+                running += bucket
+                cumulative[str(bound)] = running
+            return {"count": running, "sum": self.total, "buckets": cumulative}
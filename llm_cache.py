@@ -0,0 +1,166 @@
+# llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Function to build the content-addressed key of an LLM call. `options` holds
+# anything else that changes the reply (call kwargs, completion cap); calls
+# without options keep the key they always had.
+def cache_key(deployment_name, temperature, prompt, options=None):
+    parts = [deployment_name, temperature, prompt]
+    if options:
+        parts.append(options)
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# In-process LRU tier
+class MemoryTier:
+    def __init__(self, max_entries=512, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    # (value, stored_at) of a live entry
+    def get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at=None):
+        with self._lock:
+            self._entries[key] = (value, stored_at or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# On-disk tier shared by every worker on the host
+class SqliteTier:
+    def __init__(self, path, max_entries=10000, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value, stored_at
+
+    def set(self, key, value, stored_at=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, stored_at or now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.ttl,))
+            # Evict the least recently read entries once the table outgrows its budget
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+# Read-through cache over an ordered list of tiers (fastest first).
+# Any object with get(key) and set(key, value) can be plugged in as a tier; a
+# tier that also has get_entry(key) -> (value, stored_at) keeps an entry's age
+# when it is promoted, so promotion never extends its TTL.
+class ResponseCache:
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name, field):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+            stats[field] += 1
+
+    def get(self, key, name="default"):
+        for index, tier in enumerate(self.tiers):
+            if hasattr(tier, "get_entry"):
+                entry = tier.get_entry(key)
+                value, stored_at = entry if entry is not None else (None, None)
+            else:
+                value, stored_at = tier.get(key), None
+            if value is not None:
+                # Promote to the faster tiers so the next read stays in memory
+                for faster in self.tiers[:index]:
+                    if stored_at is not None:
+                        faster.set(key, value, stored_at)
+                    else:
+                        faster.set(key, value)
+                self._count(name, "hits")
+                return value
+        self._count(name, "misses")
+        return None
+
+    def set(self, key, value):
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def stats(self):
+        with self._lock:
+            report = {}
+            for name, stats in sorted(self._stats.items()):
+                lookups = stats["hits"] + stats["misses"]
+                report[name] = dict(stats, hit_rate=stats["hits"] / lookups if lookups else 0.0)
+            return report
@@ -0,0 +1,96 @@
+# llm_pool.py
+
+import threading
+
+import httpx
+import streamlit as st
+
+from llm_telemetry import count_attempt, count_attempt_async
+
+# Defaults for the shared HTTP connection pool, overridable from the [azure] secrets section
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+_lock = threading.Lock()
+_clients = {}
+_http_clients = {}
+_stats = {"hits": 0, "misses": 0}
+
+
+def _pool_limits():
+    azure = st.secrets["azure"]
+    return httpx.Limits(
+        max_connections=int(azure.get("HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(azure.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=float(azure.get("HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+
+
+# One sync and one async HTTP client are shared by every deployment so that
+# TLS sessions to the Azure endpoint are reused across pages and reruns. Their
+# request hooks count the attempts of each call for llm_telemetry.
+def _shared_http_clients():
+    if not _http_clients:
+        limits = _pool_limits()
+        _http_clients["sync"] = httpx.Client(limits=limits, event_hooks={"request": [count_attempt]})
+        _http_clients["async"] = httpx.AsyncClient(limits=limits, event_hooks={"request": [count_attempt_async]})
+    return _http_clients["sync"], _http_clients["async"]
+
+
+# langchain_openai is imported on the first build so importing this module stays cheap
+def _build_llm(deployment_name, temperature, max_tokens=None, timeout=None):
+    from langchain_openai import AzureChatOpenAI
+
+    api_key = st.secrets["azure"]["AZURE_OPENAI_API_KEY"]
+    api_version = st.secrets["azure"]["AZURE_OPENAI_API_VERSION"]
+    endpoint = st.secrets["azure"]["AZURE_OPENAI_ENDPOINT"]
+    http_client, http_async_client = _shared_http_clients()
+
+    kwargs = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    return AzureChatOpenAI(
+        openai_api_key=api_key,
+        openai_api_version=api_version,
+        azure_deployment=deployment_name,
+        azure_endpoint=endpoint,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **kwargs
+    )
+
+
+# Function to get the process-wide AzureChatOpenAI for a deployment/temperature pair,
+# optionally with a completion cap and a request timeout in seconds.
+# None for any of them keeps the default.
+def get_llm(deployment_name=None, temperature=None, max_tokens=None, timeout=None):
+    if deployment_name is None:
+        deployment_name = st.secrets["azure"]["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"]
+    key = (deployment_name, temperature, max_tokens, timeout)
+
+    with _lock:
+        llm = _clients.get(key)
+        if llm is not None:
+            _stats["hits"] += 1
+            return llm
+        _stats["misses"] += 1
+        llm = _build_llm(deployment_name, temperature, max_tokens, timeout)
+        _clients[key] = llm
+        return llm
+
+
+def pool_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+            "clients": len(_clients),
+        }
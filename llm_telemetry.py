@@ -0,0 +1,281 @@
+# llm_telemetry.py
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from histogram import LatencyHistogram
+
+# LLM calls run from a few hundred milliseconds to the long tier's three minutes
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 180.0)
+DEFAULT_MAX_RECORDS = 1000
+UNATTRIBUTED = "unattributed"
+
+# The call in progress in this context; the HTTP hooks count its attempts
+_current_call = contextvars.ContextVar("llm_telemetry_call", default=None)
+
+
+# httpx event hooks for the shared LLM clients. Every HTTP request made while a
+# call is in progress is one attempt of it, so the client's retries are counted.
+def count_attempt(request):
+    call = _current_call.get()
+    if call is not None:
+        call["attempts"] += 1
+
+
+async def count_attempt_async(request):
+    count_attempt(request)
+
+
+# Keys of a parse result left empty, as dotted paths into nested sections.
+# DataFrames and other values returned next to the parsed dict are skipped.
+def missing_keys(result, prefix=""):
+    if isinstance(result, tuple):
+        return [key for item in result if isinstance(item, dict) for key in missing_keys(item, prefix)]
+    missing = []
+    for key, value in result.items():
+        if isinstance(value, dict) and value:
+            missing.extend(missing_keys(value, f"{prefix}{key}."))
+        elif value in ("", None) or value == {}:
+            missing.append(f"{prefix}{key}")
+    return missing
+
+
+# Per prompt function: calls, tokens, retries, latency and time to first token,
+# and how often its parse_* function found every key. Finished calls and parses
+# are kept in a bounded buffer and, with a path, appended to a JSONL file.
+class Telemetry:
+    def __init__(self, path=None, max_records=DEFAULT_MAX_RECORDS):
+        self.path = path
+        self.records = deque(maxlen=max_records)
+        self.functions = {}
+        self._lock = threading.Lock()
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _function(self, name):
+        function = self.functions.get(name)
+        if function is None:
+            function = self.functions[name] = {
+                "calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "parse_complete": 0, "parse_incomplete": 0,
+                "latency": LatencyHistogram(LLM_LATENCY_BUCKETS),
+                "time_to_first_token": LatencyHistogram(LLM_LATENCY_BUCKETS),
+            }
+        return function
+
+    def _append(self, record):
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def record_call(self, record):
+        with self._lock:
+            function = self._function(record["function"])
+            function["calls"] += 1
+            function["errors"] += record["error"] is not None
+            function["retries"] += record["retries"]
+            function["prompt_tokens"] += record["prompt_tokens"] or 0
+            function["completion_tokens"] += record["completion_tokens"] or 0
+            self._append(record)
+        function["latency"].observe(record["latency"])
+        if record["time_to_first_token"] is not None:
+            function["time_to_first_token"].observe(record["time_to_first_token"])
+
+    def record_parse(self, function_name, missing):
+        with self._lock:
+            function = self._function(function_name)
+            function["parse_incomplete" if missing else "parse_complete"] += 1
+            self._append({"type": "parse", "function": function_name, "time": time.time(),
+                          "complete": not missing, "missing": missing})
+
+    def stats(self):
+        with self._lock:
+            functions = dict(self.functions)
+        return {name: {
+            "calls": function["calls"],
+            "errors": function["errors"],
+            "retries": function["retries"],
+            "prompt_tokens": function["prompt_tokens"],
+            "completion_tokens": function["completion_tokens"],
+            "parse_complete": function["parse_complete"],
+            "parse_incomplete": function["parse_incomplete"],
+            "latency_p50": function["latency"].quantile(0.5),
+            "latency_p95": function["latency"].quantile(0.95),
+            "ttft_p50": function["time_to_first_token"].quantile(0.5),
+            "ttft_p95": function["time_to_first_token"].quantile(0.95),
+        } for name, function in sorted(functions.items())}
+
+    # The buffered records, one JSON object per line
+    def jsonl(self):
+        with self._lock:
+            records = list(self.records)
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(self.jsonl())
+
+    # The counters and histograms in the Prometheus text exposition format
+    def prometheus(self):
+        with self._lock:
+            functions = dict(self.functions)
+        lines = []
+        counters = [
+            ("llm_calls_total", "calls", "LLM calls per prompt function"),
+            ("llm_errors_total", "errors", "LLM calls that raised"),
+            ("llm_retries_total", "retries", "HTTP attempts beyond the first"),
+            ("llm_prompt_tokens_total", "prompt_tokens", "Prompt tokens sent"),
+            ("llm_completion_tokens_total", "completion_tokens", "Completion tokens received"),
+        ]
+        for metric, key, help_text in counters:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{function="{name}"}} {function[key]}' for name, function in sorted(functions.items())]
+
+        lines += ["# HELP llm_parse_total Parses of a prompt function's reply, by whether every key was found",
+                  "# TYPE llm_parse_total counter"]
+        for name, function in sorted(functions.items()):
+            lines.append(f'llm_parse_total{{function="{name}",outcome="complete"}} {function["parse_complete"]}')
+            lines.append(f'llm_parse_total{{function="{name}",outcome="incomplete"}} {function["parse_incomplete"]}')
+
+        for metric, key, help_text in [("llm_latency_seconds", "latency", "Total latency of an LLM call"),
+                                       ("llm_time_to_first_token_seconds", "time_to_first_token",
+                                        "Time until the first token of an LLM call")]:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for name, function in sorted(functions.items()):
+                snapshot = function[key].snapshot()
+                for bound, count in snapshot["buckets"].items():
+                    le = "+Inf" if bound == "inf" else bound
+                    lines.append(f'{metric}_bucket{{function="{name}",le="{le}"}} {count}')
+                lines.append(f'{metric}_sum{{function="{name}"}} {snapshot["sum"]}')
+                lines.append(f'{metric}_count{{function="{name}"}} {snapshot["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+# Callback handler that turns langchain's LLM events into Telemetry records. The
+# prompt function comes from the run's "prompt_function" metadata. Tokens are
+# taken from the reply's usage_metadata, or estimated with `estimate` when the
+# API reports none (streamed replies).
+class TelemetryHandler(BaseCallbackHandler):
+    def __init__(self, telemetry, estimate=None):
+        self.telemetry = telemetry
+        self.estimate = estimate
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, metadata, prompt):
+        call = {
+            "function": (metadata or {}).get("prompt_function", UNATTRIBUTED),
+            "start": time.time(),
+            "started": time.perf_counter(),
+            "first_token": None,
+            "attempts": 0,
+            "prompt": prompt,
+        }
+        with self._lock:
+            self._runs[run_id] = call
+        _current_call.set(call)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata, "\n".join(message.content for message in messages[0]))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata, prompts[0])
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        call = self._runs.get(run_id)
+        if call is not None and call["first_token"] is None:
+            call["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        self._finish(run_id, generation, None)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, None, error)
+
+    def _finish(self, run_id, generation, error):
+        with self._lock:
+            call = self._runs.pop(run_id, None)
+        if call is None:
+            return
+        if _current_call.get() is call:
+            _current_call.set(None)
+        finished = time.perf_counter()
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None)
+        estimated = not usage and self.estimate is not None
+        if usage:
+            prompt_tokens, completion_tokens = usage.get("input_tokens"), usage.get("output_tokens")
+        elif estimated:
+            prompt_tokens = self.estimate(call["prompt"])
+            completion_tokens = self.estimate(generation.text) if generation is not None else 0
+        else:
+            prompt_tokens = completion_tokens = None
+        # An invoke delivers every token at once, so its first token arrives with the reply
+        first_token = call["first_token"] or (finished if error is None else None)
+        self.telemetry.record_call({
+            "type": "call",
+            "function": call["function"],
+            "time": call["start"],
+            "latency": finished - call["started"],
+            "time_to_first_token": first_token - call["started"] if first_token is not None else None,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_estimated": estimated,
+            "retries": max(call["attempts"] - 1, 0),
+            "streamed": call["first_token"] is not None,
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+        })
+
+
+# Decorator for the parse_* function of a prompt function: records in the
+# Telemetry returned by telemetry_getter whether the parsed reply has every key
+def recorded_parse(function_name, telemetry_getter):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(output, *args, **kwargs):
+            result = fn(output, *args, **kwargs)
+            telemetry = telemetry_getter()
+            if telemetry is not None:
+                missing = missing_keys(result) if isinstance(result, (dict, tuple)) else []
+                if isinstance(result, dict) and not result:
+                    missing = ["*"]
+                telemetry.record_parse(function_name, missing)
+            return result
+        return wrapper
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    telemetry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.telemetry.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Function to serve telemetry.prometheus() at http://host:port/metrics from a daemon thread
+def serve_metrics(telemetry, port, host="127.0.0.1"):
+    handler = type("MetricsHandler", (_MetricsHandler,), {"telemetry": telemetry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="llm-metrics", daemon=True).start()
+    return server
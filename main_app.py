@@ -1,23 +1,70 @@
 # main_app.py
 
+import importlib
+import sys
+
 import streamlit as st
-from spark_blocks import spark_blocks_app
-from build_blocks import build_blocks_app
-from conversation import convo
+
+# Page modules (and the LLM/Exa/pandas stacks behind them) are imported on first
+# navigation, so a cold start only pays for Streamlit itself
+pages = {
+    "Conversation": ("conversation", "convo"),
+    "Spark Blocks": ("spark_blocks", "spark_blocks_app"),
+    "Build Blocks": ("build_blocks", "build_blocks_app")
+}
+
+# (label, module, stats function) reported in the sidebar once the module is loaded
+diagnostics = [
+    ("llm_pool", "llm_pool", "pool_stats"),
+    ("response_cache", "prompt_runner", "response_cache_stats"),
+    ("single_flight", "prompt_runner", "single_flight_stats"),
+    ("scheduler", "prompt_runner", "scheduler_stats"),
+    ("routing", "prompt_runner", "routing_stats"),
+    ("telemetry", "prompt_runner", "telemetry_stats"),
+    ("prompt_cache", "prompt_registry", "prompt_cache_stats"),
+    ("exa_cache", "conversation", "exa_cache_stats"),
+    ("exa_client", "conversation", "exa_client_stats"),
+    ("doc_store", "conversation", "doc_store_stats"),
+    ("market_watch", "conversation", "market_watch_stats"),
+    ("source_summaries", "conversation", "summary_cache_stats"),
+    ("structured_output", "structured_output", "structured_output_stats")
+]
+
+def load_page(page_name):
+    module_name, function_name = pages[page_name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+# The telemetry's Prometheus endpoint is started once per process rather than from a
+# prompt call; prompt_runner is only imported here when PROMETHEUS_PORT is configured
+@st.cache_resource
+def start_metrics_server():
+    if st.secrets.get("telemetry", {}).get("PROMETHEUS_PORT"):
+        importlib.import_module("prompt_runner").start_metrics_server()
+
+def collect_diagnostics():
+    report = {}
+    for label, module_name, function_name in diagnostics:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            report[label] = getattr(module, function_name)()
+    return report
 
 def main():
     st.set_page_config(page_title="Kreat Demo",page_icon="💡")
-    pages = {
-        "Conversation": convo,
-        "Spark Blocks": spark_blocks_app,
-        "Build Blocks": build_blocks_app
-    }
+    start_metrics_server()
 
     st.sidebar.title("Navigation")
     page_selection = st.sidebar.radio("Go to", list(pages.keys()))
 
     # Execute the selected page function
-    pages[page_selection]()
+    load_page(page_selection)()
+
+    with st.sidebar.expander("Diagnostics"):
+        st.write(collect_diagnostics())
+        prompt_runner = sys.modules.get("prompt_runner")
+        telemetry = prompt_runner.get_telemetry() if prompt_runner is not None else None
+        if telemetry is not None:
+            st.download_button("Download LLM telemetry (JSONL)", telemetry.jsonl(), "llm_telemetry.jsonl")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+# market_watch.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dedup import normalize_url
+from exa_cache import normalize_query
+from search_results import Result
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ideas (
+    idea_key TEXT PRIMARY KEY,
+    idea TEXT NOT NULL,
+    newest_published_date TEXT,
+    analysis TEXT,
+    refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS idea_sources (
+    idea_key TEXT NOT NULL,
+    url_key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (idea_key, url_key)
+);
+"""
+
+
+# Per-idea state for incremental market refreshes: the newest publication date
+# seen (the watermark the next search starts from), every source found so far
+# and the last analysis
+class MarketWatch:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # Returns {"watermark", "analysis", "sources"} for a tracked idea, or None.
+    # Sources are in the order they were first found.
+    def get(self, idea):
+        key = normalize_query(idea)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_published_date, analysis FROM ideas WHERE idea_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            sources = self._conn.execute(
+                "SELECT result FROM idea_sources WHERE idea_key = ? ORDER BY added_at, rowid", (key,)
+            ).fetchall()
+        return {
+            "watermark": row[0],
+            "analysis": row[1],
+            "sources": [Result(*json.loads(result)) for result, in sources],
+        }
+
+    # Function to record the sources found for an idea and move its watermark to
+    # the newest publication date among them. Returns the results not seen before.
+    def add_sources(self, idea, results):
+        key = normalize_query(idea)
+        now = time.time()
+        added = []
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO ideas (idea_key, idea, refreshed_at) VALUES (?, ?, ?)", (key, idea, now)
+            )
+            for result in results:
+                result = Result.from_object(result)
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO idea_sources (idea_key, url_key, result, added_at) VALUES (?, ?, ?, ?)",
+                    (key, normalize_url(result.url), json.dumps(list(result)), now),
+                )
+                if cursor.rowcount:
+                    added.append(result)
+            dates = [result.published_date for result in added if result.published_date]
+            if dates:
+                self._conn.execute(
+                    "UPDATE ideas SET newest_published_date = MAX(COALESCE(newest_published_date, ''), ?) "
+                    "WHERE idea_key = ?", (max(dates), key)
+                )
+            self._conn.execute("UPDATE ideas SET refreshed_at = ? WHERE idea_key = ?", (now, key))
+            self._conn.commit()
+        return added
+
+    def set_analysis(self, idea, analysis):
+        with self._lock:
+            self._conn.execute("UPDATE ideas SET analysis = ? WHERE idea_key = ?", (analysis, normalize_query(idea)))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            ideas = self._conn.execute("SELECT COUNT(*) FROM ideas").fetchone()[0]
+            sources = self._conn.execute("SELECT COUNT(*) FROM idea_sources").fetchone()[0]
+        return {"ideas": ideas, "sources": sources}
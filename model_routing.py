@@ -0,0 +1,107 @@
+# model_routing.py
+
+import threading
+import time
+
+from histogram import LatencyHistogram
+
+# Deployment tiers. DEPLOYMENT None keeps the deployment of the llm the page
+# passed in; MAX_TOKENS caps the completion and TIMEOUT_SECONDS is the latency
+# budget a single call may use before the client gives up.
+DEFAULT_TIERS = {
+    "fast": {"DEPLOYMENT": None, "MAX_TOKENS": 800, "TIMEOUT_SECONDS": 15},
+    "standard": {"DEPLOYMENT": None, "MAX_TOKENS": 2000, "TIMEOUT_SECONDS": 60},
+    "long": {"DEPLOYMENT": None, "MAX_TOKENS": 4096, "TIMEOUT_SECONDS": 180},
+}
+DEFAULT_TIER = "standard"
+
+# Prompt function -> tier. Short classification and gating calls go to the fast
+# tier, the multi-section reports to the long one; anything else is standard.
+DEFAULT_ROUTES = {
+    "check_title": "fast",
+    "check_title_structured": "fast",
+    "update_title": "fast",
+    "update_abstract": "fast",
+    "suggest_pdb_model": "fast",
+    "classify": "fast",
+    "classify_build_blocks": "fast",
+    "summarize_market_source": "fast",
+    "market_analysis": "long",
+    "reduce_market_analysis": "long",
+    "morphological_analysis": "long",
+    "stream_morphological_analysis": "long",
+    "attribute_analysis": "long",
+    "stream_attribute_analysis": "long",
+    "breakthrough_opportunity_analysis": "long",
+    "stream_breakthrough_opportunity_analysis": "long",
+    "future_wheel_analysis": "long",
+    "stream_future_wheel_analysis": "long",
+    "opportunity_landscape": "long",
+    "opportunity_breadth": "long",
+    "opportunity_depth": "long",
+    "opportunity_synthesize": "long",
+    "opportunity_prepare_for_landscape": "long",
+    "create_adjacent_domain_prompt": "long",
+    "create_same_domain_prompt": "long",
+    "problem_landscape": "long",
+    "identify_useful_function_map": "long",
+    "identify_harmful_function_map": "long",
+    "generate_breadth_and_depth": "long",
+    "update_depth_breadth": "long",
+}
+
+
+# Picks the llm each prompt function runs on. `build` is called as
+# build(deployment_name=..., temperature=..., max_tokens=..., timeout=...) and is
+# expected to pool its clients (llm_pool.get_llm does).
+class Router:
+    def __init__(self, build, tiers=None, routes=None, default_tier=DEFAULT_TIER):
+        self.build = build
+        self.tiers = {name: dict(tier) for name, tier in (tiers or DEFAULT_TIERS).items()}
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.default_tier = default_tier
+        self.latency = {name: LatencyHistogram() for name in self.tiers}
+        self.counts = {name: {"calls": 0, "over_budget": 0} for name in self.tiers}
+        self._lock = threading.Lock()
+
+    def tier_for(self, function_name):
+        return self.routes.get(function_name, self.default_tier)
+
+    # The page's llm keeps its temperature; the tier decides the rest
+    def llm_for(self, llm, function_name):
+        tier = self.tiers[self.tier_for(function_name)]
+        return self.build(deployment_name=tier.get("DEPLOYMENT") or getattr(llm, "deployment_name", None),
+                          temperature=getattr(llm, "temperature", None),
+                          max_tokens=tier.get("MAX_TOKENS"),
+                          timeout=tier.get("TIMEOUT_SECONDS"))
+
+    def observe(self, function_name, seconds):
+        name = self.tier_for(function_name)
+        self.latency[name].observe(seconds)
+        budget = self.tiers[name].get("TIMEOUT_SECONDS")
+        with self._lock:
+            self.counts[name]["calls"] += 1
+            if budget and seconds > budget:
+                self.counts[name]["over_budget"] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = {name: dict(count) for name, count in self.counts.items()}
+        return {name: dict(counts[name], p50=self.latency[name].quantile(0.5), p95=self.latency[name].quantile(0.95))
+                for name in self.tiers}
+
+
+# Function to time a routed call; the latency recorded covers the whole prompt
+# function, so a streamed one is timed until its generator is exhausted
+def timed(router, function_name, call):
+    start = time.perf_counter()
+    result = call()
+    if hasattr(result, "__next__"):
+        return _timed_stream(router, function_name, result, start)
+    router.observe(function_name, time.perf_counter() - start)
+    return result
+
+
+def _timed_stream(router, function_name, stream, start):
+    yield from stream
+    router.observe(function_name, time.perf_counter() - start)
@@ -0,0 +1,105 @@
+# parallel.py
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+DEFAULT_MAX_WORKERS = 8
+
+
+# Function to run independent zero-argument calls on a bounded thread pool.
+# Yields (key, result, error) in completion order so the caller can render
+# each result from its own thread as soon as it is ready.
+def run_concurrently(calls, max_workers=DEFAULT_MAX_WORKERS):
+    if not calls:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        futures = {executor.submit(call): key for key, call in calls.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                yield key, future.result(), None
+            except Exception as error:
+                yield key, None, error
+
+
+def _check_dag(nodes):
+    for name, (_, deps) in nodes.items():
+        for dep in deps:
+            if dep not in nodes:
+                raise ValueError(f"Node '{name}' depends on unknown node '{dep}'")
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through node '{name}'")
+        visiting.add(name)
+        for dep in nodes[name][1]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in nodes:
+        visit(name)
+
+
+# Function to run a small DAG of calls. nodes maps a name to (fn, deps) and
+# fn is called with the results of its deps, in order, as positional arguments.
+# A node starts as soon as all of its deps have finished. on_complete(name, result)
+# runs in the calling thread. Returns (results, timings) where timings holds the
+# start/end offsets and duration of each node in seconds.
+def run_dag(nodes, max_workers=DEFAULT_MAX_WORKERS, on_complete=None):
+    _check_dag(nodes)
+    results, timings = {}, {}
+    pending = dict(nodes)
+    origin = time.perf_counter()
+
+    def timed(name, fn, args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            end = time.perf_counter()
+            timings[name] = {
+                "start": start - origin,
+                "end": end - origin,
+                "duration": end - start,
+            }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            for name, (fn, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    args = [results[dep] for dep in deps]
+                    running[executor.submit(timed, name, fn, args)] = name
+                    del pending[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                if on_complete is not None:
+                    on_complete(name, results[name])
+
+    return results, timings
+
+
+# Function to find the chain of dependent nodes with the largest total duration
+def critical_path(nodes, timings):
+    best = {}
+
+    def longest(name):
+        if name not in best:
+            deps = nodes[name][1]
+            head = max((longest(dep) for dep in deps), key=lambda path: path[1], default=([], 0.0))
+            best[name] = (head[0] + [name], head[1] + timings[name]["duration"])
+        return best[name]
+
+    return max((longest(name) for name in nodes), key=lambda path: path[1], default=([], 0.0))
@@ -0,0 +1,118 @@
+# passage_ranker.py
+
+import math
+import re
+from collections import Counter, defaultdict, namedtuple
+
+# A chunk of a fetched document; source is the index of the document it came from
+Passage = namedtuple("Passage", ["source", "position", "text"])
+
+DEFAULT_PASSAGE_WORDS = 120
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my no nor not now of off on
+once only or other our ours out over own same she should so some such than that the their theirs them then
+there these they this those through to too under until up very was we were what when where which while who
+whom why will with would you your yours
+""".split())
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+# Function to split a document into passages of about max_words words, breaking
+# on sentence or paragraph boundaries. Run-on text without punctuation is cut
+# into max_words windows.
+def chunk_text(text, max_words=DEFAULT_PASSAGE_WORDS):
+    passages, current, count = [], [], 0
+    for sentence in _SENTENCE.split(text):
+        words = sentence.split()
+        while len(words) > max_words:
+            if current:
+                passages.append(" ".join(current))
+                current, count = [], 0
+            passages.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        if not words:
+            continue
+        if current and count + len(words) > max_words:
+            passages.append(" ".join(current))
+            current, count = [], 0
+        current.extend(words)
+        count += len(words)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+# Okapi BM25 over pre-tokenized documents, with an inverted index so scoring a
+# query only touches the documents that contain its terms
+class BM25:
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.lengths = []
+        self.postings = defaultdict(list)
+        for index, tokens in enumerate(documents):
+            self.lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self.postings[term].append((index, frequency))
+        total = len(self.lengths)
+        self.average_length = sum(self.lengths) / total if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    # Returns {document index: score} for the documents matching any query term
+    def scores(self, query_tokens):
+        scores = defaultdict(float)
+        for term in set(query_tokens):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, frequency in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.average_length or 1))
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+
+# Function to order passages by relevance to several queries at once. Each
+# query ranks the passages on its own and the rankings are interleaved round
+# robin, so every query gets its best evidence near the top. Passages that
+# match no query, and repeats of a passage already taken, are left out.
+def rank_passages(passages, queries):
+    index = BM25([tokenize(passage.text) for passage in passages])
+    rankings = []
+    for query in queries:
+        scores = index.scores(tokenize(query))
+        rankings.append(sorted(scores, key=lambda position: (-scores[position], position)))
+
+    ranked, seen = [], set()
+    for depth in range(max((len(ranking) for ranking in rankings), default=0)):
+        for ranking in rankings:
+            if depth < len(ranking):
+                passage = passages[ranking[depth]]
+                # Repeated boilerplate chunks (share buttons, cookie banners) count once
+                if passage.text not in seen:
+                    seen.add(passage.text)
+                    ranked.append(passage)
+    return ranked
+
+
+# Function to take ranked passages until the token budget is spent.
+# count(text) gives the size of a passage in tokens.
+def select_passages(ranked, budget, count):
+    selected = []
+    for passage in ranked:
+        size = count(passage.text)
+        if size <= budget:
+            selected.append(passage)
+            budget -= size
+    return selected
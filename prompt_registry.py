@@ -0,0 +1,102 @@
+# prompt_registry.py
+
+import functools
+import string
+import threading
+
+from context_packer import DEFAULT_ENCODING, get_encoding
+
+# Azure OpenAI only caches prompt prefixes of at least this many tokens
+MIN_CACHEABLE_TOKENS = 1024
+
+PROMPTS = {}
+
+_lock = threading.Lock()
+_usage = {}
+
+
+def _fields(template):
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+
+
+# A prompt split into a static prefix, sent as the system message and identical on
+# every call so the provider can cache it, and a short variable suffix holding the
+# inputs. Both are checked when the template is registered: the prefix may not
+# contain a placeholder and every placeholder of the suffix must be a plain name.
+class PromptTemplate:
+    def __init__(self, name, system, user):
+        placeholders = [field for field in _fields(system) if field.isidentifier()]
+        if placeholders:
+            raise ValueError(f"static prefix of prompt {name!r} contains placeholders {placeholders}")
+        fields = _fields(user)
+        invalid = [field for field in fields if not field.isidentifier()]
+        if invalid:
+            raise ValueError(f"prompt {name!r} has invalid placeholders {invalid}")
+        self.name = name
+        self.system = system
+        self.user = user
+        self.fields = tuple(dict.fromkeys(fields))
+
+    # The prompt as [system, user] messages, for chat calls
+    def messages(self, **values):
+        from langchain_core.messages import HumanMessage, SystemMessage
+        return [SystemMessage(content=self.system), HumanMessage(content=self.user.format(**values))]
+
+    # The prompt as one string with the static prefix first, for callers that
+    # extend the prompt text (e.g. structured_output)
+    def text(self, **values):
+        return self.system + self.user.format(**values)
+
+    @functools.cached_property
+    def prefix_tokens(self):
+        return len(get_encoding(DEFAULT_ENCODING).encode(self.system, disallowed_special=()))
+
+
+# Function to register a prompt template; each name may only be registered once
+def register_prompt(name, system, user):
+    if name in PROMPTS:
+        raise ValueError(f"prompt {name!r} is already registered")
+    PROMPTS[name] = PromptTemplate(name, system, user)
+    return PROMPTS[name]
+
+
+# The text of a prompt given as a string or a list of chat messages
+def prompt_text(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(message.content for message in prompt)
+
+
+# A JSON-serialisable form of a prompt for cache keys; messages keep their roles
+def prompt_payload(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    return [[message.type, message.content] for message in prompt]
+
+
+# Records the prompt tokens of a reply and how many of them the provider served from
+# its cache. langchain-openai only reports the cached count in the raw token usage,
+# response_metadata["token_usage"]["prompt_tokens_details"]["cached_tokens"].
+def record_prompt_usage(name, message):
+    metadata = getattr(message, "usage_metadata", None) or {}
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    input_tokens = metadata.get("input_tokens") or token_usage.get("prompt_tokens")
+    if not input_tokens:
+        return
+    cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    with _lock:
+        usage = _usage.setdefault(name, {"calls": 0, "input_tokens": 0, "cached_tokens": 0})
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens
+        usage["cached_tokens"] += cached
+
+
+def prompt_cache_stats():
+    with _lock:
+        stats = {name: dict(usage, cached_share=usage["cached_tokens"] / usage["input_tokens"]
+                            if usage["input_tokens"] else 0.0)
+                 for name, usage in _usage.items()}
+    prefixes = {name: {"prefix_tokens": template.prefix_tokens,
+                       "cacheable": template.prefix_tokens >= MIN_CACHEABLE_TOKENS}
+                for name, template in PROMPTS.items()}
+    return {"calls": stats, "prefixes": prefixes}
@@ -0,0 +1,374 @@
+# prompt_runner.py
+
+import contextlib
+import functools
+import logging
+import threading
+
+import streamlit as st
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from context_packer import DEFAULT_ENCODING, get_encoding
+from llm_cache import MemoryTier, ResponseCache, SqliteTier, cache_key
+from llm_pool import get_llm
+from llm_telemetry import DEFAULT_MAX_RECORDS, Telemetry, TelemetryHandler, recorded_parse, serve_metrics
+from model_routing import DEFAULT_ROUTES, DEFAULT_TIER, DEFAULT_TIERS, Router, timed
+from prompt_registry import prompt_payload, prompt_text, record_prompt_usage
+from rate_scheduler import BACKGROUND_FUNCTIONS, DEFAULT_BACKGROUND_RESERVE, DEFAULT_COMPLETION_TOKENS, RateScheduler
+from single_flight import SingleFlight
+
+DEFAULT_CACHE_PATH = ".cache/llm_responses.sqlite3"
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_response_cache = None
+# Identical prompts in flight at the same time, from any session, share one LLM call
+_flights = SingleFlight()
+# Rate scheduler per deployment; the None key, when present, overrides them all
+_schedulers = {}
+_router = None
+_telemetry = None
+_telemetry_handler = None
+_metrics_server = None
+
+
+# Function to build the default two-tier cache from the optional [cache] secrets section
+def _default_response_cache():
+    settings = st.secrets.get("cache", {})
+    if not settings.get("ENABLED", True):
+        return None
+    ttl = settings.get("TTL_SECONDS", DEFAULT_CACHE_TTL)
+    return ResponseCache([
+        MemoryTier(max_entries=int(settings.get("MEMORY_MAX_ENTRIES", 512)), ttl=ttl),
+        SqliteTier(settings.get("PATH", DEFAULT_CACHE_PATH),
+                   max_entries=int(settings.get("DISK_MAX_ENTRIES", 10000)), ttl=ttl),
+    ])
+
+
+def get_response_cache():
+    global _response_cache
+    with _lock:
+        if _response_cache is None:
+            _response_cache = _default_response_cache() or False
+        return _response_cache or None
+
+
+# Swap the cache used by every prompt function (None disables caching)
+def set_response_cache(cache):
+    global _response_cache
+    with _lock:
+        _response_cache = cache if cache is not None else False
+
+
+def response_cache_stats():
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {}
+
+
+# Function to build a deployment's scheduler from the optional [scheduler] secrets
+# section. Quotas are per deployment, so a [scheduler.<deployment name>] table
+# overrides the shared values; without TOKENS_PER_MINUTE calls are not scheduled.
+# REQUESTS_PER_MINUTE defaults to Azure's allotment of 6 per 1000 tokens per minute.
+def _default_scheduler(deployment_name):
+    shared = st.secrets.get("scheduler", {})
+    settings = {key: value for key, value in shared.items() if not hasattr(value, "items")}
+    settings.update(shared.get(deployment_name, {}) if deployment_name else {})
+    if not settings.get("ENABLED", True) or not settings.get("TOKENS_PER_MINUTE"):
+        return None
+    return RateScheduler(
+        int(settings["TOKENS_PER_MINUTE"]),
+        int(settings.get("REQUESTS_PER_MINUTE", int(settings["TOKENS_PER_MINUTE"]) // 1000 * 6)),
+        background_reserve=float(settings.get("BACKGROUND_RESERVE", DEFAULT_BACKGROUND_RESERVE)),
+        completion_tokens=int(settings.get("COMPLETION_TOKENS", DEFAULT_COMPLETION_TOKENS)),
+        background_functions=settings.get("BACKGROUND_FUNCTIONS", BACKGROUND_FUNCTIONS),
+    )
+
+
+def get_scheduler(deployment_name):
+    with _lock:
+        if None in _schedulers:
+            return _schedulers[None] or None
+        if deployment_name not in _schedulers:
+            _schedulers[deployment_name] = _default_scheduler(deployment_name) or False
+        return _schedulers[deployment_name] or None
+
+
+# Swap the scheduler used for every deployment (None disables scheduling)
+def set_scheduler(scheduler):
+    with _lock:
+        _schedulers.clear()
+        _schedulers[None] = scheduler if scheduler is not None else False
+
+
+def scheduler_stats():
+    with _lock:
+        schedulers = {name or "all": scheduler for name, scheduler in _schedulers.items() if scheduler}
+    return {name: scheduler.stats() for name, scheduler in schedulers.items()}
+
+
+# Function to build the model router from the optional [routing] secrets section.
+# [routing.TIERS.<tier>] tables override DEPLOYMENT, MAX_TOKENS and TIMEOUT_SECONDS of
+# a tier and [routing.ROUTES] maps prompt function names to tiers. Without the section
+# every prompt function keeps the llm its page passes in.
+def _default_router():
+    settings = st.secrets.get("routing", {})
+    if not settings or not settings.get("ENABLED", True):
+        return None
+    overrides = settings.get("TIERS", {})
+    tiers = {name: dict(DEFAULT_TIERS.get(name, {}), **overrides.get(name, {}))
+             for name in list(DEFAULT_TIERS) + [name for name in overrides if name not in DEFAULT_TIERS]}
+    routes = dict(DEFAULT_ROUTES, **settings.get("ROUTES", {}))
+    return Router(get_llm, tiers, routes, settings.get("DEFAULT_TIER", DEFAULT_TIER))
+
+
+def get_router():
+    global _router
+    with _lock:
+        if _router is None:
+            _router = _default_router() or False
+        return _router or None
+
+
+# Swap the router used by every prompt function (None disables routing)
+def set_router(router):
+    global _router
+    with _lock:
+        _router = router if router is not None else False
+
+
+def routing_stats():
+    router = get_router()
+    return router.stats() if router is not None else {}
+
+
+# Function to build the call telemetry from the optional [telemetry] secrets section.
+# JSONL_PATH appends every finished call and parse to a file.
+def _default_telemetry():
+    settings = st.secrets.get("telemetry", {})
+    if not settings.get("ENABLED", True):
+        return None
+    return Telemetry(settings.get("JSONL_PATH"), int(settings.get("MAX_RECORDS", DEFAULT_MAX_RECORDS)))
+
+
+def get_telemetry():
+    global _telemetry, _telemetry_handler
+    with _lock:
+        if _telemetry is None:
+            _telemetry = _default_telemetry() or False
+            _telemetry_handler = TelemetryHandler(_telemetry, estimate_tokens) if _telemetry else None
+        return _telemetry or None
+
+
+# Swap the telemetry every prompt function reports to (None disables it)
+def set_telemetry(telemetry):
+    global _telemetry, _telemetry_handler
+    with _lock:
+        _telemetry = telemetry if telemetry is not None else False
+        _telemetry_handler = TelemetryHandler(telemetry, estimate_tokens) if telemetry is not None else None
+
+
+def telemetry_stats():
+    telemetry = get_telemetry()
+    return telemetry.stats() if telemetry is not None else {}
+
+
+# Function to serve the telemetry at http://PROMETHEUS_HOST:PROMETHEUS_PORT/metrics when
+# [telemetry] PROMETHEUS_PORT is set. The app calls it once at startup, never from a
+# prompt call; when the port cannot be bound the error is logged and the telemetry
+# carries on without the endpoint.
+def start_metrics_server():
+    global _metrics_server
+    settings = st.secrets.get("telemetry", {})
+    telemetry = get_telemetry()
+    with _lock:
+        if _metrics_server is not None or telemetry is None or not settings.get("PROMETHEUS_PORT"):
+            return _metrics_server or None
+        host, port = settings.get("PROMETHEUS_HOST", "127.0.0.1"), int(settings["PROMETHEUS_PORT"])
+        try:
+            _metrics_server = serve_metrics(telemetry, port, host)
+        except OSError as error:
+            logger.warning("Not serving LLM metrics: cannot listen on %s:%s (%s)", host, port, error)
+            _metrics_server = False
+        return _metrics_server or None
+
+
+# Decorator for the parse_* function of a prompt function, e.g.
+# @parse_function("generate_title"); records whether the parse found every key
+def parse_function(function_name):
+    return recorded_parse(function_name, get_telemetry)
+
+
+# Prompt tokens as the model will count them, estimated locally
+def estimate_tokens(text):
+    return len(get_encoding(DEFAULT_ENCODING).encode(prompt_text(text), disallowed_special=()))
+
+
+# "coalesced" is the number of LLM calls saved by waiting on an identical call in flight
+def single_flight_stats():
+    return _flights.stats()
+
+
+# Wraps the llm handed to a prompt function so every call is attributed to that function
+class PromptLLM:
+    def __init__(self, llm, name):
+        self.llm = llm
+        self.name = name
+
+    # Names the run after the prompt function and reports it to the telemetry
+    def _config(self):
+        get_telemetry()
+        config = {"metadata": {"prompt_function": self.name}}
+        if _telemetry_handler is not None:
+            config["callbacks"] = [_telemetry_handler]
+        return config
+
+    # The key covers the call's kwargs and the completion cap and timeout bound to
+    # the client (a routed tier's), so a reply cut short by one tier or produced
+    # in JSON mode is never replayed to a call that asked for something else
+    def _key(self, prompt, kwargs):
+        options = dict(kwargs)
+        for attr in ("max_tokens", "request_timeout"):
+            value = getattr(self.llm, attr, None)
+            if value is not None:
+                options[attr] = value
+        return cache_key(getattr(self.llm, "deployment_name", None),
+                         getattr(self.llm, "temperature", None), prompt_payload(prompt), options)
+
+    # Waits for the deployment's rate scheduler to admit the call. The caller records
+    # the tokens the call used in the yielded dict; until it does, the whole
+    # reservation counts as used.
+    @contextlib.contextmanager
+    def _scheduled(self, prompt):
+        scheduler = get_scheduler(getattr(self.llm, "deployment_name", None))
+        if scheduler is None:
+            yield {}
+            return
+        lane = scheduler.lane(self.name)
+        usage = {"prompt_tokens": estimate_tokens(prompt)}
+        reserved = scheduler.acquire(usage["prompt_tokens"],
+                                     getattr(self.llm, "max_tokens", None) or scheduler.completion_tokens, lane)
+        try:
+            yield usage
+        finally:
+            scheduler.release(reserved, usage.get("total_tokens", reserved), lane)
+
+    # Calls with extra options are cached under a key of their own and not coalesced.
+    # With validate, a reply is only cached (or replayed from the cache) when
+    # validate(content) is true, so a reply that fails its caller's checks is not
+    # stored for the whole TTL.
+    def invoke(self, prompt, validate=None, **kwargs):
+        cache = get_response_cache()
+        key = self._key(prompt, kwargs)
+        if cache is not None:
+            content = cache.get(key, self.name)
+            if content is not None and (validate is None or validate(content)):
+                return AIMessage(content=content)
+        if kwargs:
+            return self._invoke(cache, key, prompt, validate, **kwargs)
+
+        response = None
+
+        def call():
+            nonlocal response
+            response = self._invoke(cache, key, prompt, validate)
+            return response.content
+
+        content = _flights.do(key, call)
+        # Followers get the leader's content in a message of their own
+        return response if response is not None else AIMessage(content=content)
+
+    def _invoke(self, cache, key, prompt, validate=None, **kwargs):
+        with self._scheduled(prompt) as usage:
+            response = self.llm.invoke(prompt, config=self._config(), **kwargs)
+            _record_usage(usage, response.content, getattr(response, "usage_metadata", None))
+        record_prompt_usage(self.name, response)
+        if cache is not None and (validate is None or validate(response.content)):
+            cache.set(key, response.content)
+        return response
+
+    # A cached response is replayed as a single chunk; a fresh one is only stored
+    # once the stream has been consumed to the end. Callers arriving while the same
+    # prompt is being streamed or invoked get its content as one chunk when it is done.
+    def stream(self, prompt, **kwargs):
+        cache = get_response_cache()
+        key = self._key(prompt, kwargs)
+        if cache is not None:
+            content = cache.get(key, self.name)
+            if content is not None:
+                yield AIMessageChunk(content=content)
+                return
+        if kwargs:
+            yield from self._stream(cache, key, prompt, **kwargs)
+            return
+
+        while True:
+            call, leader = _flights.join(key)
+            if leader:
+                break
+            ok, content = _flights.wait(call)
+            if ok:
+                yield AIMessageChunk(content=content)
+                return
+
+        try:
+            content = yield from self._stream_scheduled(prompt, **kwargs)
+            if cache is not None:
+                cache.set(key, content)
+        except Exception as error:
+            _flights.finish(key, call, error=error)
+            raise
+        else:
+            _flights.finish(key, call, content)
+        finally:
+            # Still unfinished here means the consumer stopped reading the stream
+            if not call.done.is_set():
+                _flights.finish(key, call, ok=False)
+
+    def _stream(self, cache, key, prompt, **kwargs):
+        content = yield from self._stream_scheduled(prompt, **kwargs)
+        if cache is not None:
+            cache.set(key, content)
+
+    # Yields the chunks of the stream and returns its full content
+    def _stream_scheduled(self, prompt, **kwargs):
+        parts, metadata, response_metadata = [], None, {}
+        with self._scheduled(prompt) as usage:
+            for chunk in self.llm.stream(prompt, config=self._config(), **kwargs):
+                parts.append(chunk.content)
+                metadata = getattr(chunk, "usage_metadata", None) or metadata
+                response_metadata.update(getattr(chunk, "response_metadata", None) or {})
+                yield chunk
+            content = "".join(parts)
+            _record_usage(usage, content, metadata)
+        record_prompt_usage(self.name, AIMessage(content="", usage_metadata=metadata,
+                                                 response_metadata=response_metadata))
+        return content
+
+    def __getattr__(self, attr):
+        return getattr(self.llm, attr)
+
+
+# Tokens used by a call: reported by the API when available, else estimated
+def _record_usage(usage, content, metadata):
+    if "prompt_tokens" not in usage:
+        return
+    if metadata and metadata.get("total_tokens"):
+        usage["total_tokens"] = metadata["total_tokens"]
+    else:
+        usage["total_tokens"] = usage["prompt_tokens"] + estimate_tokens(content)
+
+
+# Decorator for functions shaped like fn(llm, ...) that call llm.invoke(prompt).
+# With a router the function runs on the llm of its tier and is timed against the
+# tier's latency budget.
+def prompt_function(fn):
+    @functools.wraps(fn)
+    def wrapper(llm, *args, **kwargs):
+        router = get_router()
+        if router is None:
+            return fn(PromptLLM(llm, fn.__name__), *args, **kwargs)
+        routed = PromptLLM(router.llm_for(llm, fn.__name__), fn.__name__)
+        return timed(router, fn.__name__, lambda: fn(routed, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,123 @@
+# rate_scheduler.py
+
+import threading
+import time
+
+from histogram import LatencyHistogram
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+# Completion tokens reserved for a call when the client sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+# Share of each quota background calls leave untouched, so an interactive call
+# arriving while a batch flow is running finds capacity without waiting for refill
+DEFAULT_BACKGROUND_RESERVE = 0.2
+QUEUE_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prompt functions of the long, multi-call flows; everything else is interactive
+BACKGROUND_FUNCTIONS = frozenset({
+    "opportunity_breadth", "opportunity_depth", "opportunity_synthesize",
+    "opportunity_prepare_for_landscape", "opportunity_landscape",
+    "morphological_analysis", "stream_morphological_analysis",
+    "attribute_analysis", "stream_attribute_analysis",
+    "market_analysis", "summarize_market_source", "reduce_market_analysis",
+})
+
+
+# Bucket refilled continuously at per_minute/60 units a second up to per_minute.
+# The level may go below zero when a call used more than it reserved.
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Seconds until `amount` can be taken while leaving `floor` in the bucket
+    def wait_time(self, amount, floor, now):
+        self._refill(now)
+        # A request larger than the bucket is let through once it is full
+        needed = min(amount + floor, self.capacity) - self.level
+        return needed / self.rate if needed > 0 else 0.0
+
+    def take(self, amount):
+        self.level = min(self.capacity, self.level - amount)
+
+
+# Admits LLM calls for one deployment against its tokens-per-minute and
+# requests-per-minute quotas. Each call reserves its estimated prompt tokens plus
+# the completion tokens it may produce; the unused part is returned when it ends.
+# Interactive calls always go first, background calls wait while any interactive
+# call is queued and may not take the last `background_reserve` of either quota.
+class RateScheduler:
+    def __init__(self, tokens_per_minute, requests_per_minute, background_reserve=DEFAULT_BACKGROUND_RESERVE,
+                 completion_tokens=DEFAULT_COMPLETION_TOKENS, background_functions=BACKGROUND_FUNCTIONS):
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.requests = TokenBucket(requests_per_minute)
+        self.background_reserve = background_reserve
+        self.completion_tokens = completion_tokens
+        self.background_functions = frozenset(background_functions)
+        self.queue_wait = {lane: LatencyHistogram(QUEUE_WAIT_BUCKETS) for lane in LANES}
+        self.counts = {lane: {"admitted": 0, "reserved_tokens": 0, "used_tokens": 0} for lane in LANES}
+        self._waiting = {lane: 0 for lane in LANES}
+        self._cond = threading.Condition()
+
+    def lane(self, function_name):
+        return BACKGROUND if function_name in self.background_functions else INTERACTIVE
+
+    # Blocks until the call may start. Returns the number of tokens reserved,
+    # to be handed back to release() with the tokens actually used.
+    def acquire(self, prompt_tokens, completion_tokens, lane=INTERACTIVE):
+        cost = prompt_tokens + completion_tokens
+        reserve = self.background_reserve if lane == BACKGROUND else 0.0
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    if lane == BACKGROUND and self._waiting[INTERACTIVE]:
+                        self._cond.wait(1.0)
+                        continue
+                    now = time.monotonic()
+                    delay = max(self.tokens.wait_time(cost, reserve * self.tokens.capacity, now),
+                                self.requests.wait_time(1, reserve * self.requests.capacity, now))
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                self.tokens.take(cost)
+                self.requests.take(1)
+                self.counts[lane]["admitted"] += 1
+                self.counts[lane]["reserved_tokens"] += cost
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+        self.queue_wait[lane].observe(time.monotonic() - start)
+        return cost
+
+    def release(self, reserved, used_tokens, lane=INTERACTIVE):
+        with self._cond:
+            self.tokens.take(used_tokens - reserved)
+            self.counts[lane]["used_tokens"] += used_tokens
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self.tokens._refill(now)
+            self.requests._refill(now)
+            stats = {
+                "tokens_available": round(self.tokens.level),
+                "requests_available": round(self.requests.level, 1),
+            }
+            for lane in LANES:
+                stats[lane] = dict(self.counts[lane], waiting=self._waiting[lane],
+                                   queue_wait_p50=self.queue_wait[lane].quantile(0.5),
+                                   queue_wait_p95=self.queue_wait[lane].quantile(0.95),
+                                   queue_wait=self.queue_wait[lane].snapshot())
+        return stats
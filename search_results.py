@@ -0,0 +1,50 @@
+# search_results.py
+
+from collections import namedtuple
+
+FIELDS = ("url", "id", "title", "score", "published_date", "author", "text")
+
+
+# One search hit, shared by the Exa client, the caches and the document store.
+# Being a namedtuple it is immutable and has no per-instance __dict__, and
+# passing results around only copies references to the same text strings.
+class Result(namedtuple("Result", FIELDS)):
+    __slots__ = ()
+
+    # Accepts any object with the result attributes (e.g. an exa_py result)
+    @classmethod
+    def from_object(cls, obj):
+        if isinstance(obj, cls):
+            return obj
+        return cls(*(getattr(obj, field, None) for field in FIELDS))
+
+    def to_dict(self):
+        return dict(zip(FIELDS, self))
+
+
+class SearchResponse(namedtuple("SearchResponse", ["results", "autoprompt_string"])):
+    __slots__ = ()
+
+    def __new__(cls, results, autoprompt_string=None):
+        return super().__new__(cls, results, autoprompt_string)
+
+
+def extract_search_results(search_response):
+    extracted_results = [result.to_dict() for result in search_response.results]
+    return extracted_results
+
+
+# Function to lay a batch of results out column by column: one list per field,
+# with the text column referencing the records' strings rather than copying them
+def results_columns(results):
+    columns = list(zip(*results)) if results else [()] * len(FIELDS)
+    return {field: list(column) for field, column in zip(FIELDS, columns)}
+
+
+# Function to build a pandas DataFrame over a batch of results. Columns are kept
+# as object dtype so the text column holds references, not converted copies.
+def results_frame(results):
+    import pandas as pd
+    frame = pd.DataFrame(results_columns(results), dtype=object)
+    frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
+    return frame
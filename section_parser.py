@@ -0,0 +1,143 @@
+# section_parser.py
+
+import re
+
+# Tolerated decorations around a header: list markers, numbering, markdown bold
+# and a parenthetical qualifier, e.g. '- **SUPER-SYSTEM (Indian market)**:'
+_PREFIX = r"^[ \t]*(?:[-*•][ \t]+|\d+[.)][ \t]+)?(?:\*\*)?"
+_SUFFIX = r"(?:\*\*)?(?:[ \t]*\([^)\n]*\))?[ \t]*(?:\*\*)?:(?:\*\*)?(?P<value>.*)$"
+# Any other upper-case 'KEY:' line opens a field in an open section
+_UNKNOWN_HEADER = r"(?P<unknown>[A-Z][A-Z0-9_&/ -]{0,60}?)"
+# In open mode, or to skip unknown headers, any short 'Key:' line is a header
+_ANY_HEADER = r"(?P<unknown>[A-Za-z][^:\n]{0,60}?)"
+
+
+def _alternation(headers):
+    return "|".join(re.escape(header) for header in sorted(headers, key=len, reverse=True))
+
+
+class Field:
+    def __init__(self, header, key=None, multiline=False):
+        self.header = header
+        self.key = key or header
+        self.multiline = multiline
+
+
+# A header that opens a group of fields. The text on the header line itself is
+# stored under `main` (or dropped when main is None). With open=True, unknown
+# headers inside the section become fields of it.
+class Section:
+    def __init__(self, header, fields=(), key=None, main=None, open=False):
+        self.header = header
+        self.key = key or header
+        self.fields = {field.header: field for field in fields}
+        self.main = main
+        self.open = open
+
+
+# Declarative parser for LLM output made of 'HEADER: "value"' lines. All headers
+# are compiled into one regex and the text is scanned once; continuation lines
+# are folded into the value of the header that precedes them. Outside open
+# sections a 'Key:' line that is not in the schema (e.g. 'USA: 30% no-shows') is
+# continuation text too, or, with skip_unknown, left out while the value goes on.
+class SectionParser:
+    def __init__(self, schema, open=False, strip_quotes=True, skip_unknown=False):
+        self.schema = list(schema)
+        self.open = open
+        self.strip_quotes = strip_quotes
+        self.skip_unknown = skip_unknown
+        self._top = {item.header: item for item in self.schema}
+
+        headers = set(self._top)
+        for item in self.schema:
+            if isinstance(item, Section):
+                headers.update(item.fields)
+        alternatives = [f"(?P<header>{_alternation(headers)})"] if headers else []
+        if open or skip_unknown or any(isinstance(item, Section) and item.open for item in self.schema):
+            alternatives.append(_ANY_HEADER)
+        else:
+            alternatives.append(_UNKNOWN_HEADER)
+        pattern = _PREFIX + "(?:" + "|".join(alternatives) + ")" + _SUFFIX
+        # Section headers may also stand alone on their line without a colon
+        sections = [item.header for item in self.schema if isinstance(item, Section)]
+        if sections:
+            pattern += rf"|^[ \t]*(?:\*\*)?(?P<bare>{_alternation(sections)})(?:\*\*)?[ \t]*$"
+        self._pattern = re.compile(pattern, re.M)
+
+    def template(self):
+        parsed_data = {}
+        for item in self.schema:
+            if isinstance(item, Section):
+                group = {}
+                if item.main is not None:
+                    group[item.main] = ""
+                for field in item.fields.values():
+                    group[field.key] = ""
+                parsed_data[item.key] = group
+            else:
+                parsed_data[item.key] = ""
+        return parsed_data
+
+    def _clean(self, text):
+        text = text.strip()
+        return text.strip('"') if self.strip_quotes else text
+
+    # Works out where the value of a header goes. Returns the section in scope,
+    # the (container, key, multiline) target or None to drop the value, and
+    # whether the line ends the previous value at all (an unknown header does not).
+    def _resolve(self, match, parsed_data, section):
+        groups = match.groupdict()
+        header = groups.get("header") or groups.get("bare")
+        if header is None:
+            header = groups["unknown"].strip()
+            if section is not None and section.open:
+                return section, (parsed_data[section.key], header, False), True
+            if self.open and header not in self._top:
+                return None, (parsed_data, header, False), True
+            if header not in self._top:
+                return section, None, False
+
+        if section is not None and header in section.fields:
+            field = section.fields[header]
+            return section, (parsed_data[section.key], field.key, field.multiline), True
+
+        item = self._top.get(header)
+        if isinstance(item, Section):
+            if item.main is None:
+                return item, None, True
+            return item, (parsed_data[item.key], item.main, False), True
+        if item is not None:
+            return None, (parsed_data, item.key, item.multiline), True
+        # A section field seen outside its section still lands in the first section that owns it
+        for owner in self.schema:
+            if isinstance(owner, Section) and header in owner.fields:
+                field = owner.fields[header]
+                return owner, (parsed_data[owner.key], field.key, field.multiline), True
+        return section, None, True
+
+    def parse(self, output):
+        parsed_data = self.template()
+        section = None
+        boundaries = []
+        skipped = set()
+        for match in self._pattern.finditer(output):
+            section, target, is_boundary = self._resolve(match, parsed_data, section)
+            if is_boundary:
+                boundaries.append((match, target))
+            elif self.skip_unknown:
+                skipped.add(match.start())
+
+        for index, (match, target) in enumerate(boundaries):
+            if target is None:
+                continue
+            container, key, multiline = target
+            end = boundaries[index + 1][0].start() if index + 1 < len(boundaries) else len(output)
+            parts = [self._clean(match.group("value") or "")]
+            offset = match.end()
+            for line in output[match.end():end].split("\n"):
+                if offset not in skipped:
+                    parts.append(self._clean(line))
+                offset += len(line) + 1
+            container[key] = ("\n" if multiline else " ").join(part for part in parts if part)
+
+        return parsed_data
@@ -0,0 +1,82 @@
+# single_flight.py
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "ok", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.value = None
+        self.error = None
+
+
+# Coalesces concurrent calls with the same key: the first caller (the leader) runs
+# the call and every caller arriving before it finishes waits for and shares its
+# result, or its exception. A leader that stops without either (an abandoned
+# stream, an interrupted script run) releases its followers to run the call
+# themselves.
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counts = {"executed": 0, "coalesced": 0, "abandoned": 0}
+
+    # Returns (call, leader). The leader must hand the outcome to finish();
+    # everyone else passes the call to wait()
+    def join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            self.counts["executed"] += 1
+            return call, True
+
+    # ok=False without an error means the leader gave up
+    def finish(self, key, call, value=None, error=None, ok=True):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if not ok and error is None:
+                self.counts["abandoned"] += 1
+        call.ok, call.value, call.error = ok and error is None, value, error
+        call.done.set()
+
+    # Returns (True, value) once the leader succeeded, raises its exception if it
+    # failed and returns (False, None) if it gave up
+    def wait(self, call):
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        if call.ok:
+            with self._lock:
+                self.counts["coalesced"] += 1
+        return call.ok, call.value
+
+    # Function to run fn() once for all concurrent callers with the same key
+    def do(self, key, fn):
+        while True:
+            call, leader = self.join(key)
+            if not leader:
+                ok, value = self.wait(call)
+                if ok:
+                    return value
+                continue
+            try:
+                value = fn()
+            except Exception as error:
+                self.finish(key, call, error=error)
+                raise
+            except BaseException:
+                # e.g. Streamlit stopping the leader's script run: not the followers' concern
+                self.finish(key, call, ok=False)
+                raise
+            self.finish(key, call, value)
+            return value
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, in_flight=len(self._calls))
@@ -0,0 +1,72 @@
+# source_summaries.py
+
+import os
+import sqlite3
+import threading
+import time
+
+from dedup import content_fingerprint, normalize_url
+
+# Bump when the summary prompt changes so summaries written by the old one are not reused
+SUMMARY_VERSION = 1
+
+
+# Condensed summaries of market sources, keyed by normalized URL and a fingerprint
+# of the text, so every idea and user citing a source shares one summary of it
+# until the page's content changes
+class SourceSummaryCache:
+    def __init__(self, path, version=SUMMARY_VERSION):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS source_summaries ("
+            "url_key TEXT NOT NULL, content_hash TEXT NOT NULL, version INTEGER NOT NULL, url TEXT NOT NULL, "
+            "summary TEXT NOT NULL, created_at REAL NOT NULL, uses INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (url_key, content_hash, version))"
+        )
+        self._conn.commit()
+
+    def _key(self, url, text):
+        return normalize_url(url), content_fingerprint(text) or "", self.version
+
+    # Returns the summary of this URL with this text, or None
+    def get(self, url, text):
+        key = self._key(url, text)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM source_summaries WHERE url_key = ? AND content_hash = ? AND version = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE source_summaries SET uses = uses + 1 WHERE url_key = ? AND content_hash = ? AND version = ?",
+                key,
+            )
+            self._conn.commit()
+        return row[0]
+
+    def put(self, url, text, summary):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO source_summaries (url_key, content_hash, version, url, summary, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._key(url, text) + (url, summary, time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, uses = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(uses), 0) FROM source_summaries WHERE version = ?", (self.version,)
+            ).fetchone()
+        return {"entries": entries, "reuses": uses, "hits": self.hits, "misses": self.misses}
@@ -1,26 +1,17 @@
 # spark_blocks.py
 
 import streamlit as st
-from langchain_openai import AzureChatOpenAI
+from llm_pool import get_llm
+from prompt_registry import register_prompt
+from prompt_runner import prompt_function
 
 # Function to initialize AzureChatOpenAI
 def initialize_llm():
-    api_key = st.secrets["azure"]["AZURE_OPENAI_API_KEY"]
-    api_version = st.secrets["azure"]["AZURE_OPENAI_API_VERSION"]
-    deployment_name = st.secrets["azure"]["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"]
-    endpoint = st.secrets["azure"]["AZURE_OPENAI_ENDPOINT"]
-
-    llm = AzureChatOpenAI(
-        openai_api_key=api_key,
-        openai_api_version=api_version,
-        azure_deployment=deployment_name,
-        azure_endpoint=endpoint
-    )
-    return llm
+    return get_llm()
 
-# Function to classify problem statement for "Spark Blocks"
-def classify(llm, problem):
-    prompt = f'''
+# The definitions are the static system prefix, identical on every call so the
+# provider serves them from its prompt cache; only the problem statement varies
+CLASSIFY_PROMPT = register_prompt("spark_blocks.classify", '''
     You are Kreat.ai who helps innovators with their innovations. 
     Given a problem statement. Your job is classify the problem statement into one of the following:
     1. Problem  
@@ -97,10 +88,14 @@ def classify(llm, problem):
     Explain your reasoning stepwise as to why it is classified in that category and why is it not classified in the other categories.
     Strictly use the above guidelines and definations of the classification given above.
     Give the output in markdown format.
-    Problem: {problem}
+''', '''    Problem: {problem}
     Answer:
-    '''
-    response = llm.invoke(prompt)
+    ''')
+
+# Function to classify problem statement for "Spark Blocks"
+@prompt_function
+def classify(llm, problem):
+    response = llm.invoke(CLASSIFY_PROMPT.messages(problem=problem))
     return response.content
 
 def spark_blocks_app():
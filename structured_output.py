@@ -0,0 +1,196 @@
+# structured_output.py
+
+import functools
+import json
+import re
+import threading
+from typing import Dict, List
+
+from langchain_core.pydantic_v1 import BaseModel, Field, ValidationError, validator
+
+from prompt_runner import PromptLLM
+
+JSON_MODE = {"type": "json_object"}
+
+_lock = threading.Lock()
+_stats = {"direct": 0, "repaired": 0, "retried": 0, "failed": 0}
+
+
+def _upper(value):
+    return value.strip().upper() if isinstance(value, str) else value
+
+
+class TitleGeneration(BaseModel):
+    title: str = Field(description="The generated problem statement title")
+    evaluation: Dict[str, str] = Field(description="Each guideline name in capitals mapped to YES or NO")
+
+    _normalize_evaluation = validator("evaluation", allow_reuse=True)(
+        lambda evaluation: {key.strip().upper(): _upper(value) for key, value in evaluation.items()}
+    )
+
+
+class TitleCheck(BaseModel):
+    overall_evaluation: str = Field(description="YES or NO")
+    guideline_evaluations: Dict[str, str] = Field(description="Each guideline name in capitals mapped to YES or NO")
+    improvement_suggestions: str
+
+    _normalize_overall = validator("overall_evaluation", allow_reuse=True)(_upper)
+    _normalize_guidelines = validator("guideline_evaluations", allow_reuse=True)(
+        lambda evaluations: {key.strip().upper(): _upper(value) for key, value in evaluations.items()}
+    )
+
+
+class ProblemAssessment(BaseModel):
+    complexity_score: int = Field(ge=1, le=10)
+    complexity_reasoning: str
+    predictability_score: int = Field(ge=1, le=10)
+    predictability_reasoning: str
+    classification: str = Field(description="COMPLEX, COMPLICATED, WICKED or SIMPLE")
+    classification_reasoning: str
+    confidence_score: int = Field(ge=1, le=10)
+    confidence_reasoning: str
+
+    _normalize_classification = validator("classification", allow_reuse=True)(_upper)
+
+
+class Assumption(BaseModel):
+    assumption: str
+    rationale: str
+    type: str = Field(description="TECHNICAL or SOCIAL")
+    uncertainty: str = Field(description="LOW, MEDIUM or HIGH")
+
+    _normalize_labels = validator("type", "uncertainty", allow_reuse=True)(_upper)
+
+
+class Assumptions(BaseModel):
+    assumptions: List[Assumption]
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+# Trailing commas and Python literals, in text that is not inside a string
+def _repair_outside(segment, last=False):
+    segment = re.sub(r",(\s*[}\]])", r"\1", segment)
+    if last:
+        # A truncated reply may stop right after a comma; the closers follow it
+        segment = re.sub(r",\s*$", "", segment)
+    return re.sub(r"\b(True|False|None)\b", lambda match: _LITERALS[match.group(1)], segment)
+
+
+# Fast local fixes for the usual near-misses: code fences, prose around the
+# object, smart quotes used as string delimiters, trailing commas, Python
+# literals and truncated closers. Text inside strings is left as it is.
+def repair_json(text):
+    text = re.sub(r"^\s*```(?:json)?\s*|\s*```\s*$", "", text.strip())
+    start = text.find("{")
+    if start == -1:
+        return text
+    end = text.rfind("}")
+    text = text[start:end + 1] if end > start else text[start:]
+
+    parts, segment, closers = [], [], []
+    in_string = escaped = smart = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"' or (smart and char == "”"):
+                in_string = False
+                parts.append("".join(segment) + '"')
+                segment = []
+                continue
+            segment.append(char)
+        elif char in '"“”':
+            parts.append(_repair_outside("".join(segment)))
+            segment = ['"']
+            in_string, smart = True, char != '"'
+        else:
+            if char in "{[":
+                closers.append("}" if char == "{" else "]")
+            elif char in "}]" and closers:
+                closers.pop()
+            segment.append(char)
+    if in_string:
+        parts.append("".join(segment) + '"')
+    else:
+        parts.append(_repair_outside("".join(segment), last=bool(closers)))
+    return "".join(parts) + "".join(reversed(closers))
+
+
+def _count(outcome):
+    with _lock:
+        _stats[outcome] += 1
+
+
+def structured_output_stats():
+    with _lock:
+        return dict(_stats)
+
+
+# Function to validate a response against a model, trying the raw text first
+# and the locally repaired text second. Returns (result, repaired).
+def parse_structured(text, model):
+    try:
+        return model.parse_obj(json.loads(text)), False
+    except (ValueError, ValidationError) as error:
+        first_error = error
+    try:
+        return model.parse_obj(json.loads(repair_json(text))), True
+    except (ValueError, ValidationError):
+        raise StructuredOutputError(str(first_error)) from first_error
+
+
+def structured_prompt(prompt, model):
+    return f"""{prompt}
+
+    Return the same information as a single JSON object instead of the line format above.
+    Do not add any text or code fences around the JSON. The object must validate against this JSON schema:
+    {model.schema_json()}
+    """
+
+
+def _validates(model):
+    def validate(content):
+        try:
+            parse_structured(content, model)
+        except StructuredOutputError:
+            return False
+        return True
+    return validate
+
+
+# Function to run a prompt in JSON mode and validate the reply. Only when the
+# reply cannot be repaired locally is the model asked again, with the error.
+# Replies that do not validate are never stored in the response cache.
+def invoke_structured(llm, prompt, model, max_retries=1, json_mode=True):
+    kwargs = {"response_format": JSON_MODE} if json_mode else {}
+    prompt = structured_prompt(prompt, model)
+    invoke = functools.partial(llm.invoke, validate=_validates(model)) if isinstance(llm, PromptLLM) else llm.invoke
+    response = invoke(prompt, **kwargs)
+
+    for attempt in range(max_retries + 1):
+        try:
+            result, repaired = parse_structured(response.content, model)
+        except StructuredOutputError as error:
+            if attempt == max_retries:
+                _count("failed")
+                raise
+            retry_prompt = f"""{prompt}
+
+    Your previous reply did not validate:
+    {response.content}
+
+    Error: {error}
+    Reply again with only the corrected JSON object.
+    """
+            response = invoke(retry_prompt, **kwargs)
+            continue
+        _count("retried" if attempt else "repaired" if repaired else "direct")
+        return result
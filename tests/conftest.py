@@ -0,0 +1,26 @@
+# tests/conftest.py
+
+import logging
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# There are no secrets outside `streamlit run`, so every secrets-driven default
+# of prompt_runner is switched off; tests that need one install it themselves
+@pytest.fixture(autouse=True)
+def no_secrets_defaults():
+    import prompt_runner
+
+    prompt_runner.set_response_cache(None)
+    prompt_runner.set_scheduler(None)
+    prompt_runner.set_router(None)
+    prompt_runner.set_telemetry(None)
+    # Parsers that write tables to the page only log warnings outside a script run
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
@@ -0,0 +1,737 @@
+# tests/legacy_parsers.py
+#
+# The parse_* functions as they were before section_parser.SectionParser
+# replaced them, kept verbatim as the reference for test_parser_parity.py.
+# parse_breakthrough_analysis was never converted and is not repeated here.
+
+import pandas as pd
+import streamlit as st
+
+
+def parse_problem_extraction(output):
+    # Initialize a dictionary to store the parsed values
+    parsed_data = {
+        "CORE ISSUE": "",
+        "AFFECTED STAKEHOLDERS": "",
+        "CONTEXT OR SCOPE": "",
+        "CURRENT IMPACT": "",
+        "DESIRED OUTCOME": "",
+        "ROOT CAUSES": "",
+        "TIMEFRAME": "",
+        "QUANTIFIABLE ASPECTS": "",
+        "INDUSTRY OR FIELD": "",
+        "KEY TERMS": "",
+        "CONSTRAINTS": "",
+        "UNIQUE ASPECTS": ""
+    }
+
+    # Split the output by lines
+    lines = output.split('\n')
+
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            # Check if the line starts with any of our keys
+            for key in parsed_data.keys():
+                if line.startswith(key + ":"):
+                    current_key = key
+                    parsed_data[key] = line.split(":", 1)[1].strip()
+                    break
+            else:
+                # If no key is found, it's a continuation of the previous value
+                if current_key:
+                    parsed_data[current_key] += " " + line
+
+    return parsed_data
+
+
+def parse_title_generation(output):
+    # Initialize a dictionary to store the parsed values
+    parsed_data = {
+        "TITLE": "",
+        "EVALUATION": {
+            "SCOPE INDICATION": "",
+            "STAKEHOLDER FOCUS": "",
+            "TIMEFRAME": "",
+            "OUTCOME-ORIENTED": "",
+            "KEYWORD OPTIMIZATION": "",
+            "AVOID UNNECESSARY WORDS": "",
+            "USE ACTIVE VOICE": "",
+            "QUANTIFY IF POSSIBLE": "",
+            "AVOID QUESTIONS": "",
+            "BALANCE CREATIVITY AND CLARITY": "",
+            "CONSISTENCY": "",
+            "AVOID ABBREVIATIONS": "",
+            "CLARITY AND SIMPLICITY": "",
+            "ENGAGEMENT": "",
+            "PRECISION": "",
+            "LENGTH": "",
+            "PERSPECTIVE": ""
+        }
+    }
+
+    # Split the output by lines
+    lines = output.split('\n')
+
+    # Flag to indicate when we've reached the evaluation section
+    evaluation_section = False
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("TITLE:"):
+            # Extract the title, removing quotation marks
+            parsed_data["TITLE"] = line.split(":", 1)[1].strip().strip('"')
+        elif line == "EVALUATION:":
+            evaluation_section = True
+        elif evaluation_section and ":" in line:
+            # Split the line into key and value
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip().strip('"')  # Remove quotation marks
+            if key in parsed_data["EVALUATION"]:
+                parsed_data["EVALUATION"][key] = value
+
+    return parsed_data
+
+
+def parse_title_check(output):
+    parsed_data = {
+        "OVERALL_EVALUATION": "",
+        "GUIDELINE_EVALUATIONS": {},
+        "IMPROVEMENT_SUGGESTIONS": ""
+    }
+
+    lines = output.split('\n')
+    current_section = None
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("OVERALL_EVALUATION:"):
+            parsed_data["OVERALL_EVALUATION"] = line.split(":", 1)[1].strip().strip('"')
+        elif line == "GUIDELINE_EVALUATIONS:":
+            current_section = "GUIDELINE_EVALUATIONS"
+        elif line.startswith("IMPROVEMENT_SUGGESTIONS:"):
+            parsed_data["IMPROVEMENT_SUGGESTIONS"] = line.split(":", 1)[1].strip().strip('"')
+        elif current_section == "GUIDELINE_EVALUATIONS" and ":" in line:
+            key, value = line.split(":", 1)
+            parsed_data["GUIDELINE_EVALUATIONS"][key.strip()] = value.strip().strip('"')
+
+    return parsed_data
+
+
+def parse_title_update(output):
+    parsed_data = {
+        "SENTIMENT": "",
+        "ACTION": "",
+        "TITLE": "",
+        "EXPLANATION": ""
+    }
+
+    lines = output.split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip().strip('"')
+            if key in parsed_data:
+                parsed_data[key] = value
+
+    return parsed_data
+
+
+def parse_abstract_generation(output):
+    parsed_data = {
+        "ABSTRACT": "",
+        "REASONING": ""
+    }
+
+    lines = output.split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("ABSTRACT:"):
+            parsed_data["ABSTRACT"] = line.split(":", 1)[1].strip().strip('"')
+        elif line.startswith("REASONING:"):
+            parsed_data["REASONING"] = line.split(":", 1)[1].strip().strip('"')
+
+    return parsed_data
+
+
+def parse_abstract_update(output):
+    parsed_data = {
+        "SENTIMENT": "",
+        "ACTION": "",
+        "ABSTRACT": "",
+        "EXPLANATION": ""
+    }
+
+    lines = output.split('\n')
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+                if key in parsed_data:
+                    parsed_data[key] = value
+                    current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                parsed_data[current_key] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_problem_assessment(output):
+    parsed_data = {
+        "COMPLEXITY_SCORE": "",
+        "COMPLEXITY_REASONING": "",
+        "PREDICTABILITY_SCORE": "",
+        "PREDICTABILITY_REASONING": "",
+        "CLASSIFICATION": "",
+        "CLASSIFICATION_REASONING": "",
+        "CONFIDENCE_SCORE": "",
+        "CONFIDENCE_REASONING": ""
+    }
+
+    lines = output.split('\n')
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+                if key in parsed_data:
+                    parsed_data[key] = value
+                    current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                parsed_data[current_key] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_assumptions(output):
+    parsed_data = {}
+    lines = output.split('\n')
+    current_key = None
+    assumption_count = 0
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+                
+                if key.startswith("ASSUMPTION"):
+                    assumption_count += 1
+                    parsed_data[f"assumption_{assumption_count}"] = {
+                        "assumption": value,
+                        "rationale": "",
+                        "type": "",
+                        "uncertainty": ""
+                    }
+                elif key.startswith("RATIONALE"):
+                    parsed_data[f"assumption_{assumption_count}"]["rationale"] = value
+                elif key.startswith("TYPE"):
+                    parsed_data[f"assumption_{assumption_count}"]["type"] = value
+                elif key.startswith("UNCERTAINTY"):
+                    parsed_data[f"assumption_{assumption_count}"]["uncertainty"] = value
+                
+                current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                if current_key.startswith("ASSUMPTION"):
+                    parsed_data[f"assumption_{assumption_count}"]["assumption"] += " " + line.strip('"')
+                elif current_key.startswith("RATIONALE"):
+                    parsed_data[f"assumption_{assumption_count}"]["rationale"] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_problem_description(output):
+    parsed_data = {
+        "DESCRIPTION": "",
+        "EVALUATION": {}
+    }
+
+    lines = output.split('\n')
+    current_section = None
+    description_parts = []
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("DESCRIPTION:"):
+            current_section = "DESCRIPTION"
+        elif line.startswith("EVALUATION:"):
+            current_section = "EVALUATION"
+        elif current_section == "DESCRIPTION" and line:
+            description_parts.append(line.strip('"'))
+        elif current_section == "EVALUATION" and ":" in line:
+            key, value = line.split(":", 1)
+            parsed_data["EVALUATION"][key.strip()] = value.strip().strip('"')
+
+    parsed_data["DESCRIPTION"] = "\n".join(description_parts)
+
+    return parsed_data
+
+
+def parse_pbd_suggestion(output):
+    # Initialize a dictionary to store the parsed values
+    parsed_data = {
+        "SUGGESTED MODEL": "",
+        "REASONING": ""
+    }
+
+    # Split the output by lines and process each line
+    lines = output.split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("SUGGESTED MODEL:"):
+            parsed_data["SUGGESTED MODEL"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("REASONING:"):
+            parsed_data["REASONING"] = line.split(":")[1].strip().strip('"')
+        elif "REASONING" in parsed_data and parsed_data["REASONING"]:
+            parsed_data["REASONING"] += " " + line.strip().strip('"')
+
+    return parsed_data
+
+
+def parse_5w1h_analysis(output):
+    parsed_data = {
+        "WHO": {"MAIN": "", "KEY_STAKEHOLDERS": "", "AFFECTED_PARTIES": ""},
+        "WHAT": {"MAIN": "", "CORE_ISSUE": "", "RELATED_FACTORS": ""},
+        "WHERE": {"MAIN": "", "PHYSICAL_LOCATIONS": "", "CONTEXTUAL_ENVIRONMENT": ""},
+        "WHEN": {"MAIN": "", "TIMEFRAME": "", "MILESTONES": ""},
+        "WHY": {"MAIN": "", "ROOT_CAUSES": "", "MOTIVATING_FACTORS": ""},
+        "HOW": {"MAIN": "", "POTENTIAL_SOLUTIONS": "", "IMPLEMENTATION_CHALLENGES": ""},
+        "SUMMARY": ""
+    }
+
+    lines = output.split('\n')
+    current_section = None
+    current_subsection = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if line in parsed_data:
+                current_section = line
+                current_subsection = "MAIN"
+            elif ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+                if current_section and key in parsed_data[current_section]:
+                    parsed_data[current_section][key] = value
+                    current_subsection = key
+            elif current_section and current_subsection:
+                parsed_data[current_section][current_subsection] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_5ps_analysis(output):
+    parsed_data = {
+        "PEOPLE": {"MAIN": "", "KEY_PERSONNEL": "", "SKILLS_COMPETENCIES": "", "ORGANIZATIONAL_STRUCTURE": ""},
+        "PROCESS": {"MAIN": "", "CORE_PROCESSES": "", "EFFICIENCY_BOTTLENECKS": "", "PROCESS_INTEGRATION": ""},
+        "PRODUCTS": {"MAIN": "", "PRODUCT_PORTFOLIO": "", "MARKET_POSITIONING": "", "INNOVATION_PIPELINE": ""},
+        "PROGRAMS": {"MAIN": "", "KEY_INITIATIVES": "", "RESOURCE_ALLOCATION": "", "PROGRAM_EFFECTIVENESS": ""},
+        "PERFORMANCE": {"MAIN": "", "KEY_INDICATORS": "", "BENCHMARKING_RESULTS": "", "IMPROVEMENT_AREAS": ""},
+        "STRATEGIC_IMPLICATIONS": ""
+    }
+
+    lines = output.split('\n')
+    current_section = None
+    current_subsection = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if line in parsed_data:
+                current_section = line
+                current_subsection = "MAIN"
+            elif ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+                if current_section and key in parsed_data[current_section]:
+                    parsed_data[current_section][key] = value
+                    current_subsection = key
+            elif current_section and current_subsection:
+                parsed_data[current_section][current_subsection] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_5ms_analysis(output):
+    parsed_data = {
+        "MAN": {
+            "overall": "",
+            "workforce_skills": "",
+            "human_factors": "",
+            "shift_patterns": ""
+        },
+        "MACHINE": {
+            "overall": "",
+            "equipment_capabilities": "",
+            "maintenance": "",
+            "automation": ""
+        },
+        "MATERIAL": {
+            "overall": "",
+            "raw_material": "",
+            "inventory": "",
+            "material_handling": ""
+        },
+        "METHOD": {
+            "overall": "",
+            "production_processes": "",
+            "sops": "",
+            "optimization": ""
+        },
+        "MEASUREMENT": {
+            "overall": "",
+            "quality_metrics": "",
+            "inspection": "",
+            "data_analysis": ""
+        },
+        "ROOT_CAUSE": "",
+        "RECOMMENDATIONS": ""
+    }
+
+    lines = output.split('\n')
+    current_category = None
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+
+                if key in parsed_data:
+                    current_category = key
+                    parsed_data[key]["overall"] = value
+                elif key in ["ROOT_CAUSE", "RECOMMENDATIONS"]:
+                    parsed_data[key] = value
+                elif current_category:
+                    parsed_data[current_category][key.lower()] = value
+                current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                if current_key in ["ROOT_CAUSE", "RECOMMENDATIONS"]:
+                    parsed_data[current_key] += " " + line.strip('"')
+                elif current_category:
+                    if current_key in parsed_data[current_category]:
+                        parsed_data[current_category][current_key.lower()] += " " + line.strip('"')
+                    else:
+                        parsed_data[current_category]["overall"] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_5es_analysis(output):
+    parsed_data = {
+        "ENVIRONMENT": {
+            "overall": "",
+            "physical_social_context": "",
+            "existing_policies": "",
+            "barriers_facilitators": ""
+        },
+        "EDUCATION": {
+            "overall": "",
+            "target_audience": "",
+            "educational_strategies": "",
+            "knowledge_gaps": ""
+        },
+        "ENGINEERING": {
+            "overall": "",
+            "design_interventions": "",
+            "tech_solutions": "",
+            "infrastructure": ""
+        },
+        "ENFORCEMENT": {
+            "overall": "",
+            "regulatory_measures": "",
+            "compliance_strategies": "",
+            "incentives": ""
+        },
+        "EVALUATION": {
+            "overall": "",
+            "kpis": "",
+            "monitoring_methods": "",
+            "feedback_mechanisms": ""
+        },
+        "STRATEGIC_RECOMMENDATIONS": ""
+    }
+
+    lines = output.split('\n')
+    current_category = None
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+
+                if key in parsed_data:
+                    current_category = key
+                    if key == "STRATEGIC_RECOMMENDATIONS":
+                        parsed_data[key] = value
+                    else:
+                        parsed_data[key]["overall"] = value
+                elif current_category and key in parsed_data[current_category]:
+                    parsed_data[current_category][key.lower()] = value
+                current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                if current_key == "STRATEGIC_RECOMMENDATIONS":
+                    parsed_data[current_key] += " " + line.strip('"')
+                elif current_category:
+                    if current_key in parsed_data[current_category]:
+                        parsed_data[current_category][current_key.lower()] += " " + line.strip('"')
+                    else:
+                        parsed_data[current_category]["overall"] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_4ps_analysis(output):
+    parsed_data = {
+        "PRODUCT": {
+            "overall": "",
+            "core_features": "",
+            "product_line": "",
+            "branding": ""
+        },
+        "PRICE": {
+            "overall": "",
+            "pricing_strategy": "",
+            "discount_policies": "",
+            "payment_terms": ""
+        },
+        "PLACE": {
+            "overall": "",
+            "distribution_channels": "",
+            "market_coverage": "",
+            "inventory_logistics": ""
+        },
+        "PROMOTION": {
+            "overall": "",
+            "marketing_mix": "",
+            "key_messages": "",
+            "media_strategy": ""
+        },
+        "INTEGRATED_STRATEGY": ""
+    }
+
+    lines = output.split('\n')
+    current_category = None
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+
+                if key in parsed_data:
+                    current_category = key
+                    if key == "INTEGRATED_STRATEGY":
+                        parsed_data[key] = value
+                    else:
+                        parsed_data[key]["overall"] = value
+                elif current_category and key in parsed_data[current_category]:
+                    parsed_data[current_category][key.lower()] = value
+                current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                if current_key == "INTEGRATED_STRATEGY":
+                    parsed_data[current_key] += " " + line.strip('"')
+                elif current_category:
+                    if current_key in parsed_data[current_category]:
+                        parsed_data[current_category][current_key.lower()] += " " + line.strip('"')
+                    else:
+                        parsed_data[current_category]["overall"] += " " + line.strip('"')
+
+    return parsed_data
+
+
+def parse_problem_landscape_output(output):
+    # Initialize a dictionary to store the parsed values
+    parsed_data = {
+        "past_super_system": "",
+        "past_system": "",
+        "past_sub_system": "",
+        "present_super_system": "",
+        "present_system": "",
+        "present_sub_system": "",
+        "future_super_system": "",
+        "future_system": "",
+        "future_sub_system": ""
+    }
+
+    # Split the output by lines and process each line
+    for line in output.split('\n'):
+        # Remove leading and trailing whitespace from each line
+        line = line.strip()
+        if line.startswith("PAST SUPER SYSTEM:"):
+            parsed_data["past_super_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("PAST SYSTEM:"):
+            parsed_data["past_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("PAST SUB SYSTEM:"):
+            parsed_data["past_sub_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("PRESENT SUPER SYSTEM:"):
+            parsed_data["present_super_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("PRESENT SYSTEM:"):
+            parsed_data["present_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("PRESENT SUB SYSTEM:"):
+            parsed_data["present_sub_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("FUTURE SUPER SYSTEM:"):
+            parsed_data["future_super_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("FUTURE SYSTEM:"):
+            parsed_data["future_system"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("FUTURE SUB SYSTEM:"):
+            parsed_data["future_sub_system"] = line.split(":")[1].strip().strip('"')
+    #st.write(parsed_data)
+    # Create a DataFrame
+    data = {
+        "Past": [parsed_data["past_super_system"], parsed_data["past_system"], parsed_data["past_sub_system"]],
+        "Present": [parsed_data["present_super_system"], parsed_data["present_system"], parsed_data["present_sub_system"]],
+        "Future": [parsed_data["future_super_system"], parsed_data["future_system"], parsed_data["future_sub_system"]]
+    }
+
+    index = ["Super System", "System", "Sub System"]
+
+    df = pd.DataFrame(data, index=index)
+
+    return df,parsed_data
+
+
+def parse_opportunity_pre_landscape(output):
+    parsed_data = {}
+    lines = output.split('\n')
+    current_key = None
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip().strip('"')
+                parsed_data[key] = value
+                current_key = key
+            elif current_key:
+                # If there's no colon, it's a continuation of the previous value
+                parsed_data[current_key] += " " + line.strip('"')
+
+    # Convert the parsed data to a DataFrame
+    df = pd.DataFrame(list(parsed_data.items()), columns=['Aspect', 'Details'])
+    
+    # Display the DataFrame using Streamlit
+    st.write(df)
+
+    # Return the parsed data as JSON
+    return parsed_data
+
+
+def parse_opportunity_landscape_output(output):
+    # Initialize a dictionary to store the parsed values
+    parsed_data = {
+        "system_definition": {"core": "", "context": "", "components": ""},
+        "super_system": {"past": "", "present": "", "future": ""},
+        "system": {"past": "", "present": "", "future": ""},
+        "sub_system": {"past": "", "present": "", "future": ""},
+        "regulatory_environment": {"past": "", "present": "", "future": ""},
+        "market_readiness": {"past": "", "present": "", "future": ""},
+        "infrastructure_readiness": {"past": "", "present": "", "future": ""},
+        "interactions_patterns": "",
+        "opportunity_identification": "",
+        "constraints_enablers": "",
+        "synthesis": ""
+    }
+
+    # Split the output by lines and process each line
+    current_section = ""
+    for line in output.split('\n'):
+        line = line.strip()
+        if line.startswith("SYSTEM DEFINITION:"):
+            current_section = "system_definition"
+        elif line.startswith("Core Opportunity:"):
+            parsed_data["system_definition"]["core"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("Broader Context:"):
+            parsed_data["system_definition"]["context"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("Component Parts:"):
+            parsed_data["system_definition"]["components"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("SUPER-SYSTEM:"):
+            current_section = "super_system"
+        elif line.startswith("SYSTEM:"):
+            current_section = "system"
+        elif line.startswith("SUB-SYSTEM:"):
+            current_section = "sub_system"
+        elif line.startswith("REGULATORY ENVIRONMENT:"):
+            current_section = "regulatory_environment"
+        elif line.startswith("MARKET READINESS:"):
+            current_section = "market_readiness"
+        elif line.startswith("INFRASTRUCTURE READINESS:"):
+            current_section = "infrastructure_readiness"
+        elif line.startswith("Past:") and current_section:
+            parsed_data[current_section]["past"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("Present:") and current_section:
+            parsed_data[current_section]["present"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("Future:") and current_section:
+            parsed_data[current_section]["future"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("INTERACTIONS AND PATTERNS:"):
+            parsed_data["interactions_patterns"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("OPPORTUNITY IDENTIFICATION:"):
+            parsed_data["opportunity_identification"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("CONSTRAINTS AND ENABLERS:"):
+            parsed_data["constraints_enablers"] = line.split(":")[1].strip().strip('"')
+        elif line.startswith("SYNTHESIS:"):
+            parsed_data["synthesis"] = line.split(":")[1].strip().strip('"')
+
+    # Create DataFrames
+    main_df = pd.DataFrame({
+        "Category": ["Super-System", "System", "Sub-System", "Regulatory Environment", "Market Readiness", "Infrastructure Readiness"],
+        "Past": [parsed_data["super_system"]["past"], parsed_data["system"]["past"], parsed_data["sub_system"]["past"],
+                 parsed_data["regulatory_environment"]["past"], parsed_data["market_readiness"]["past"], parsed_data["infrastructure_readiness"]["past"]],
+        "Present": [parsed_data["super_system"]["present"], parsed_data["system"]["present"], parsed_data["sub_system"]["present"],
+                    parsed_data["regulatory_environment"]["present"], parsed_data["market_readiness"]["present"], parsed_data["infrastructure_readiness"]["present"]],
+        "Future": [parsed_data["super_system"]["future"], parsed_data["system"]["future"], parsed_data["sub_system"]["future"],
+                   parsed_data["regulatory_environment"]["future"], parsed_data["market_readiness"]["future"], parsed_data["infrastructure_readiness"]["future"]]
+    })
+    st.write(main_df)
+    additional_info_df = pd.DataFrame({
+        "Category": ["System Definition", "Interactions and Patterns", "Opportunity Identification", "Constraints and Enablers", "Synthesis"],
+        "Information": [
+            f"Core: {parsed_data['system_definition']['core']}\nContext: {parsed_data['system_definition']['context']}\nComponents: {parsed_data['system_definition']['components']}",
+            parsed_data["interactions_patterns"],
+            parsed_data["opportunity_identification"],
+            parsed_data["constraints_enablers"],
+            parsed_data["synthesis"]
+        ]
+    })
+
+    return main_df, additional_info_df, parsed_data
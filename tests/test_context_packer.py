@@ -0,0 +1,72 @@
+# tests/test_context_packer.py
+
+import pytest
+import tiktoken
+
+from context_packer import ContextPacker, Source, allocate
+
+
+# One token per byte: cl100k_base needs a download, and a byte-level encoding
+# also splits every non-ASCII character across tokens
+@pytest.fixture
+def encoding():
+    return tiktoken.Encoding("bytes", pat_str=r"\S+|\s+", mergeable_ranks={bytes([byte]): byte for byte in range(256)},
+                             special_tokens={})
+
+
+def sources():
+    return [
+        Source("short", "Title: Short note\n", "Clinics report fewer no-shows."),
+        Source("long", "Title: Long report\n", "Appointment reminders cut missed visits. " * 40),
+        Source("accents", "Title: Étude\n", "Les cliniques réduisent les rendez-vous manqués. " * 30),
+    ]
+
+
+def test_allocate_gives_short_sources_what_they_need():
+    assert allocate([10, 500, 500], 400) == [10, 195, 195]
+    assert allocate([10, 20], 400) == [10, 20]
+    assert allocate([10, 20], -5) == [0, 0]
+
+
+@pytest.mark.parametrize("max_tokens", [60, 150, 401, 1000, 5000])
+def test_packed_text_fits_the_budget_and_usage_adds_up(encoding, max_tokens):
+    packer = ContextPacker(max_tokens, encoding=encoding)
+    text, usage = packer.pack(sources())
+    assert packer.count(text) <= max_tokens
+    assert sum(row["tokens"] for row in usage) == packer.count(text)
+
+
+def test_a_cut_inside_a_character_stays_within_the_budget(encoding):
+    packer = ContextPacker(40, encoding=encoding)
+    # Two tokens per "é": the 37 tokens left for the body end halfway through one
+    text, usage = packer.pack([Source("accents", "H:", "é" * 100)])
+    assert text == "H:" + "é" * 18 + "\n"
+    assert usage[0]["tokens"] == packer.count(text) == 39
+
+
+def test_short_sources_are_not_trimmed(encoding):
+    packer = ContextPacker(400, encoding=encoding)
+    text, usage = packer.pack(sources())
+    assert "Clinics report fewer no-shows." in text
+    assert [row["trimmed"] for row in usage] == [False, True, True]
+    # The long sources share what the short one left; a split character may cost one more token
+    bodies = [row["tokens"] - packer.count(source.header) - 1 for row, source in zip(usage, sources())]
+    assert 0 <= bodies[1] - bodies[2] <= 1
+
+
+def test_per_source_cap(encoding):
+    packer = ContextPacker(5000, per_source_tokens=50, encoding=encoding)
+    _, usage = packer.pack(sources())
+    assert [row["trimmed"] for row in usage] == [False, True, True]
+    assert all(row["tokens"] <= 50 + len(sources()[index].header.encode()) + 1 for index, row in enumerate(usage))
+
+
+def test_a_header_that_does_not_fit_drops_the_rest(encoding):
+    items = [Source("a", "A" * 30, "body a"), Source("b", "B" * 30, "body b"), Source("c", "C", "body c")]
+    packer = ContextPacker(50, encoding=encoding)
+    text, usage = packer.pack(items)
+    # "C" alone would fit, but a source is never included after one that was dropped
+    assert [row["included"] for row in usage] == [True, False, False]
+    assert [row["tokens"] for row in usage[1:]] == [0, 0]
+    assert text.startswith("A" * 30) and "B" not in text and "body c" not in text
+    assert packer.pack([])[0] == ""
@@ -0,0 +1,54 @@
+# tests/test_dedup.py
+
+from dedup import collapse_near_duplicates, near_duplicate_clusters
+from search_results import Result
+
+ARTICLE = (
+    "Clinics across the region lost an estimated 150 million dollars last year to missed appointments, "
+    "according to a survey of 400 outpatient practices published on Tuesday. Practices that sent text "
+    "reminders two days ahead cut their no-show rate from 23 percent to 14 percent, while those relying on "
+    "phone calls saw almost no change. The survey found that younger patients were most likely to miss a "
+    "visit and that Monday mornings had the highest no-show rates of the week. Several vendors now sell "
+    "scheduling software that overbooks slots based on each patient's history, but many small clinics say "
+    "the subscription costs are too high for their budgets. Analysts expect the market for appointment "
+    "reminder tools to grow by 12 percent a year through 2028 as insurers begin to reward lower no-show rates."
+)
+
+# The same story as syndicated elsewhere: a new byline, a reworded phrase and a footer
+SYNDICATED = ("By Staff Writers. " + ARTICLE.replace("almost no change", "little change")
+              + " Read more on our site.")
+
+OTHER = (
+    "Vertical farming startups raised record funding as grocery chains signed long-term contracts for "
+    "leafy greens grown indoors. Operators say LED costs have fallen by half in five years, although energy "
+    "prices remain the largest expense. Several farms now sit next to distribution centers to shorten "
+    "delivery times, and investors are watching whether strawberries and tomatoes can be grown profitably."
+)
+
+
+def result(name, text):
+    return Result(f"https://{name}.example.com/story", name, name, 1.0, "2024-05-01", "Staff", text)
+
+
+def test_syndicated_copies_with_light_edits_collapse():
+    assert near_duplicate_clusters([ARTICLE, OTHER, SYNDICATED]) == [[0, 2], [1]]
+
+
+def test_distinct_texts_stay_apart():
+    texts = [ARTICLE, OTHER, ARTICLE[:len(ARTICLE) // 2], OTHER.upper()]
+    # Half an article is not a copy of it; case and punctuation do not matter
+    assert near_duplicate_clusters(texts) == [[0], [1, 3], [2]]
+
+
+def test_empty_texts_never_cluster():
+    assert near_duplicate_clusters(["", None, "  ...  ", ""]) == [[0], [1], [2], [3]]
+    assert near_duplicate_clusters([]) == []
+
+
+def test_citations_keep_the_representatives_url_first():
+    results = [result("first", SYNDICATED), result("other", OTHER), result("second", ARTICLE),
+               result("first", ARTICLE)]
+    kept, citations = collapse_near_duplicates(results)
+    assert [r.id for r in kept] == ["first", "other"]
+    assert citations == [["https://first.example.com/story", "https://second.example.com/story"],
+                         ["https://other.example.com/story"]]
@@ -0,0 +1,34 @@
+# tests/test_diagnostics.py
+
+import pytest
+
+import conversation
+import main_app
+
+RESOURCE_FACTORIES = ["get_exa", "get_exa_cache", "get_doc_store", "get_market_watch", "get_summary_cache"]
+
+
+@pytest.fixture
+def conversation_diagnostics(monkeypatch):
+    monkeypatch.setattr(main_app, "diagnostics",
+                        [entry for entry in main_app.diagnostics if entry[1] == "conversation"])
+    monkeypatch.setattr(conversation, "_resources", {})
+
+
+def test_diagnostics_never_build_a_resource(conversation_diagnostics, monkeypatch):
+    def built():
+        raise AssertionError("the sidebar built a resource")
+
+    for factory in RESOURCE_FACTORIES:
+        monkeypatch.setattr(conversation, factory, built)
+    assert main_app.collect_diagnostics() == {label: {} for label, _, _ in main_app.diagnostics}
+
+
+def test_diagnostics_report_resources_once_built(conversation_diagnostics, tmp_path, monkeypatch):
+    monkeypatch.setattr(conversation.st, "secrets", {"exa": {"DOCSTORE_PATH": str(tmp_path / "documents.sqlite3")}})
+    conversation.get_doc_store.clear()
+    store = conversation.get_doc_store()
+    report = main_app.collect_diagnostics()
+    assert report["doc_store"] == store.stats()
+    assert report["exa_client"] == {}
+    conversation.get_doc_store.clear()
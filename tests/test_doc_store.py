@@ -0,0 +1,105 @@
+# tests/test_doc_store.py
+
+import pytest
+
+from doc_store import DocumentStore
+from search_results import Result
+
+
+# Documents about other ideas. bm25 gives no weight to terms found in most of the
+# store, so a store that only held the documents under test could not rank them.
+OTHER_IDEAS = [
+    "Solar panel installers report rising residential demand.",
+    "Electric scooter sharing fleets expand in European cities.",
+    "Plant-based dairy brands compete for supermarket shelf space.",
+    "Cybersecurity insurance premiums climb for small firms.",
+    "Drone delivery pilots cover suburban pharmacies.",
+    "Vertical farming startups cut water use for leafy greens.",
+]
+
+
+def document(url, text, title="Clinic scheduling report", published_date="2024-05-01"):
+    return Result(url, None, title, None, published_date, "Analyst", text)
+
+
+def other_ideas():
+    return [document(f"https://other.example.com/{index}", text, title=text.split()[0])
+            for index, text in enumerate(OTHER_IDEAS)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DocumentStore(str(tmp_path / "store" / "documents.sqlite3"))
+    store.add(other_ideas() + [
+        document("https://www.example.com/clinics/", "Clinic appointment scheduling software market grows fast."),
+        document("https://news.example.org/farms", "Farm irrigation equipment demand in dry regions.",
+                 title="Irrigation outlook", published_date="2023-01-10"),
+        document("https://example.net/empty", ""),
+    ])
+    return store
+
+
+def urls(found):
+    return [result.url for result in found]
+
+
+def test_search_matches_stemmed_terms_best_first(store):
+    store.add([document("https://example.com/brief", "Scheduling clinic appointments, scheduling market notes.",
+                        title="Clinic appointment scheduling market")])
+    found = store.search("clinic appointment scheduling market")
+    assert urls(found) == ["https://example.com/brief", "https://www.example.com/clinics/"]
+    assert found[0].score > found[1].score
+
+
+def test_documents_without_text_are_not_stored(store):
+    assert store.stats()["documents"] == 2 + len(OTHER_IDEAS)
+
+
+def test_documents_must_cover_enough_of_the_query(store):
+    assert store.search("clinic scheduling irrigation drones robots") == []
+    assert urls(store.search("farm irrigation demand")) == ["https://news.example.org/farms"]
+
+
+def test_domain_and_date_filters(store):
+    assert urls(store.search("irrigation demand", include_domains=["news.example.org"])) == [
+        "https://news.example.org/farms"]
+    assert store.search("irrigation demand", include_domains=["www.example.com"]) == []
+    assert store.search("irrigation demand", start_published_date="2024-01-01") == []
+
+
+def test_refetched_url_replaces_the_indexed_text(store):
+    store.add([document("https://example.com/clinics", "Telehealth triage platforms for rural clinics.")])
+    assert store.stats()["documents"] == 2 + len(OTHER_IDEAS)
+    assert store.search("appointment scheduling software") == []
+    assert urls(store.search("telehealth triage")) == ["https://example.com/clinics"]
+
+
+def test_query_without_terms_finds_nothing(store):
+    assert store.search("the and of") == []
+    assert store.search('"clinic"') != []
+
+
+def test_templated_query_needs_the_topics_own_words(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"))
+    store.add(other_ideas() + [
+        document(f"https://diagnostics.example.com/{index}", text, title="AI diagnostics market")
+        for index, text in enumerate([
+            "AI diagnostics market trends give this idea opportunities despite current competition.",
+            "The current AI diagnostics market: trends, opportunities and competition for the idea.",
+        ])
+    ])
+    query = ("Here is an idea: AI tutoring for kids. Give me market trends, opportunities, and competition "
+             "for this idea for the current market for this idea.")
+    # The template's wording alone would pass the coverage check
+    assert len(store.search(query)) == 2
+    assert store.search(query, topic="AI tutoring for kids") == []
+    assert len(store.search(query, topic="AI diagnostics")) == 2
+
+
+def test_weak_matches_are_dropped(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"))
+    # Every document mentions the market: the term carries no weight
+    store.add([document(f"https://example.com/{index}", f"Market report {index}.") for index in range(3)])
+    assert store.search("market") == []
+    store.min_score = 0.0
+    assert len(store.search("market")) == 3
@@ -0,0 +1,137 @@
+# tests/test_exa_client.py
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import exa_client
+from exa_client import CircuitBreaker, CircuitOpenError, ExaClient, ExaError, TransientExaError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fake_exa_server import make_handler  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    args = argparse.Namespace(latency=0.0, error_rate=0.0, hang_rate=0.0, hang_seconds=0.5,
+                              words=5, seed=0, verbose=False)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    args.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield args
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def clients():
+    opened = []
+
+    def make(server, api_key="key", **options):
+        options.setdefault("backoff", 0.0)
+        client = ExaClient(api_key, base_url=server.url, **options)
+        opened.append(client)
+        return client
+
+    yield make
+    for client in opened:
+        client.close()
+
+
+def test_search_returns_results(server, clients):
+    client = clients(server)
+    response = client.search_and_contents("clinic scheduling", num_results=2)
+    assert [result.title for result in response.results] == ["Market report 0", "Market report 1"]
+    assert client.stats()["attempts"] == 1
+
+
+def test_transient_errors_are_retried_then_raised(server, clients):
+    server.error_rate = 1.0
+    client = clients(server, max_retries=2)
+    with pytest.raises(TransientExaError):
+        client.search_and_contents("clinic scheduling")
+    stats = client.stats()
+    assert (stats["attempts"], stats["retries"], stats["failures"]) == (3, 2, 1)
+    assert client.async_client.breaker.consecutive == 1
+
+
+def test_backoff_doubles_up_to_the_cap(server, clients, monkeypatch):
+    server.error_rate = 1.0
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    # Full jitter picks anywhere below the bound; take the bound itself
+    monkeypatch.setattr(exa_client.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(exa_client.asyncio, "sleep", record)
+    client = clients(server, max_retries=4, backoff=0.01, max_backoff=0.03)
+    with pytest.raises(TransientExaError):
+        client.search_and_contents("clinic scheduling")
+    assert delays == [0.01, 0.02, 0.03, 0.03]
+
+
+def test_timeouts_count_against_the_breaker(server, clients):
+    server.hang_rate = 1.0
+    client = clients(server, timeout=0.1, max_retries=0, breaker=CircuitBreaker(failures=1, reset_timeout=60))
+    with pytest.raises(TransientExaError):
+        client.search_and_contents("clinic scheduling")
+    assert client.stats()["circuit"] == "open"
+
+
+def test_rejected_requests_do_not_open_the_breaker(server, clients):
+    # The fake server answers 401 without an API key: Exa is up, the request is wrong
+    client = clients(server, api_key="", breaker=CircuitBreaker(failures=1, reset_timeout=60))
+    for _ in range(3):
+        with pytest.raises(ExaError) as raised:
+            client.search_and_contents("clinic scheduling")
+        assert not isinstance(raised.value, TransientExaError)
+    assert client.stats()["circuit"] == "closed"
+    assert client.stats()["failures"] == 3
+
+
+def test_breaker_opens_half_opens_and_closes(server, clients):
+    server.error_rate = 1.0
+    client = clients(server, max_retries=0, breaker=CircuitBreaker(failures=2, reset_timeout=0.2))
+    for _ in range(2):
+        with pytest.raises(TransientExaError):
+            client.search_and_contents("clinic scheduling")
+    assert client.stats()["circuit"] == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client.search_and_contents("clinic scheduling")
+    assert (client.stats()["rejected"], client.stats()["attempts"]) == (1, 2)
+
+    # A failed trial opens it again for another reset_timeout
+    time.sleep(0.25)
+    assert client.stats()["circuit"] == "half-open"
+    with pytest.raises(TransientExaError):
+        client.search_and_contents("clinic scheduling")
+    assert client.stats()["circuit"] == "open"
+
+    time.sleep(0.25)
+    server.error_rate = 0.0
+    client.search_and_contents("clinic scheduling")
+    assert client.stats()["circuit"] == "closed"
+    assert client.async_client.breaker.consecutive == 0
+
+
+def test_half_open_breaker_allows_a_single_trial():
+    breaker = CircuitBreaker(failures=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
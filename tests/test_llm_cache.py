@@ -0,0 +1,83 @@
+# tests/test_llm_cache.py
+
+import pytest
+
+import llm_cache
+from llm_cache import MemoryTier, ResponseCache, SqliteTier, cache_key
+
+KEY = cache_key("gpt-4o", 0, "Write a title")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def sqlite(tmp_path):
+    return SqliteTier(str(tmp_path / "cache" / "responses.sqlite3"), ttl=60)
+
+
+def test_cache_key_covers_options():
+    assert cache_key("gpt-4o", 0, "Write a title", {"max_tokens": 100}) != KEY
+    assert cache_key("gpt-4o", 0, "Write a title", {}) == KEY
+
+
+def test_memory_tier_evicts_least_recently_read():
+    tier = MemoryTier(max_entries=2)
+    tier.set("a", "A")
+    tier.set("b", "B")
+    assert tier.get("a") == "A"
+    tier.set("c", "C")
+    assert (tier.get("a"), tier.get("b"), tier.get("c")) == ("A", None, "C")
+
+
+def test_sqlite_tier_evicts_least_recently_read(tmp_path, clock):
+    tier = SqliteTier(str(tmp_path / "responses.sqlite3"), max_entries=2)
+    for key in ("a", "b"):
+        tier.set(key, key.upper())
+        clock[0] += 1
+    assert tier.get("a") == "A"
+    clock[0] += 1
+    tier.set("c", "C")
+    assert len(tier) == 2
+    assert tier.get("b") is None
+
+
+def test_sqlite_hit_is_promoted_to_memory(sqlite):
+    memory = MemoryTier()
+    cache = ResponseCache([memory, sqlite])
+    assert cache.get(KEY, "generate_title") is None
+    sqlite.set(KEY, "Clinics lack staff")
+    assert cache.get(KEY, "generate_title") == "Clinics lack staff"
+    assert memory.get(KEY) == "Clinics lack staff"
+    assert cache.stats() == {"generate_title": {"hits": 1, "misses": 1, "hit_rate": 0.5}}
+
+
+def test_promotion_keeps_the_entrys_age(sqlite, clock):
+    memory = MemoryTier(ttl=60)
+    cache = ResponseCache([memory, sqlite])
+    sqlite.set(KEY, "Clinics lack staff")
+    clock[0] += 50
+    assert cache.get(KEY) == "Clinics lack staff"
+    assert memory.get_entry(KEY)[1] == sqlite.get_entry(KEY)[1]
+    # Ten more seconds expire it in both tiers; promotion did not restart its TTL
+    clock[0] += 11
+    assert cache.get(KEY) is None
+    assert len(memory) == 0
+    assert len(sqlite) == 0
+
+
+def test_tiers_without_get_entry_still_promote():
+    class DictTier(dict):
+        def set(self, key, value):
+            self[key] = value
+
+    memory, shared = MemoryTier(), DictTier({KEY: "Clinics lack staff"})
+    cache = ResponseCache([memory, shared])
+    assert cache.get(KEY) == "Clinics lack staff"
+    assert memory.get(KEY) == "Clinics lack staff"
+    cache.set("other", "value")
+    assert shared["other"] == "value"
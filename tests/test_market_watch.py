@@ -0,0 +1,94 @@
+# tests/test_market_watch.py
+
+import tiktoken
+from langchain_core.messages import AIMessage
+
+import conversation
+from context_packer import ContextPacker
+from market_watch import MarketWatch
+from search_results import Result
+from source_summaries import SourceSummaryCache
+
+BYTES = tiktoken.Encoding("bytes", pat_str=r"\S+|\s+",
+                          mergeable_ranks={bytes([b]): b for b in range(256)}, special_tokens={})
+
+
+def result(name, published_date, text=None):
+    text = text or f"The {name} report puts the clinic scheduling market at {len(name)} billion dollars."
+    return Result(f"https://{name}.example.com/market", name, name, 1.0, published_date, "Analyst", text)
+
+
+class FakeLLM:
+    deployment_name = "fake"
+    temperature = 0
+
+    def __init__(self):
+        self.summaries = 0
+        self.reductions = 0
+
+    def invoke(self, prompt, config=None, **kwargs):
+        if "Fact Sheets:" in str(prompt):
+            self.reductions += 1
+            return AIMessage(content=f"analysis {self.reductions}")
+        self.summaries += 1
+        return AIMessage(content="MARKET SIZE: some billions")
+
+
+def test_add_sources_returns_only_new_results_and_advances_the_watermark(tmp_path):
+    watch = MarketWatch(str(tmp_path / "watch.sqlite3"))
+    assert watch.get("clinic scheduling") is None
+
+    first = [result("alpha", "2024-03-01"), result("beta", "2024-05-01"), result("gamma", None)]
+    assert watch.add_sources("clinic scheduling", first) == first
+    assert watch.get("clinic scheduling")["watermark"] == "2024-05-01"
+
+    # Known URLs (however written) are not new and an older date never moves the watermark back
+    again = [result("beta", "2024-05-01")._replace(url="https://BETA.example.com/market/"),
+             result("delta", "2024-04-01")]
+    assert watch.add_sources("Clinic  Scheduling", again) == [again[1]]
+    state = watch.get("clinic scheduling")
+    assert state["watermark"] == "2024-05-01"
+    assert [r.id for r in state["sources"]] == ["alpha", "beta", "gamma", "delta"]
+    assert watch.add_sources("clinic scheduling", []) == []
+    assert watch.stats() == {"ideas": 1, "sources": 4}
+
+
+def test_refresh_reduces_again_only_when_a_source_was_added(tmp_path, monkeypatch):
+    summary_cache = SourceSummaryCache(str(tmp_path / "summaries.sqlite3"))
+    monkeypatch.setattr(conversation, "get_summary_cache", lambda: summary_cache)
+    monkeypatch.setattr(conversation, "get_market_settings", lambda: dict(conversation.MARKET_DEFAULTS))
+    searches = []
+    found = [[result("alpha", "2024-03-01"), result("beta", "2024-05-01")],
+             [result("beta", "2024-05-01")],
+             [result("delta", "2024-06-01")]]
+
+    def search_market(idea, fanout=True, start_published_date=None, fresh=False):
+        searches.append((start_published_date, fresh))
+        return found[len(searches) - 1]
+
+    monkeypatch.setattr(conversation, "search_market", search_market)
+    llm = FakeLLM()
+    watch = MarketWatch(str(tmp_path / "watch.sqlite3"))
+    packer = ContextPacker(16000, encoding=BYTES)
+
+    def refresh():
+        return conversation.refresh_market_analysis(llm, "clinic scheduling", packer=packer, watch=watch)
+
+    analysis, usage = refresh()
+    assert analysis == "analysis 1"
+    assert (llm.summaries, llm.reductions) == (2, 1)
+    assert [row["new"] for row in usage] == [True, True]
+
+    # Nothing new since the watermark: no LLM call and the stored analysis is kept
+    analysis, usage = refresh()
+    assert analysis == "analysis 1"
+    assert (llm.summaries, llm.reductions) == (2, 1)
+    assert [(row["new"], row["fact_sheet"]) for row in usage] == [(False, "cached"), (False, "cached")]
+    assert watch.get("clinic scheduling")["analysis"] == "analysis 1"
+
+    # A new source is summarized alone and the report is written again
+    analysis, usage = refresh()
+    assert analysis == "analysis 2"
+    assert (llm.summaries, llm.reductions) == (3, 2)
+    assert [row["new"] for row in usage] == [False, False, True]
+    assert searches == [(None, True), ("2024-05-01", True), ("2024-05-01", True)]
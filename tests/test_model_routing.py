@@ -0,0 +1,89 @@
+# tests/test_model_routing.py
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+import model_routing
+import prompt_runner
+from model_routing import Router
+from prompt_runner import prompt_function
+
+
+class FakeLLM:
+    def __init__(self, deployment_name="gpt-page", temperature=0.7, **settings):
+        self.deployment_name = deployment_name
+        self.temperature = temperature
+        self.settings = settings
+
+    def invoke(self, prompt, config=None, **kwargs):
+        return AIMessage(content=f"{self.deployment_name} {self.settings}")
+
+    def stream(self, prompt, config=None, **kwargs):
+        for word in ["one ", "two ", "three"]:
+            yield AIMessageChunk(content=word)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def router(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(model_routing.time, "perf_counter", clock)
+    built = []
+
+    def build(**kwargs):
+        built.append(kwargs)
+        return FakeLLM(**kwargs)
+
+    router = Router(build, tiers={"fast": {"DEPLOYMENT": "gpt-mini", "MAX_TOKENS": 800, "TIMEOUT_SECONDS": 15},
+                                  "long": {"DEPLOYMENT": None, "MAX_TOKENS": 4096, "TIMEOUT_SECONDS": 2}},
+                    routes={"classify": "fast"}, default_tier="long")
+    router.built = built
+    router.clock = clock
+    prompt_runner.set_router(router)
+    return router
+
+
+def test_routed_function_gets_its_tiers_client_and_the_pages_temperature(router):
+    @prompt_function
+    def classify(llm, text):
+        assert llm.settings == {"max_tokens": 800, "timeout": 15}
+        return llm.invoke(text).content
+
+    @prompt_function
+    def market_analysis(llm, text):
+        return llm.invoke(text).content
+
+    assert classify(FakeLLM(temperature=0.3), "text") == "gpt-mini {'max_tokens': 800, 'timeout': 15}"
+    market_analysis(FakeLLM(temperature=0.3), "text")
+    # A tier without a deployment keeps the page's
+    assert router.built == [
+        {"deployment_name": "gpt-mini", "temperature": 0.3, "max_tokens": 800, "timeout": 15},
+        {"deployment_name": "gpt-page", "temperature": 0.3, "max_tokens": 4096, "timeout": 2},
+    ]
+    assert router.stats()["fast"]["calls"] == 1
+    assert router.stats()["long"]["calls"] == 1
+
+
+def test_streamed_calls_are_timed_until_the_generator_is_exhausted(router):
+    @prompt_function
+    def stream_future_wheel_analysis(llm, opportunity):
+        for chunk in llm.stream(opportunity):
+            router.clock.now += 1.5
+            yield chunk.content
+
+    stream = stream_future_wheel_analysis(FakeLLM(), "opportunity")
+    assert router.stats()["long"]["calls"] == 0
+    assert next(stream) == "one "
+    assert router.stats()["long"]["calls"] == 0
+    assert "".join(stream) == "two three"
+    # 4.5 seconds went by while the stream was read, over the tier's 2 second budget
+    stats = router.stats()["long"]
+    assert (stats["calls"], stats["over_budget"]) == (1, 1)
+    assert router.latency["long"].total == pytest.approx(4.5)
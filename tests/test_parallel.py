@@ -0,0 +1,74 @@
+# tests/test_parallel.py
+
+import threading
+
+import pytest
+
+from parallel import critical_path, run_concurrently, run_dag
+
+
+def test_run_concurrently_reports_each_outcome():
+    def fail():
+        raise RuntimeError("down")
+
+    outcomes = {key: (result, error) for key, result, error in run_concurrently({"ok": lambda: 1, "bad": fail})}
+    assert outcomes["ok"] == (1, None)
+    assert str(outcomes["bad"][1]) == "down"
+    assert list(run_concurrently({})) == []
+
+
+def test_dag_passes_dependency_results_in_order():
+    nodes = {
+        "extract": (lambda: "problem", []),
+        "title": (lambda problem: f"title of {problem}", ["extract"]),
+        "abstract": (lambda title, problem: f"abstract of {title} / {problem}", ["title", "extract"]),
+    }
+    completed = []
+    results, timings = run_dag(nodes, on_complete=lambda name, result: completed.append(name))
+    assert results["abstract"] == "abstract of title of problem / problem"
+    assert completed == ["extract", "title", "abstract"]
+    assert timings["title"]["start"] >= timings["extract"]["end"]
+
+
+def test_independent_nodes_run_concurrently():
+    # Both branches must be inside their call at once to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    nodes = {
+        "root": (lambda: 1, []),
+        "breadth": (lambda root: barrier.wait() >= 0, ["root"]),
+        "depth": (lambda root: barrier.wait() >= 0, ["root"]),
+        "landscape": (lambda breadth, depth: breadth and depth, ["breadth", "depth"]),
+    }
+    results, _ = run_dag(nodes, max_workers=2)
+    assert results["landscape"] is True
+
+
+def test_failing_node_raises_and_skips_its_dependents():
+    ran = []
+
+    def fail():
+        raise RuntimeError("rate limited")
+
+    nodes = {
+        "breadth": (fail, []),
+        "landscape": (lambda breadth: ran.append(breadth), ["breadth"]),
+    }
+    with pytest.raises(RuntimeError, match="rate limited"):
+        run_dag(nodes)
+    assert ran == []
+
+
+@pytest.mark.parametrize("nodes, message", [
+    ({"a": (None, ["missing"])}, "unknown node 'missing'"),
+    ({"a": (None, ["b"]), "b": (None, ["a"])}, "Dependency cycle"),
+])
+def test_invalid_graphs_are_rejected(nodes, message):
+    with pytest.raises(ValueError, match=message):
+        run_dag(nodes)
+
+
+def test_critical_path_follows_the_slowest_chain():
+    nodes = {"root": (None, []), "fast": (None, ["root"]), "slow": (None, ["root"]), "end": (None, ["fast", "slow"])}
+    timings = {name: {"duration": duration} for name, duration in
+               (("root", 1.0), ("fast", 0.5), ("slow", 2.0), ("end", 1.0))}
+    assert critical_path(nodes, timings) == (["root", "slow", "end"], 4.0)
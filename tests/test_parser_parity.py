@@ -0,0 +1,98 @@
+# tests/test_parser_parity.py
+#
+# The SectionParser-based parse_* functions against the line scans they
+# replaced (tests/legacy_parsers.py), on replies in the format each prompt asks
+# for and on the recorded responses the pipeline benchmark replays.
+
+import json
+import os
+
+import pytest
+
+import conversation
+import legacy_parsers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(HERE, "fixtures", "parser_outputs.json"), encoding="utf-8") as handle:
+    PARSER_OUTPUTS = json.load(handle)
+with open(os.path.join(os.path.dirname(HERE), "benchmarks", "fixtures", "llm_responses.json"), encoding="utf-8") as handle:
+    RECORDED = json.load(handle)["routes"]
+
+# Recorded responses, by the start of the prompt they answer
+RECORDED_PARSERS = {
+    "Based on the innovator's response": "parse_problem_extraction",
+    "You are tasked with generating a Title": "parse_title_generation",
+    "You are tasked with generating an abstract": "parse_abstract_generation",
+    "prepare insights in a format": "parse_opportunity_pre_landscape",
+    "create a detailed Opportunity Landscape": "parse_opportunity_landscape_output",
+}
+
+# The old line scans got these wrong: section lines that carry a value or a
+# '(qualifier)' never matched, so fields were dropped or landed in the previous
+# section, and 5Ms crashed on ROOT_CAUSE. Here the new parser must agree on
+# every schema field the old one found, and fill in every field of a reply in
+# the prompted format.
+FIXED_PARSERS = {"parse_5w1h_analysis", "parse_5ps_analysis", "parse_5ms_analysis",
+                 "parse_5es_analysis", "parse_4ps_analysis", "parse_opportunity_landscape_output"}
+
+
+# The first reply of each parser is in exactly the format its prompt asks for
+def cases(prompted_only=False):
+    for name, outputs in PARSER_OUTPUTS.items():
+        for index, output in enumerate(outputs[:1] if prompted_only else outputs):
+            yield pytest.param(name, output, id=f"{name}-{index}")
+    for route in RECORDED:
+        for prefix, name in RECORDED_PARSERS.items():
+            if route["match"].startswith(prefix):
+                yield pytest.param(name, route["response"], id=f"{name}-recorded")
+
+
+def parsed_dict(result):
+    return result[-1] if isinstance(result, tuple) else result
+
+
+def leaves(data, prefix=""):
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            yield from leaves(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+@pytest.mark.parametrize("name,output", list(cases()))
+def test_matches_legacy_parser(name, output):
+    new = parsed_dict(getattr(conversation, name)(output))
+    try:
+        old = parsed_dict(getattr(legacy_parsers, name)(output))
+    except (KeyError, TypeError):
+        assert name in FIXED_PARSERS
+        old = {}
+
+    if name not in FIXED_PARSERS:
+        assert new == old
+        return
+    new_leaves = dict(leaves(new))
+    for key, value in leaves(old):
+        if value and key in new_leaves:
+            assert new_leaves[key] == value
+
+
+@pytest.mark.parametrize("name,output", [case for case in cases(prompted_only=True)
+                                         if case.values[0] in FIXED_PARSERS])
+def test_fixed_parsers_fill_every_field(name, output):
+    assert all(value for _, value in leaves(parsed_dict(getattr(conversation, name)(output))))
+
+
+def test_assumptions_accept_spaced_and_unbounded_numbers():
+    output = "\n\n".join(f'ASSUMPTION {number}: "Assumption {number}"\nRATIONALE {number}: "Why {number}"\n'
+                         f'TYPE {number}: "SOCIAL"\nUNCERTAINTY {number}: "LOW"' for number in range(1, 13))
+    parsed = conversation.parse_assumptions(output)
+    assert len(parsed) == 12
+    assert parsed["assumption_12"] == {"assumption": "Assumption 12", "rationale": "Why 12",
+                                       "type": "SOCIAL", "uncertainty": "LOW"}
+
+
+def test_assumptions_fold_continuation_lines():
+    parsed = conversation.parse_assumptions('ASSUMPTION_1: "Patients forget\nlong-booked visits"\nNote: ignored\nnot folded')
+    assert parsed == {"assumption_1": {"assumption": "Patients forget long-booked visits", "rationale": "",
+                                       "type": "", "uncertainty": ""}}
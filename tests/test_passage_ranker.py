@@ -0,0 +1,48 @@
+# tests/test_passage_ranker.py
+
+from passage_ranker import Passage, chunk_text, rank_passages, select_passages
+
+
+def words(text):
+    return len(text.split())
+
+
+def test_chunks_break_on_sentences_and_window_run_on_text():
+    text = "One two three. Four five six seven.\n\nEight nine. " + " ".join(f"w{n}" for n in range(25))
+    chunks = chunk_text(text, max_words=10)
+    # Whole sentences are packed together; run-on text is cut into windows
+    assert chunks[0] == "One two three. Four five six seven. Eight nine."
+    assert [words(chunk) for chunk in chunks[1:]] == [10, 10, 5]
+    assert " ".join(chunks).split() == text.split()
+    # A sentence that would overflow the passage starts the next one
+    assert chunk_text("a b c d e f. g h i j k.", max_words=10) == ["a b c d e f.", "g h i j k."]
+    assert chunk_text("", max_words=10) == []
+
+
+def test_rankings_are_interleaved_round_robin():
+    passages = [
+        Passage(0, 0, "market size reached two billion dollars"),
+        Passage(0, 1, "market size estimates vary by region"),
+        Passage(1, 0, "competitors include three large vendors"),
+        Passage(1, 1, "competitors compete on price and service"),
+        Passage(2, 0, "the weather was pleasant that spring"),
+    ]
+    ranked = rank_passages(passages, ["market size billion", "competitors vendors"])
+    # Each query's best passage comes before either query's second best
+    assert [(p.source, p.position) for p in ranked] == [(0, 0), (1, 0), (0, 1), (1, 1)]
+
+
+def test_repeated_boilerplate_counts_once():
+    banner = "share this market report on social media"
+    passages = [Passage(source, 0, banner) for source in range(3)] + [Passage(3, 0, "market demand grows")]
+    ranked = rank_passages(passages, ["market report", "market"])
+    assert [p.text for p in ranked].count(banner) == 1
+    assert [p.source for p in ranked] == [0, 3]
+
+
+def test_selection_skips_what_does_not_fit_and_keeps_going():
+    ranked = [Passage(0, 0, "a " * 6), Passage(1, 0, "b " * 8), Passage(2, 0, "c " * 3), Passage(3, 0, "d " * 1)]
+    selected = select_passages(ranked, budget=10, count=words)
+    assert [p.source for p in selected] == [0, 2, 3]
+    assert sum(words(p.text) for p in selected) <= 10
+    assert select_passages(ranked, budget=0, count=words) == []
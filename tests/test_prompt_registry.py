@@ -0,0 +1,28 @@
+# tests/test_prompt_registry.py
+
+from langchain_core.messages import AIMessage
+
+import prompt_registry
+from conversation import CONSTRAINTS_PROMPT, MARKET_ANALYSIS_PROMPT
+
+
+def test_cached_tokens_come_from_the_raw_token_usage(monkeypatch):
+    # Only the call counters are under test; skip tokenizing every registered prefix
+    monkeypatch.setattr(prompt_registry, "PROMPTS", {})
+    reply = AIMessage(content="", usage_metadata={"input_tokens": 2000, "output_tokens": 10, "total_tokens": 2010},
+                      response_metadata={"token_usage": {"prompt_tokens": 2000,
+                                                         "prompt_tokens_details": {"cached_tokens": 1536}}})
+    prompt_registry.record_prompt_usage("test_cached_tokens", reply)
+    usage = prompt_registry.prompt_cache_stats()["calls"]["test_cached_tokens"]
+    assert (usage["input_tokens"], usage["cached_tokens"], usage["cached_share"]) == (2000, 1536, 0.768)
+
+
+def test_templates_keep_the_variable_part_out_of_the_prefix():
+    system, user = MARKET_ANALYSIS_PROMPT.messages(idea="clinic scheduling", market_data="{raw: braces}")
+    assert "clinic scheduling" not in system.content
+    assert "Analyze and summarize the provided market data" in system.content
+    assert "{raw: braces}" in user.content
+    # The same prefix is sent for every problem
+    first, _ = CONSTRAINTS_PROMPT.messages(extracted_problem="Clinics lack staff")
+    second, _ = CONSTRAINTS_PROMPT.messages(extracted_problem="Farms lack water")
+    assert first.content == second.content
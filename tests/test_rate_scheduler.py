@@ -0,0 +1,84 @@
+# tests/test_rate_scheduler.py
+
+import threading
+import time
+
+import pytest
+
+from rate_scheduler import BACKGROUND, INTERACTIVE, RateScheduler, TokenBucket
+
+
+def test_bucket_refills_at_its_per_minute_rate_up_to_capacity():
+    bucket = TokenBucket(60)
+    start = bucket.updated
+    bucket.take(60)
+    assert bucket.wait_time(10, 0, start) == pytest.approx(10.0)
+    assert bucket.wait_time(10, 0, start + 4) == pytest.approx(6.0)
+    assert bucket.wait_time(10, 0, start + 1000) == 0.0
+    assert bucket.level == 60
+
+
+def test_bucket_keeps_the_floor_and_lets_oversized_requests_through_when_full():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.wait_time(500, 0, now) == 0.0
+    bucket.take(20)
+    assert bucket.wait_time(30, 12, now) == pytest.approx(2.0)
+
+
+def test_background_functions_get_the_background_lane():
+    scheduler = RateScheduler(1000, 10)
+    assert scheduler.lane("market_analysis") == BACKGROUND
+    assert scheduler.lane("generate_title") == INTERACTIVE
+
+
+def test_release_returns_the_unused_reservation():
+    scheduler = RateScheduler(6000, 600)
+    reserved = scheduler.acquire(200, 1000)
+    assert reserved == 1200
+    assert scheduler.stats()["tokens_available"] == pytest.approx(4800, abs=5)
+    scheduler.release(reserved, 300)
+    assert scheduler.stats()["tokens_available"] == pytest.approx(5700, abs=5)
+    assert scheduler.stats()[INTERACTIVE]["used_tokens"] == 300
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_queued_interactive_call_goes_before_background():
+    # 100 tokens a second and no background reserve: only the lane order decides
+    scheduler = RateScheduler(6000, 60000, background_reserve=0.0)
+    scheduler.acquire(6000, 0)
+    admitted = []
+
+    def acquire(tokens, lane):
+        scheduler.acquire(tokens, 0, lane)
+        admitted.append(lane)
+
+    interactive = threading.Thread(target=acquire, args=(20, INTERACTIVE))
+    interactive.start()
+    wait_until(lambda: scheduler.stats()[INTERACTIVE]["waiting"] == 1)
+    # The background call needs far fewer tokens but still waits its turn
+    background = threading.Thread(target=acquire, args=(1, BACKGROUND))
+    background.start()
+    interactive.join(5)
+    background.join(5)
+    assert admitted == [INTERACTIVE, BACKGROUND]
+    assert scheduler.stats()[BACKGROUND]["admitted"] == 1
+
+
+def test_background_leaves_the_reserve_to_interactive_calls():
+    # 1000 tokens a second; background calls must leave 30000 of the 60000 untouched
+    scheduler = RateScheduler(60000, 60000, background_reserve=0.5)
+    scheduler.acquire(30050, 0)
+    started = time.monotonic()
+    scheduler.acquire(100, 0, INTERACTIVE)
+    assert time.monotonic() - started < 0.05
+    # The background call waits for the 250 tokens the two calls dug into the reserve
+    started = time.monotonic()
+    scheduler.acquire(100, 0, BACKGROUND)
+    assert time.monotonic() - started >= 0.2
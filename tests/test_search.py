@@ -0,0 +1,91 @@
+# tests/test_search.py
+
+import pytest
+
+import conversation
+from conversation import search_and_extract, search_market
+from doc_store import DocumentStore
+from exa_cache import ExaSearchCache
+from search_results import Result, SearchResponse
+
+QUERY = "clinic appointment scheduling market"
+
+
+def result(name, text=None):
+    return Result(f"https://example.com/{name}", name, f"Clinic scheduling {name}", 1.0, "2024-05-01", "Analyst",
+                  text or f"Clinic appointment scheduling market report {name} with its own findings.")
+
+
+class FakeExa:
+    def __init__(self, results):
+        self.results = results
+        self.requests = []
+
+    def search_and_contents(self, query, num_results=None, **kwargs):
+        self.requests.append(num_results)
+        return SearchResponse(self.results[:num_results])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExaSearchCache(str(tmp_path / "exa.sqlite3"))
+
+
+def other_idea(name, text):
+    return Result(f"https://other.example.com/{name}", name, name, 1.0, "2024-05-01", "Analyst", text)
+
+
+# Stored documents about other ideas, so bm25 can tell the ones under test apart
+OTHER_IDEAS = [
+    other_idea("solar", "Solar panel installers report rising residential demand."),
+    other_idea("scooters", "Electric scooter sharing fleets expand in European cities."),
+    other_idea("dairy", "Plant-based dairy brands compete for supermarket shelf space."),
+    other_idea("insurance", "Cybersecurity insurance premiums climb for small firms."),
+    other_idea("drones", "Drone delivery pilots cover suburban pharmacies."),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"))
+    store.add(OTHER_IDEAS + [result("a"), result("b")])
+    return store
+
+
+def test_local_documents_are_topped_up_without_duplicates(cache, store):
+    # Exa's best results are the two documents the store already has
+    client = FakeExa([result("a"), result("b"), result("c"), result("d")])
+    found = search_and_extract(QUERY, num_results=3, cache=cache, client=client, store=store)
+    assert sorted(r.url for r in found) == [f"https://example.com/{name}" for name in "abc"]
+    assert client.requests == [3]
+    assert store.stats()["partial"] == 1
+
+
+def test_fresh_search_skips_cache_and_store(cache, store):
+    client = FakeExa([result("c"), result("d"), result("e")])
+    cache.put(QUERY, [result("old")], num_results=3)
+    found = search_and_extract(QUERY, num_results=3, cache=cache, client=client, store=store, fresh=True)
+    assert [r.id for r in found] == ["c", "d", "e"]
+    # The fresh results replace the cached ones and join the store
+    assert [r.id for r in cache.get(QUERY, num_results=3)] == ["c", "d", "e"]
+    assert store.stats()["documents"] == len(OTHER_IDEAS) + 5
+
+
+def test_stored_documents_about_another_idea_do_not_answer(cache, store, monkeypatch):
+    client = FakeExa([result("tutor-a", "AI tutoring for kids: market trends and competition."),
+                      result("tutor-b", "Kids AI tutoring apps and their market opportunities.")])
+    store.add([other_idea(f"diagnostics-{index}", text) for index, text in enumerate([
+        "AI diagnostics market trends give this idea opportunities despite current competition.",
+        "The current AI diagnostics market: trends, opportunities and competition for the idea.",
+        "AI diagnostics competitors, market share and leading companies.",
+    ])])
+    monkeypatch.setattr(conversation, "get_exa_cache", lambda: cache)
+    monkeypatch.setattr(conversation, "get_exa", lambda: client)
+    monkeypatch.setattr(conversation, "get_doc_store", lambda: store)
+    monkeypatch.setattr(conversation, "local_first_enabled", lambda: True)
+    monkeypatch.setattr(conversation, "get_fanout_workers", lambda: 2)
+
+    found = search_market("AI tutoring for kids")
+    # Every query went to Exa and no diagnostics document came back
+    assert len(client.requests) == 1 + len(conversation.MARKET_FACETS)
+    assert [r.id for r in found] == ["tutor-a", "tutor-b"]
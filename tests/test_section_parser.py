@@ -0,0 +1,59 @@
+# tests/test_section_parser.py
+
+from section_parser import Field, Section, SectionParser
+
+FLAT = SectionParser([Field("TITLE"), Field("REASONING", multiline=True), Field("WHO", key="who")])
+
+
+def test_decorated_headers_and_continuation_lines():
+    parsed = FLAT.parse(
+        '1. **TITLE**: "Clinics lack staff"\n'
+        "- **REASONING (short)**:\n"
+        "Nurses quit.\n"
+        "Shifts are long.\n"
+        "* WHO: rural clinics\n"
+        "  and their patients\n"
+    )
+    assert parsed == {"TITLE": "Clinics lack staff", "REASONING": "Nurses quit.\nShifts are long.",
+                      "who": "rural clinics and their patients"}
+
+
+def test_missing_fields_stay_empty_and_unknown_headers_are_continuation_text():
+    parsed = FLAT.parse("TITLE: Clinics lack staff\nUSA: 30% no-show rate\nNote: from the interview\nmore text\n")
+    assert parsed == {"TITLE": "Clinics lack staff USA: 30% no-show rate Note: from the interview more text",
+                      "REASONING": "", "who": ""}
+
+
+def test_unknown_headers_can_be_skipped():
+    parser = SectionParser([Field("ABSTRACT"), Field("EXPLANATION")], skip_unknown=True)
+    parsed = parser.parse('ABSTRACT: "Clinics lose revenue.\nNOTE: from 2023\nNote: mixed case\nline three"\n'
+                          "EXPLANATION: Added figures")
+    assert parsed == {"ABSTRACT": "Clinics lose revenue. line three", "EXPLANATION": "Added figures"}
+
+
+def test_sections_group_fields_and_keep_their_main_text():
+    parser = SectionParser([
+        Section("SYSTEM", [Field("FUNCTION"), Field("COMPONENTS")], key="system", main="name"),
+        Section("SUPER-SYSTEM", [Field("FUNCTION")], key="super"),
+    ])
+    parsed = parser.parse(
+        "**SYSTEM**: Scheduling app\n"
+        "FUNCTION: books visits\n"
+        "COMPONENTS: calendar, reminders\n"
+        "SUPER-SYSTEM\n"
+        "FUNCTION: hospital network\n"
+    )
+    assert parsed == {"system": {"name": "Scheduling app", "FUNCTION": "books visits",
+                                 "COMPONENTS": "calendar, reminders"},
+                      "super": {"FUNCTION": "hospital network"}}
+
+
+def test_open_sections_collect_unknown_headers():
+    parser = SectionParser([Field("TITLE"), Section("CLASSIFICATION", open=True, key="classes")])
+    parsed = parser.parse("TITLE: Clinics\nCLASSIFICATION:\nWicked: yes\nTame: no\n")
+    assert parsed == {"TITLE": "Clinics", "classes": {"Wicked": "yes", "Tame": "no"}}
+
+
+def test_quotes_are_kept_when_asked():
+    parser = SectionParser([Field("TITLE")], strip_quotes=False)
+    assert parser.parse('TITLE: "Clinics"') == {"TITLE": '"Clinics"'}
@@ -0,0 +1,108 @@
+# tests/test_single_flight.py
+
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+KEY = "generate_title:clinic"
+
+
+class StopRun(BaseException):
+    pass
+
+
+# Signals every join() so a test knows a caller is in flight before releasing the leader
+class TracedFlight(SingleFlight):
+    def __init__(self):
+        super().__init__()
+        self.joined = threading.Semaphore(0)
+
+    def join(self, key):
+        joined = super().join(key)
+        self.joined.release()
+        return joined
+
+
+def start(target, outcomes, name):
+    def run():
+        try:
+            outcomes[name] = ("value", target())
+        except BaseException as error:
+            outcomes[name] = ("error", error)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+# Runs a leader blocked on `release` and two followers, and returns their outcomes
+# once the leader's fn has returned or raised
+def run_flight(flight, leader_fn, follower_fn):
+    release = threading.Event()
+    outcomes = {}
+
+    def leader():
+        release.wait(5)
+        return leader_fn()
+
+    threads = [start(lambda: flight.do(KEY, leader), outcomes, "leader")]
+    assert flight.joined.acquire(timeout=5)
+    for name in ("first", "second"):
+        threads.append(start(lambda: flight.do(KEY, follower_fn), outcomes, name))
+        assert flight.joined.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_followers_share_the_leaders_result():
+    flight = TracedFlight()
+    follower_calls = []
+    outcomes = run_flight(flight, lambda: "title", lambda: follower_calls.append(1))
+    assert outcomes == {"leader": ("value", "title"), "first": ("value", "title"), "second": ("value", "title")}
+    assert follower_calls == []
+    assert flight.stats() == {"executed": 1, "coalesced": 2, "abandoned": 0, "in_flight": 0}
+
+
+def test_leader_failure_wakes_followers_with_its_error():
+    flight = TracedFlight()
+    error = RuntimeError("rate limited")
+
+    def fail():
+        raise error
+
+    outcomes = run_flight(flight, fail, lambda: "unused")
+    assert {name: outcome[1] for name, outcome in outcomes.items()} == {"leader": error, "first": error,
+                                                                       "second": error}
+    assert flight.stats()["in_flight"] == 0
+    # The failure is not remembered: the next caller runs the call again
+    assert flight.do(KEY, lambda: "retried") == "retried"
+    assert flight.stats()["executed"] == 2
+
+
+def test_abandoned_leader_releases_followers_to_run_the_call():
+    flight = TracedFlight()
+
+    def stop():
+        raise StopRun()
+
+    outcomes = run_flight(flight, stop, lambda: "own")
+    assert isinstance(outcomes["leader"][1], StopRun)
+    assert outcomes["first"] == outcomes["second"] == ("value", "own")
+    stats = flight.stats()
+    assert (stats["abandoned"], stats["in_flight"]) == (1, 0)
+    assert stats["executed"] >= 2
+
+
+def test_waiting_on_a_failed_call_raises():
+    flight = SingleFlight()
+    call, leader = flight.join(KEY)
+    assert leader
+    assert flight.join(KEY) == (call, False)
+    flight.finish(KEY, call, error=ValueError("bad reply"))
+    with pytest.raises(ValueError, match="bad reply"):
+        flight.wait(call)
+    assert flight.join(KEY)[1]
@@ -0,0 +1,64 @@
+# tests/test_structured_output.py
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import prompt_runner
+from llm_cache import MemoryTier, ResponseCache
+from prompt_runner import PromptLLM
+from structured_output import TitleGeneration, invoke_structured, repair_json
+
+VALID = '{"title": "Clinics lack staff", "evaluation": {"CLARITY": "yes"}}'
+
+
+class FakeLLM:
+    deployment_name = "fake"
+    temperature = 0
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.prompts.append(prompt)
+        return AIMessage(content=self.replies.pop(0))
+
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache([MemoryTier()])
+    prompt_runner.set_response_cache(cache)
+    return cache
+
+
+def test_repair_json_leaves_text_inside_strings():
+    text = '{"quote": "None of the clinics said True, ”hi”", "ok": True, "gone": None,}'
+    assert json.loads(repair_json(text)) == {"quote": "None of the clinics said True, ”hi”", "ok": True, "gone": None}
+
+
+def test_repair_json_fixes_smart_quoted_keys_fences_and_truncation():
+    assert json.loads(repair_json('```json\n{“title”: “A”, "items": [1, 2,\n```')) == {"title": "A", "items": [1, 2]}
+
+
+def test_invalid_reply_is_not_cached(cache):
+    llm = FakeLLM(["not json at all", VALID])
+    result = invoke_structured(PromptLLM(llm, "generate_title"), "Write a title", TitleGeneration)
+    assert result.evaluation == {"CLARITY": "YES"}
+    assert len(llm.prompts) == 2
+
+    # Only the retry's valid reply was stored; the first prompt goes to the model again
+    llm.replies = [VALID]
+    invoke_structured(PromptLLM(llm, "generate_title"), "Write a title", TitleGeneration)
+    assert len(llm.prompts) == 3
+    assert invoke_structured(PromptLLM(llm, "generate_title"), "Write a title", TitleGeneration) == result
+    assert len(llm.prompts) == 3
+
+
+def test_cached_reply_failing_validation_is_a_miss(cache):
+    llm = FakeLLM(["not json at all", VALID])
+    wrapped = PromptLLM(llm, "generate_title")
+    assert wrapped.invoke("Write a title").content == "not json at all"
+    assert wrapped.invoke("Write a title", validate=lambda content: content.startswith("{")).content == VALID
+    assert wrapped.invoke("Write a title").content == VALID
@@ -0,0 +1,52 @@
+# tests/test_telemetry.py
+
+import logging
+import socket
+import urllib.request
+
+import pytest
+
+import prompt_runner
+from llm_telemetry import Telemetry
+
+
+@pytest.fixture
+def metrics_settings(monkeypatch):
+    def configure(port):
+        monkeypatch.setattr(prompt_runner.st, "secrets", {"telemetry": {"PROMETHEUS_PORT": port}})
+        monkeypatch.setattr(prompt_runner, "_metrics_server", None)
+        prompt_runner.set_telemetry(Telemetry())
+    yield configure
+    if prompt_runner._metrics_server:
+        prompt_runner._metrics_server.shutdown()
+        prompt_runner._metrics_server.server_close()
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def test_metrics_server_serves_prometheus_text(metrics_settings):
+    port = free_port()
+    metrics_settings(port)
+    assert prompt_runner.start_metrics_server() is not None
+    # Started once: a second call returns the same server
+    assert prompt_runner.start_metrics_server() is prompt_runner._metrics_server
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        assert b"# TYPE llm_calls_total counter" in response.read()
+
+
+def test_port_in_use_leaves_telemetry_running(metrics_settings, caplog):
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        metrics_settings(taken.getsockname()[1])
+        # conftest silences warnings; this test is about one
+        logging.disable(logging.NOTSET)
+        assert prompt_runner.start_metrics_server() is None
+        assert "Not serving LLM metrics" in caplog.text
+    assert prompt_runner.get_telemetry() is not None
+    prompt_runner.get_telemetry().record_parse("generate_title", [])
+    assert prompt_runner.telemetry_stats()["generate_title"]["parse_complete"] == 1